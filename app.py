@@ -1,11 +1,28 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import joblib
-from sklearn.preprocessing import LabelEncoder
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+import os
+import time
+import uuid
+from restock.analysis import SCATTER_MODES, SVG_MAX_POINTS, get_analysis_cache
+from restock.batch import combine_results, default_workers, expand_sources, item_summary, run_batch, store_summary
+from restock.memory import format_bytes, memory_report, stage_memory
+from restock.model_registry import MODEL_PATH, get_registry
+from restock.dataset_cache import get_dataset_cache
+from restock.history import DEFAULT_RECENT_ROWS, HISTORY_KEY_PREFIX, get_history_store
+from restock.export import EXPORT_FORMATS, get_export_cache
+from restock.forecast import DEFAULT_HORIZON_WEEKS, MAX_HORIZON_WEEKS, forecast_horizon, forecast_table
+from restock.forest import ForestPredictor, get_predictor
+from restock.incremental import update_features
+from restock.pipeline import FEATURE_SCHEMA_VERSION, inference_features, predict_restock
+from restock.prediction_cache import get_prediction_cache
+from restock.profiling import profile_run
+from restock.simulation import (DEFAULT_LEAD_WEEKS, DEFAULT_PRICE_FACTORS, DEFAULT_SAFETY_WEEKS, DEFAULT_UNIT_PRICE,
+                                RISK_THRESHOLD, scenario_grid, simulate)
+from restock.training import DEFAULT_ADD_TREES, DEFAULT_HOLDOUT_WEEKS, TRAINING_KEY, activate_model, get_retrain_manager
+from restock.vocab import UNKNOWN_CODE
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -77,7 +94,7 @@ with st.sidebar:
     st.markdown("### 📋 Menu Navigasi")
     menu = st.selectbox(
         "Pilih Menu:",
-        ["🏠 Dashboard", "📤 Upload Data", "🔮 Prediksi", "📊 Analisis", "💾 Download Hasil"]
+        ["🏠 Dashboard", "📤 Upload Data", "🔮 Prediksi", "🏬 Batch Multi-Toko", "🧠 Latih Ulang Model", "📊 Analisis", "💾 Download Hasil"]
     )
     
     st.markdown("---")
@@ -97,6 +114,8 @@ with st.sidebar:
     st.markdown("### 🎯 Fitur Utama")
     st.markdown("""
     ✅ Upload file Excel/CSV  
+    ✅ Batch paralel multi-toko (ZIP)  
+    ✅ Latih ulang model di background  
     ✅ Feature Engineering otomatis  
     ✅ Prediksi ML dengan RandomForest  
     ✅ Visualisasi interaktif  
@@ -105,126 +124,50 @@ with st.sidebar:
 
 # Fungsi utility
 def load_model():
-    """Load model ML yang sudah ditraining"""
+    """Load model ML dari registry bersama (dimuat sekali per proses server)"""
     try:
-        # Ganti dengan path model Anda
-        model_data = joblib.load('model_restock.joblib')
-        
-        # Jika model_data adalah dictionary, ambil model dari key tertentu
-        if isinstance(model_data, dict):
-            # Coba beberapa key yang umum digunakan
-            possible_keys = ['model', 'rf_model', 'regressor', 'estimator', 'best_estimator_']
-            for key in possible_keys:
-                if key in model_data:
-                    return model_data[key]
-            # Jika tidak ada key yang cocok, tampilkan keys yang tersedia
-            st.error(f"⚠️ Model dalam format dictionary. Keys tersedia: {list(model_data.keys())}")
-            st.info("💡 Silakan sesuaikan key di fungsi load_model() sesuai dengan struktur model Anda")
-            return None
-        else:
-            # Jika bukan dictionary, return langsung
-            return model_data
-            
+        return get_predictor(MODEL_PATH)
+    except ValueError as e:
+        st.error(f"⚠️ {str(e)}")
+        st.info("💡 Silakan sesuaikan MODEL_KEYS di restock/model_registry.py sesuai dengan struktur model Anda")
+        return None
     except Exception as e:
         st.error(f"⚠️ Error loading model: {str(e)}")
         return None
 
-def validate_data(df):
-    """Validasi data input"""
-    required_columns = [
-        'MINGGU', 'TANGGAL', 'KATEGORI', 'NAMA BARANG', 
-        'SATUAN', 'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR'
-    ]
-    
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    
-    if missing_columns:
-        return False, f"Kolom yang hilang: {', '.join(missing_columns)}"
-    
-    # Validasi tipe data numerik
-    numeric_columns = ['MINGGU', 'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR']
-    for col in numeric_columns:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    return True, "Data valid"
-
-def feature_engineering(df):
-    """Melakukan feature engineering sesuai dengan model"""
+def load_uploaded_data():
+    """Baca dataset upload dari cache (None jika sudah ter-evict)"""
     try:
-        df_processed = df.copy()
-        
-        # Convert tanggal
-        df_processed['TANGGAL'] = pd.to_datetime(df_processed['TANGGAL'], format='%d/%m/%Y', errors='coerce')
-        
-        # Extract features dari tanggal
-        df_processed['TAHUN'] = df_processed['TANGGAL'].dt.year
-        df_processed['BULAN'] = df_processed['TANGGAL'].dt.month
-        df_processed['HARI_DALAM_BULAN'] = df_processed['TANGGAL'].dt.day
-        
-        # Sort data berdasarkan nama barang dan tanggal
-        df_processed = df_processed.sort_values(['NAMA BARANG', 'TANGGAL']).reset_index(drop=True)
-        
-        # Feature engineering untuk data historis
-        df_processed['PREV_JUMLAH_TERJUAL'] = df_processed.groupby('NAMA BARANG')['JUMLAH TERJUAL'].shift(1)
-        df_processed['PREV_STOK_AKHIR'] = df_processed.groupby('NAMA BARANG')['STOK AKHIR'].shift(1)
-        
-        # Future sales untuk training (jika ada data masa depan)
-        df_processed['FUTURE_SALES'] = df_processed.groupby('NAMA BARANG')['JUMLAH TERJUAL'].shift(-1)
-        df_processed['RESTOCK_NEEDED'] = df_processed['FUTURE_SALES'] - df_processed['STOK AKHIR']
-        df_processed['RESTOCK_NEEDED'] = df_processed['RESTOCK_NEEDED'].clip(lower=0)
-        
-        # Encoding kategori dan nama barang
-        le_kategori = LabelEncoder()
-        le_nama_barang = LabelEncoder()
-        
-        df_processed['KATEGORI_ENCODED'] = le_kategori.fit_transform(df_processed['KATEGORI'])
-        df_processed['NAMA_BARANG_ENCODED'] = le_nama_barang.fit_transform(df_processed['NAMA BARANG'])
-        
-        # Simpan decoder untuk output
-        df_processed['KATEGORI_DECODE'] = df_processed['KATEGORI']
-        df_processed['NAMA_BARANG_DECODE'] = df_processed['NAMA BARANG']
-        
-        return df_processed, le_kategori, le_nama_barang, True, "Feature engineering berhasil"
-        
-    except Exception as e:
-        return None, None, None, False, f"Error dalam feature engineering: {str(e)}"
+        return st.session_state.uploaded_data.load()
+    except OSError:
+        st.session_state.uploaded_data = None
+        return None
 
-def predict_restock(df_processed, model):
-    """Melakukan prediksi restock"""
-    try:
-        # Features yang digunakan untuk prediksi
-        features = [
-            'MINGGU', 'KATEGORI_ENCODED', 'NAMA_BARANG_ENCODED',
-            'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR', 'BULAN', 'TAHUN', 'HARI_DALAM_BULAN'
-        ]
-        
-        # Ambil data untuk prediksi (data terbaru per item)
-        latest_data = df_processed.groupby('NAMA BARANG').last().reset_index()
-        
-        # Prediksi
-        X_pred = latest_data[features]
-        predictions = model.predict(X_pred)
-        
-        # Bulatkan ke angka bulat
-        predictions = np.round(predictions).astype(int)
-        predictions = np.maximum(predictions, 0)  # Pastikan tidak negatif
-        
-        # Tambahkan kolom prediksi
-        latest_data['REKOMENDASI_RESTOCK'] = predictions
-        
-        return latest_data, True, "Prediksi berhasil"
-        
-    except Exception as e:
-        return None, False, f"Error dalam prediksi: {str(e)}"
+def remember_run(profile, keep=10):
+    """Simpan ringkasan run untuk panel performa (hanya beberapa run terakhir)"""
+    st.session_state.perf_runs = (st.session_state.perf_runs + [profile.to_record()])[-keep:]
 
 # Inisialisasi session state
 if 'uploaded_data' not in st.session_state:
     st.session_state.uploaded_data = None
-if 'processed_data' not in st.session_state:
-    st.session_state.processed_data = None
 if 'prediction_results' not in st.session_state:
     st.session_state.prediction_results = None
+if 'results_version' not in st.session_state:
+    st.session_state.results_version = None
+if 'feature_state' not in st.session_state:
+    st.session_state.feature_state = None
+if 'memory_stages' not in st.session_state:
+    st.session_state.memory_stages = {}
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex[:12]
+if 'perf_runs' not in st.session_state:
+    st.session_state.perf_runs = []
+if 'forecast' not in st.session_state:
+    st.session_state.forecast = None
+if 'batch' not in st.session_state:
+    st.session_state.batch = None
+if 'simulation' not in st.session_state:
+    st.session_state.simulation = None
 
 # Menu Dashboard
 if menu == "🏠 Dashboard":
@@ -250,7 +193,7 @@ if menu == "🏠 Dashboard":
         st.markdown("""
         <div class="metric-container">
             <h3>⏱️ Prediksi</h3>
-            <p>1 Minggu ke Depan</p>
+            <p>1 - 12 Minggu ke Depan</p>
         </div>
         """, unsafe_allow_html=True)
     
@@ -266,6 +209,21 @@ if menu == "🏠 Dashboard":
     model = load_model()
     if model:
         st.success("✅ Model ML berhasil dimuat dan siap digunakan!")
+        info = get_registry().get(MODEL_PATH)
+        st.caption(
+            f"⏱️ Waktu load: {info.load_seconds * 1000:.0f} ms • "
+            f"💾 Resident: {format_bytes(info.resident_bytes)} • "
+            f"📄 File: {format_bytes(info.size)} • "
+            f"🔑 SHA-256: {info.sha256[:12]} • "
+            f"🗺️ mmap: {info.mmap_mode or 'off'}"
+        )
+        if isinstance(model, ForestPredictor):
+            forest = model.compiled
+            st.caption(
+                f"🌲 Inference terkompilasi: {forest.n_trees} pohon • "
+                f"{len(forest.feature):,} node • {format_bytes(forest.nbytes)} (memory-mapped) • "
+                f"sklearn untuk > {model.max_compiled_rows:,} barang"
+            )
     else:
         st.error("❌ Model ML tidak dapat dimuat. Silakan periksa file model.")
 
@@ -279,19 +237,81 @@ elif menu == "📤 Upload Data":
         help="Upload file dengan data penjualan yang berisi kolom: MINGGU, TANGGAL, KATEGORI, NAMA BARANG, SATUAN, STOK AWAL, JUMLAH TERJUAL, STOK AKHIR"
     )
     
+    history_mode = st.checkbox(
+        "🗄️ Simpan ke histori lokal dan prediksi dari histori",
+        help="Baris upload ditambahkan ke histori SQLite (baris yang sama tidak digandakan), "
+             "sehingga setiap minggu cukup upload minggu terbaru"
+    )
+    
+    incremental = False
+    if history_mode:
+        history_store = get_history_store()
+        recent_rows = st.number_input(
+            "📅 Baris terakhir per barang yang diambil dari histori",
+            min_value=1, max_value=52, value=DEFAULT_RECENT_ROWS,
+            help="Prediksi hanya memakai baris terbaru; baris lain untuk preview dan tren"
+        )
+    elif st.session_state.feature_state is not None:
+        incremental = st.checkbox(
+            "➕ File ini hanya berisi minggu baru (update inkremental)",
+            help="Feature dihitung hanya untuk baris baru berdasarkan data terakhir per barang dari prediksi sebelumnya"
+        )
+    
+    def use_history():
+        """Pakai k baris terakhir per barang dari histori sebagai dataset aktif"""
+        handle = history_store.dataset_handle(recent_rows)
+        st.session_state.uploaded_data = handle
+        stats = history_store.stats()
+        last_date = stats['last_date'].strftime('%d/%m/%Y') if stats['last_date'] is not None else '-'
+        st.info(
+            f"🗄️ Histori: {stats['rows']:,} baris • {stats['items']:,} barang • sampai {last_date} "
+            f"({format_bytes(stats['bytes'])}). Dataset aktif: {handle.n_rows:,} baris terakhir."
+        )
+    
+    if history_mode and uploaded_file is None and history_store.stats()['rows']:
+        if st.button("📚 Prediksi dari Histori Tersimpan"):
+            use_history()
+    
     if uploaded_file is not None:
         try:
-            # Read file
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
+            def ingest_upload():
+                # Read file secara streaming (validasi per chunk), hasilnya di-cache per hash isi file
+                handle, df, is_valid, message = get_dataset_cache().get_or_ingest(uploaded_file.getvalue(), uploaded_file.name)
+                if is_valid and df is None:
+                    df = handle.load()
+                return handle, df, is_valid, message
             
-            # Validasi data
-            is_valid, message = validate_data(df)
+            # Hanya upload baru yang diukur; rerun Streamlit dengan file yang sama tidak dicatat ulang
+            upload_id = (uploaded_file.name, getattr(uploaded_file, 'file_id', None))
+            if st.session_state.get('last_upload_id') != upload_id:
+                with profile_run('upload', session_id=st.session_state.session_id,
+                                 file=uploaded_file.name, bytes=uploaded_file.size) as profile:
+                    handle, df, is_valid, message = ingest_upload()
+                    if not is_valid:
+                        profile.error = message
+                remember_run(profile)
+                st.session_state.last_upload_id = upload_id
+            else:
+                handle, df, is_valid, message = ingest_upload()
             
             if is_valid:
-                st.session_state.uploaded_data = df
+                if history_mode:
+                    # Setiap file upload ditambahkan sekali; rerun tidak menulis ulang
+                    if st.session_state.get('history_upload_id') != upload_id:
+                        with profile_run('histori', session_id=st.session_state.session_id,
+                                         file=uploaded_file.name, rows=len(df)) as profile:
+                            st.session_state.history_counts = history_store.append(df)
+                        remember_run(profile)
+                        st.session_state.history_upload_id = upload_id
+                    counts = st.session_state.history_counts
+                    st.success(
+                        f"✅ Histori diperbarui: {counts['baru']:,} baris baru, {counts['diperbarui']:,} diperbarui, "
+                        f"{counts['sama']:,} sudah ada"
+                        + (f", {counts['dibuang']:,} tanpa NAMA BARANG/TANGGAL dilewati" if counts['dibuang'] else "")
+                    )
+                    use_history()
+                elif not incremental:
+                    st.session_state.uploaded_data = handle
                 
                 st.markdown("""
                 <div class="success-box">
@@ -300,6 +320,21 @@ elif menu == "📤 Upload Data":
                 </div>
                 """, unsafe_allow_html=True)
                 
+                # Masalah per baris dari validasi (data tetap dipakai, nilai salah menjadi kosong)
+                report = handle.validation
+                if report is not None and report.n_errors:
+                    st.warning(f"⚠️ {message}")
+                    with st.expander(f"🧾 Laporan Validasi ({report.n_errors:,} masalah)"):
+                        st.dataframe(report.summary(), hide_index=True, use_container_width=True)
+                        st.caption(f"Menampilkan {len(report.errors):,} masalah pertama (nomor baris sesuai file, header = baris 1)")
+                        st.dataframe(report.errors, hide_index=True, use_container_width=True)
+                        st.download_button(
+                            label="📥 Download Laporan Validasi (CSV)",
+                            data=report.errors.to_csv(index=False).encode('utf-8'),
+                            file_name=f"validasi_{uploaded_file.name}.csv",
+                            mime='text/csv'
+                        )
+                
                 # Preview data
                 st.markdown("### 👀 Preview Data")
                 st.dataframe(df.head(10), use_container_width=True)
@@ -315,6 +350,37 @@ elif menu == "📤 Upload Data":
                 with col4:
                     st.metric("📅 Periode Data", df['MINGGU'].nunique())
                 
+                upload_memory = stage_memory(df)
+                if not incremental:
+                    st.session_state.memory_stages = {"📤 Upload": upload_memory}
+                st.caption(
+                    f"💾 Memori dataset: {format_bytes(upload_memory['compact_bytes'])} "
+                    f"(dtype default: {format_bytes(upload_memory['default_bytes'])})"
+                )
+                
+                if incremental and st.button("⚡ Update Inkremental & Prediksi", type="primary"):
+                    model = load_model()
+                    with profile_run('update_inkremental', session_id=st.session_state.session_id,
+                                     file=uploaded_file.name, rows=len(df)) as profile:
+                        new_rows, new_state, label_updates, success, message = update_features(st.session_state.feature_state, df)
+                        pred_success, pred_message = False, message
+                        if success and model is not None:
+                            results, pred_success, pred_message = predict_restock(new_state, model)
+                        if not pred_success:
+                            profile.error = pred_message
+                    remember_run(profile)
+                    
+                    if success and model is not None:
+                        if pred_success:
+                            st.session_state.feature_state = new_state
+                            st.session_state.prediction_results = results
+                            st.session_state.results_version = uuid.uuid4().hex
+                            st.success(f"✅ {message}. Hasil prediksi diperbarui untuk {len(results)} barang.")
+                        else:
+                            st.error(f"❌ {pred_message}")
+                    elif not success:
+                        st.error(f"❌ {message}")
+                
             else:
                 st.markdown(f"""
                 <div class="warning-box">
@@ -339,17 +405,63 @@ elif menu == "🔮 Prediksi":
         else:
             if st.button("🎯 Mulai Prediksi", type="primary"):
                 with st.spinner("🔄 Sedang memproses data dan melakukan prediksi..."):
-                    # Feature engineering
-                    df_processed, le_kat, le_nama, success, message = feature_engineering(st.session_state.uploaded_data)
+                    with profile_run('prediksi', session_id=st.session_state.session_id,
+                                     dataset=st.session_state.uploaded_data.key,
+                                     rows=st.session_state.uploaded_data.n_rows) as profile:
+                        # Hasil prediksi di-cache per (dataset, versi model, schema feature)
+                        prediction_cache = get_prediction_cache()
+                        cache_key = (
+                            st.session_state.uploaded_data.key,
+                            get_registry().get(MODEL_PATH).sha256,
+                            FEATURE_SCHEMA_VERSION,
+                        )
+                        cached_results = prediction_cache.get(cache_key)
+                        profile.context['cache'] = 'hit' if cached_results is not None else 'miss'
+                        
+                        if cached_results is not None:
+                            latest_data, success, message = cached_results, True, "Hasil prediksi dari cache"
+                        else:
+                            df_upload = load_uploaded_data()
+                            if df_upload is None:
+                                profile.error = "Dataset sudah tidak ada di cache"
+                                st.error("❌ Dataset sudah tidak ada di cache. Silakan upload ulang di menu Upload Data")
+                                st.stop()
+                            
+                            # Feature engineering mode inference (hanya baris terbaru per barang)
+                            latest_data, success, message = inference_features(df_upload)
+                        
+                        # Prediksi
+                        results, pred_success, pred_message = None, False, message
+                        if success and cached_results is not None:
+                            results, pred_success, pred_message = cached_results, True, message
+                        elif success:
+                            results, pred_success, pred_message = predict_restock(latest_data, model)
+                            if pred_success:
+                                prediction_cache.put(cache_key, results)
+                        
+                        if not pred_success:
+                            profile.error = pred_message
+                    remember_run(profile)
                     
                     if success:
-                        st.session_state.processed_data = df_processed
+                        # Baris terbaru per barang sekaligus menjadi state untuk update inkremental
+                        st.session_state.feature_state = latest_data
+                        st.session_state.memory_stages["⚙️ Feature Inference"] = stage_memory(latest_data)
                         
-                        # Prediksi
-                        results, pred_success, pred_message = predict_restock(df_processed, model)
+                        unknown_items = int((latest_data['NAMA_BARANG_ENCODED'] == UNKNOWN_CODE).sum())
+                        if unknown_items:
+                            st.info(f"ℹ️ {unknown_items} barang belum dikenal model (kode {UNKNOWN_CODE}), prediksinya kurang akurat")
                         
                         if pred_success:
                             st.session_state.prediction_results = results
+                            st.session_state.results_version = ':'.join(str(part) for part in cache_key)
+                            
+                            cache_stats = prediction_cache.stats()
+                            st.caption(
+                                f"🗃️ Cache prediksi: {'HIT' if cached_results is not None else 'MISS'} • "
+                                f"hit {cache_stats['hits']} / miss {cache_stats['misses']} • "
+                                f"{cache_stats['entries']} entri ({format_bytes(cache_stats['bytes'])})"
+                            )
                             
                             st.markdown("""
                             <div class="success-box">
@@ -381,11 +493,281 @@ elif menu == "🔮 Prediksi":
                             with col4:
                                 total_restock = results['REKOMENDASI_RESTOCK'].sum()
                                 st.metric("🎯 Total Restock", total_restock)
+                            
+                            st.session_state.memory_stages["🎯 Hasil Prediksi"] = stage_memory(results)
+                            with st.expander("💾 Penggunaan Memori per Tahap"):
+                                st.dataframe(memory_report(st.session_state.memory_stages), use_container_width=True)
                         
                         else:
                             st.error(f"❌ {pred_message}")
                     else:
                         st.error(f"❌ {message}")
+            
+            # Proyeksi multi-minggu dari baris terbaru per barang (semua barang digulirkan bersamaan)
+            if st.session_state.prediction_results is not None and st.session_state.feature_state is not None:
+                st.markdown("### 📅 Proyeksi Restock Multi-Minggu")
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    horizon = st.slider(
+                        "Horizon proyeksi (minggu):",
+                        min_value=1,
+                        max_value=MAX_HORIZON_WEEKS,
+                        value=DEFAULT_HORIZON_WEEKS,
+                        help="Penjualan dan stok hasil prediksi tiap minggu dipakai sebagai input minggu berikutnya"
+                    )
+                
+                forecast_key = (st.session_state.results_version, horizon)
+                forecast = None
+                if st.session_state.forecast is not None and st.session_state.forecast[0] == forecast_key:
+                    forecast = st.session_state.forecast[1]
+                
+                with col2:
+                    if forecast is None and st.button("📅 Hitung Proyeksi"):
+                        with st.spinner(f"🔄 Menghitung proyeksi {horizon} minggu..."):
+                            with profile_run('proyeksi', session_id=st.session_state.session_id,
+                                             weeks=horizon, items=len(st.session_state.feature_state)) as profile:
+                                forecast, forecast_success, forecast_message = forecast_horizon(
+                                    st.session_state.feature_state, model, horizon
+                                )
+                                if not forecast_success:
+                                    profile.error = forecast_message
+                            remember_run(profile)
+                        if forecast_success:
+                            st.session_state.forecast = (forecast_key, forecast)
+                        else:
+                            st.error(f"❌ {forecast_message}")
+                
+                if forecast is not None:
+                    weekly = forecast.groupby('MINGGU_KE')['REKOMENDASI_RESTOCK'].sum().reset_index()
+                    fig = px.bar(
+                        weekly,
+                        x='MINGGU_KE',
+                        y='REKOMENDASI_RESTOCK',
+                        title=f"Total Rekomendasi Restock per Minggu ({horizon} minggu ke depan)",
+                        labels={'MINGGU_KE': 'Minggu ke-'}
+                    )
+                    fig.update_layout(height=350)
+                    st.plotly_chart(fig, use_container_width=True)
+                    
+                    st.dataframe(forecast_table(forecast), hide_index=True, use_container_width=True)
+                    st.download_button(
+                        label="📥 Download Proyeksi (CSV)",
+                        data=forecast.to_csv(index=False).encode('utf-8'),
+                        file_name=f"proyeksi_restock_{horizon}minggu_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                        mime='text/csv'
+                    )
+
+# Menu Batch Multi-Toko
+elif menu == "🏬 Batch Multi-Toko":
+    st.markdown("### 🏬 Prediksi Batch Multi-Toko")
+    st.info("💡 Satu file = satu toko (nama toko = nama file). Upload beberapa file sekaligus atau satu arsip ZIP berisi file semua toko.")
+    
+    uploaded_files = st.file_uploader(
+        "Pilih file Excel/CSV per toko atau arsip ZIP",
+        type=['xlsx', 'xls', 'csv', 'zip'],
+        accept_multiple_files=True,
+        help="Setiap file harus berisi kolom: MINGGU, TANGGAL, KATEGORI, NAMA BARANG, SATUAN, STOK AWAL, JUMLAH TERJUAL, STOK AKHIR"
+    )
+    
+    sources = []
+    if uploaded_files:
+        try:
+            sources = expand_sources([(f.name, f.getvalue()) for f in uploaded_files])
+        except Exception as e:
+            st.error(f"❌ Error membaca file: {str(e)}")
+        if not sources:
+            st.warning("⚠️ Tidak ada file .csv/.xlsx/.xls yang bisa diproses")
+    
+    if sources:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("🏬 Jumlah Toko", len(sources))
+        with col2:
+            workers = st.number_input(
+                "⚙️ Jumlah worker paralel",
+                min_value=1, max_value=len(sources), value=default_workers(len(sources)),
+                help="Default: jumlah core CPU yang tersedia (maksimal satu worker per toko)"
+            )
+        
+        if st.button("🚀 Proses Semua Toko", type="primary"):
+            model = load_model()
+            if model is not None:
+                progress_bar = st.progress(0.0, text="⏳ Memproses toko...")
+                
+                def show_progress(done, total, store_result):
+                    status = "✅" if store_result.ok else "❌"
+                    progress_bar.progress(done / total, text=f"{status} {store_result.store} selesai ({done}/{total})")
+                
+                # Semua worker memakai satu model yang sama (forest terkompilasi dari registry)
+                with profile_run('batch', session_id=st.session_state.session_id,
+                                 stores=len(sources), workers=int(workers)) as profile:
+                    store_results = run_batch(sources, model=model, workers=int(workers), progress=show_progress)
+                    failed = sum(not r.ok for r in store_results)
+                    if failed:
+                        profile.error = f"{failed} toko gagal"
+                remember_run(profile)
+                
+                st.session_state.batch = {
+                    'version': uuid.uuid4().hex,
+                    'stores': store_results,
+                    'combined': combine_results(store_results),
+                    'seconds': profile.seconds,
+                }
+    
+    batch = st.session_state.batch
+    if batch is not None:
+        store_results = batch['stores']
+        combined = batch['combined']
+        n_ok = sum(r.ok for r in store_results)
+        
+        if n_ok == len(store_results):
+            st.success(f"✅ {n_ok} toko selesai diproses dalam {batch['seconds']:.2f} detik")
+        else:
+            st.warning(f"⚠️ {n_ok} dari {len(store_results)} toko berhasil diproses ({batch['seconds']:.2f} detik)")
+        
+        summary = store_summary(store_results)
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("🏬 Toko Berhasil", f"{n_ok}/{len(store_results)}")
+        with col2:
+            st.metric("📦 Total Barang", int(summary['BARANG'].sum()))
+        with col3:
+            st.metric("🔢 Total Restock", int(summary['TOTAL_RESTOCK'].sum()))
+        with col4:
+            st.metric("⚠️ Barang Kritis", int(summary['BARANG_KRITIS'].sum()))
+        
+        st.markdown("### 📋 Ringkasan per Toko")
+        st.dataframe(summary, hide_index=True, use_container_width=True)
+        
+        if combined is not None:
+            fig = px.bar(
+                summary[summary['BARANG'] > 0],
+                x='TOKO', y='TOTAL_RESTOCK',
+                title="🏬 Total Rekomendasi Restock per Toko",
+                color='TOTAL_RESTOCK',
+                color_continuous_scale='viridis'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.markdown("### 🛍️ Ringkasan Gabungan per Barang")
+            st.dataframe(item_summary(combined), hide_index=True, use_container_width=True)
+            
+            st.markdown("### 🔍 Detail per Toko")
+            ok_stores = [r for r in store_results if r.ok]
+            selected = st.selectbox("Pilih toko:", range(len(ok_stores)), format_func=lambda idx: ok_stores[idx].store)
+            st.dataframe(ok_stores[selected].results, use_container_width=True)
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                export_data = get_export_cache().get_or_build(batch['version'], 'csv', combined)
+                st.download_button(
+                    label="📥 Download Hasil Gabungan (CSV)",
+                    data=export_data,
+                    file_name=f"prediksi_restock_multi_toko_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime='text/csv'
+                )
+            with col2:
+                if st.button("📊 Gunakan Hasil Gabungan di Analisis & Download"):
+                    st.session_state.prediction_results = combined
+                    st.session_state.results_version = batch['version']
+                    # Feature per toko tidak digabung: update inkremental dan proyeksi tetap per upload tunggal
+                    st.session_state.feature_state = None
+                    st.session_state.forecast = None
+                    st.success("✅ Hasil gabungan siap di menu Analisis dan Download Hasil")
+
+# Menu Latih Ulang Model
+elif menu == "🧠 Latih Ulang Model":
+    st.markdown("### 🧠 Latih Ulang Model")
+    st.info("💡 Model dilatih dari histori yang di-upload dengan target RESTOCK_NEEDED (penjualan minggu depan − STOK AKHIR). Training berjalan di background memakai semua core CPU; aplikasi tetap bisa dipakai.")
+    
+    manager = get_retrain_manager()
+    job = manager.job
+    
+    # Info model aktif
+    info = get_registry().get(MODEL_PATH)
+    training_info = info.artifact.get(TRAINING_KEY) if isinstance(info.artifact, dict) else None
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("🌲 Jumlah Pohon", len(info.model.estimators_) if hasattr(info.model, 'estimators_') else "-")
+    with col2:
+        trained_until = pd.Timestamp(training_info['trained_until']).strftime('%d/%m/%Y') if training_info else "-"
+        st.metric("📅 Data Training Sampai", trained_until)
+    with col3:
+        st.metric("🔑 Versi Model", info.sha256[:12])
+    
+    if st.session_state.uploaded_data is None:
+        st.warning("⚠️ Silakan upload histori penjualan terlebih dahulu di menu Upload Data")
+    elif job is None or not job.running:
+        mode = st.radio(
+            "Mode training:",
+            ['full', 'warm_start'],
+            format_func=lambda m: {
+                'full': "🔁 Latih ulang penuh",
+                'warm_start': "🌱 Tambah pohon untuk minggu baru (warm start)",
+            }[m],
+            horizontal=True
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            holdout_weeks = st.slider("🧪 Minggu holdout (evaluasi)", 1, 12, DEFAULT_HOLDOUT_WEEKS,
+                                      help="Minggu terakhir yang tidak dipakai training untuk mengukur error")
+        with col2:
+            add_trees = st.number_input("🌲 Pohon tambahan", min_value=1, max_value=500, value=DEFAULT_ADD_TREES,
+                                        disabled=mode != 'warm_start',
+                                        help="Hanya untuk warm start: pohon baru dilatih dari minggu setelah data training model aktif")
+        auto_activate = st.checkbox("✅ Pasang otomatis jika error holdout tidak lebih buruk dari model aktif", value=True)
+        
+        if st.button("🚀 Mulai Training", type="primary"):
+            if st.session_state.uploaded_data.key.startswith(HISTORY_KEY_PREFIX):
+                # Dataset aktif hanya berisi baris terakhir per barang; training memakai seluruh histori
+                df = get_history_store().load()
+            else:
+                df = load_uploaded_data()
+            if df is None:
+                st.error("❌ Dataset sudah tidak ada di cache. Silakan upload ulang di menu Upload Data")
+            else:
+                options = {'holdout_weeks': holdout_weeks, 'auto_activate': auto_activate}
+                if mode == 'warm_start':
+                    options['add_trees'] = int(add_trees)
+                job, success, message = manager.start(df, MODEL_PATH, mode=mode, **options)
+                if success:
+                    st.success(f"✅ {message}")
+                else:
+                    st.warning(f"⚠️ {message}")
+    
+    if job is not None:
+        st.markdown("### 📋 Status Training")
+        elapsed = (job.finished_at or time.time()) - job.started_at
+        if job.running:
+            st.info(f"⏳ {job.message} ({elapsed:.0f} detik)")
+            st.button("🔄 Perbarui Status")
+        elif job.status == 'gagal':
+            st.error(f"❌ {job.error}")
+        else:
+            result = job.result
+            if result.activated:
+                st.success(f"✅ {job.message} ({result.n_trees} pohon, {elapsed:.1f} detik)")
+            else:
+                st.warning(f"⚠️ {job.message} ({result.n_trees} pohon, {elapsed:.1f} detik)")
+            
+            metrics = pd.DataFrame({
+                'Model': ["🆕 Kandidat", "📦 Model aktif sebelumnya" if result.activated else "📦 Model aktif"],
+                'MAE': [result.candidate_metrics['mae'], result.active_metrics['mae']],
+                'RMSE': [result.candidate_metrics['rmse'], result.active_metrics['rmse']],
+                'R²': [result.candidate_metrics['r2'], result.active_metrics['r2']],
+            })
+            st.dataframe(metrics, hide_index=True, use_container_width=True)
+            st.caption(
+                f"🧪 Holdout: {result.holdout_rows:,} baris • 🏋️ Training evaluasi: {result.train_rows:,} baris • "
+                f"📦 Training akhir: {result.fit_rows:,} baris • 📅 Data sampai {result.trained_until}. "
+                "Model aktif bisa saja sudah pernah melihat minggu holdout."
+            )
+            
+            if not result.activated and os.path.exists(result.candidate_path):
+                if st.button("✅ Pasang Model Kandidat"):
+                    activate_model(result.candidate_path, MODEL_PATH)
+                    result.activated = True
+                    st.success("✅ Model kandidat dipasang. Prediksi berikutnya memakai model baru.")
 
 # Menu Analisis
 elif menu == "📊 Analisis":
@@ -395,50 +777,37 @@ elif menu == "📊 Analisis":
         st.warning("⚠️ Belum ada hasil prediksi. Silakan lakukan prediksi terlebih dahulu.")
     else:
         results = st.session_state.prediction_results
+        version = st.session_state.results_version or id(results)
+        
+        # Agregat dan figure dihitung sekali per versi hasil prediksi
+        analysis_cache = get_analysis_cache()
+        summary = analysis_cache.summary(version, results)
+        
+        scatter_mode = 'auto'
+        if summary['n_items'] > SVG_MAX_POINTS:
+            scatter_mode = st.radio(
+                "Tampilan scatter:",
+                list(SCATTER_MODES),
+                format_func=SCATTER_MODES.get,
+                index=1,
+                horizontal=True,
+                help=f"Lebih dari {SVG_MAX_POINTS:,} barang: scatter dirender dengan WebGL dari sampel, atau diringkas menjadi heatmap"
+            )
+        fig1, fig2, fig3, scatter_note = analysis_cache.figures(version, results, scatter_mode)
         
         # Chart 1: Rekomendasi Restock per Kategori
         st.markdown("#### 📊 Rekomendasi Restock per Kategori")
-        kategori_summary = results.groupby('KATEGORI')['REKOMENDASI_RESTOCK'].sum().reset_index()
-        
-        fig1 = px.bar(
-            kategori_summary, 
-            x='KATEGORI', 
-            y='REKOMENDASI_RESTOCK',
-            title="Total Rekomendasi Restock per Kategori",
-            color='REKOMENDASI_RESTOCK',
-            color_continuous_scale='Viridis'
-        )
-        fig1.update_layout(height=400)
         st.plotly_chart(fig1, use_container_width=True)
         
         # Chart 2: Top 10 Barang dengan Restock Tertinggi
         st.markdown("#### 🔝 Top 10 Barang dengan Rekomendasi Restock Tertinggi")
-        top_items = results.nlargest(10, 'REKOMENDASI_RESTOCK')
-        
-        fig2 = px.bar(
-            top_items,
-            x='REKOMENDASI_RESTOCK',
-            y='NAMA BARANG',
-            orientation='h',
-            title="Top 10 Barang - Rekomendasi Restock",
-            color='REKOMENDASI_RESTOCK',
-            color_continuous_scale='Reds'
-        )
-        fig2.update_layout(height=500)
         st.plotly_chart(fig2, use_container_width=True)
         
         # Chart 3: Scatter Plot Stok vs Rekomendasi
         st.markdown("#### 🎯 Hubungan Stok Akhir vs Rekomendasi Restock")
-        fig3 = px.scatter(
-            results,
-            x='STOK AKHIR',
-            y='REKOMENDASI_RESTOCK',
-            color='KATEGORI',
-            hover_data=['NAMA BARANG', 'JUMLAH TERJUAL'],
-            title="Stok Akhir vs Rekomendasi Restock"
-        )
-        fig3.update_layout(height=400)
         st.plotly_chart(fig3, use_container_width=True)
+        if scatter_note:
+            st.caption(f"📉 {scatter_note}")
         
         # Insight
         st.markdown("#### 💡 Insights")
@@ -446,23 +815,107 @@ elif menu == "📊 Analisis":
         
         with col1:
             st.markdown("**📈 Kategori dengan Restock Tertinggi:**")
-            top_kategori = kategori_summary.loc[kategori_summary['REKOMENDASI_RESTOCK'].idxmax(), 'KATEGORI']
-            st.success(f"🏆 {top_kategori}")
+            st.success(f"🏆 {summary['top_kategori']}")
             
             st.markdown("**⚠️ Barang Kritis (Restock > 50):**")
-            critical_items = len(results[results['REKOMENDASI_RESTOCK'] > 50])
-            st.warning(f"📦 {critical_items} barang")
+            st.warning(f"📦 {summary['critical_items']} barang")
         
         with col2:
             st.markdown("**💰 Estimasi Total Investasi:**")
             # Asumsi harga rata-rata per unit (bisa disesuaikan)
-            avg_price = 10000  # 10rb per unit
-            total_investment = results['REKOMENDASI_RESTOCK'].sum() * avg_price
+            avg_price = DEFAULT_UNIT_PRICE  # 10rb per unit
+            total_investment = summary['total_restock'] * avg_price
             st.info(f"💵 Rp {total_investment:,.0f}")
             
             st.markdown("**📊 Efisiensi Stok:**")
-            efficient_items = len(results[results['REKOMENDASI_RESTOCK'] <= 10])
-            st.success(f"✅ {efficient_items} barang efisien")
+            st.success(f"✅ {summary['efficient_items']} barang efisien")
+        
+        # Simulasi what-if: sebaran permintaan dari prediksi tiap pohon
+        st.markdown("#### 🧪 Simulasi What-If Persediaan")
+        st.caption("Prediksi setiap pohon RandomForest dipakai sebagai sebaran permintaan minggu depan; semua barang x skenario dihitung sekaligus.")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            safety_weeks = st.multiselect("🛡️ Stok pengaman (minggu)", [0.0, 0.25, 0.5, 1.0, 1.5, 2.0], default=list(DEFAULT_SAFETY_WEEKS))
+        with col2:
+            lead_weeks = st.multiselect("🚚 Lead time (minggu)", [0, 1, 2, 3, 4, 6, 8], default=list(DEFAULT_LEAD_WEEKS))
+        with col3:
+            price_factors = st.multiselect("🏷️ Faktor harga", [0.8, 0.9, 1.0, 1.1, 1.2, 1.5], default=list(DEFAULT_PRICE_FACTORS))
+        col1, col2 = st.columns(2)
+        with col1:
+            unit_price = st.number_input("💵 Harga satuan rata-rata (Rp)", min_value=0, value=DEFAULT_UNIT_PRICE, step=1000)
+        with col2:
+            elasticity = st.number_input(
+                "📉 Elastisitas permintaan terhadap harga", value=0.0, step=0.1,
+                help="0 = harga tidak memengaruhi permintaan; -1 = harga naik 10% menurunkan permintaan sekitar 10%"
+            )
+        
+        if st.button("▶️ Jalankan Simulasi", type="primary"):
+            model = load_model()
+            if not (safety_weeks and lead_weeks and price_factors):
+                st.warning("⚠️ Pilih minimal satu nilai untuk setiap parameter skenario")
+            elif model is not None:
+                scenarios = scenario_grid(safety_weeks, lead_weeks, price_factors)
+                with st.spinner(f"🔄 Mensimulasikan {len(scenarios)} skenario..."):
+                    with profile_run('simulasi', session_id=st.session_state.session_id,
+                                     items=len(results), scenarios=len(scenarios)) as profile:
+                        per_item, per_kategori, per_scenario, success, message = simulate(
+                            results, model, scenarios, unit_price=unit_price, elasticity=elasticity
+                        )
+                        if not success:
+                            profile.error = message
+                    remember_run(profile)
+                if success:
+                    st.session_state.simulation = {
+                        'version': version,
+                        'id': uuid.uuid4().hex,
+                        'per_item': per_item,
+                        'per_kategori': per_kategori,
+                        'per_scenario': per_scenario,
+                    }
+                    st.success(f"✅ {message}")
+                else:
+                    st.error(f"❌ {message}")
+        
+        simulation = st.session_state.simulation
+        if simulation is not None and simulation['version'] == version:
+            per_scenario = simulation['per_scenario']
+            
+            fig = px.scatter(
+                per_scenario,
+                x='INVESTASI', y='PELUANG_STOCKOUT_RATA2',
+                color=per_scenario['LEAD_TIME_MINGGU'].astype(str),
+                size=per_scenario['STOK_PENGAMAN_MINGGU'] + 0.25,
+                hover_data=['SKENARIO', 'STOK_PENGAMAN_MINGGU', 'FAKTOR_HARGA', 'BARANG_BERISIKO'],
+                title="💹 Investasi vs Rata-rata Peluang Stockout per Skenario",
+                labels={'color': 'Lead time (minggu)', 'PELUANG_STOCKOUT_RATA2': 'Peluang stockout rata-rata'}
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(per_scenario, hide_index=True, use_container_width=True)
+            st.caption(f"⚠️ BARANG_BERISIKO = peluang stockout > {RISK_THRESHOLD:.0%}")
+            
+            scenario_labels = {
+                row.SKENARIO: f"#{row.SKENARIO} • pengaman {row.STOK_PENGAMAN_MINGGU:g} mgg • lead {row.LEAD_TIME_MINGGU:g} mgg • harga x{row.FAKTOR_HARGA:g}"
+                for row in per_scenario.itertuples()
+            }
+            selected = st.selectbox("🔍 Detail skenario:", list(scenario_labels), format_func=scenario_labels.get)
+            per_kategori = simulation['per_kategori']
+            st.markdown("**📂 Per Kategori**")
+            st.dataframe(per_kategori[per_kategori['SKENARIO'] == selected], hide_index=True, use_container_width=True)
+            
+            per_item = simulation['per_item']
+            st.markdown("**📦 Barang dengan Peluang Stockout Tertinggi**")
+            st.dataframe(
+                per_item[per_item['SKENARIO'] == selected].nlargest(20, 'PELUANG_STOCKOUT'),
+                hide_index=True, use_container_width=True
+            )
+            
+            export_data = get_export_cache().get_or_build(('simulasi', simulation['id']), 'csv', per_item)
+            st.download_button(
+                label="📥 Download Hasil Simulasi per Barang (CSV)",
+                data=export_data,
+                file_name=f"simulasi_restock_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime='text/csv'
+            )
 
 # Menu Download
 elif menu == "💾 Download Hasil":
@@ -476,42 +929,43 @@ elif menu == "💾 Download Hasil":
         st.markdown("### 📊 Preview Hasil Download")
         st.dataframe(results, use_container_width=True)
         
+        # File export dibuat hanya saat diminta, lalu di-cache per versi hasil prediksi
+        export_cache = get_export_cache()
         col1, col2 = st.columns(2)
         
         with col1:
-            # Download Excel
-            from io import BytesIO
-            
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                results.to_excel(writer, sheet_name='Prediksi_Restock', index=False)
-            
-            excel_data = output.getvalue()
-            
-            st.download_button(
-                label="📊 Download Excel (.xlsx)",
-                data=excel_data,
-                file_name=f"prediksi_restock_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            export_format = st.selectbox(
+                "Format file:",
+                list(EXPORT_FORMATS),
+                format_func=lambda fmt: EXPORT_FORMATS[fmt][0]
             )
         
+        label, extension, mime = EXPORT_FORMATS[export_format]
+        export_data = export_cache.peek(st.session_state.results_version, export_format)
+        
         with col2:
-            # Download CSV
-            csv_data = results.to_csv(index=False)
+            if export_data is None and st.button("⚙️ Siapkan File", type="primary"):
+                with st.spinner("🔄 Menyiapkan file..."):
+                    with profile_run('export', session_id=st.session_state.session_id,
+                                     format=export_format, rows=len(results)) as profile:
+                        export_data = export_cache.get_or_build(st.session_state.results_version, export_format, results)
+                    remember_run(profile)
             
-            st.download_button(
-                label="📄 Download CSV",
-                data=csv_data,
-                file_name=f"prediksi_restock_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
-            )
-        
-        st.markdown("""
-        <div class="success-box">
-            <h4>✅ File Siap Download!</h4>
-            <p>Hasil prediksi telah disiapkan dalam format Excel dan CSV. Klik tombol di atas untuk mendownload.</p>
-        </div>
-        """, unsafe_allow_html=True)
+            if export_data is not None:
+                st.download_button(
+                    label=f"Download {label}",
+                    data=export_data,
+                    file_name=f"prediksi_restock_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+                    mime=mime
+                )
+        
+        if export_data is not None:
+            st.markdown(f"""
+            <div class="success-box">
+                <h4>✅ File Siap Download!</h4>
+                <p>Hasil prediksi telah disiapkan dalam format {label} ({format_bytes(len(export_data))}). Klik tombol di atas untuk mendownload.</p>
+            </div>
+            """, unsafe_allow_html=True)
         
         # Statistik final
         st.markdown("### 📈 Ringkasan Hasil")
@@ -527,6 +981,31 @@ elif menu == "💾 Download Hasil":
             avg_restock = results['REKOMENDASI_RESTOCK'].mean()
             st.metric("📊 Rata-rata Restock", f"{avg_restock:.1f}")
 
+# Panel performa (dirender setelah menu agar run yang baru selesai ikut tampil)
+with st.sidebar:
+    st.markdown("---")
+    if st.checkbox("⏱️ Tampilkan panel performa", help="Waktu, jumlah baris dan perubahan memori per tahap pipeline"):
+        if not st.session_state.perf_runs:
+            st.caption("Belum ada run yang tercatat di session ini.")
+        for run in reversed(st.session_state.perf_runs):
+            status = "✅" if run['ok'] else "❌"
+            with st.expander(f"{status} {run['run']} • {run['seconds'] * 1000:,.0f} ms", expanded=run is st.session_state.perf_runs[-1]):
+                st.caption(
+                    f"🕒 {run['started_at']} • 💾 RSS {format_bytes(run['rss_end_bytes'])} "
+                    f"(Δ {format_bytes(run['rss_end_bytes'] - run['rss_start_bytes'])})"
+                )
+                if run['stages']:
+                    st.dataframe(pd.DataFrame([{
+                        'Tahap': '\u2003' * stage['depth'] + stage['stage'],
+                        'ms': round(stage['seconds'] * 1000, 1),
+                        'Panggilan': stage['calls'],
+                        'Baris masuk': stage['rows_in'],
+                        'Baris keluar': stage['rows_out'],
+                        'Δ Memori': format_bytes(stage['rss_delta_bytes']),
+                    } for stage in run['stages']]), hide_index=True, use_container_width=True)
+                if run['error']:
+                    st.error(run['error'])
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -0,0 +1 @@
+"""Modul inti Sistem Prediksi Restock Barang (tanpa ketergantungan Streamlit)."""
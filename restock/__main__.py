@@ -0,0 +1,7 @@
+import sys
+
+from .cli import main
+
+if __name__ == '__main__':
+    # Guard: worker ProcessPoolExecutor (spawn/forkserver) mengimpor ulang modul ini
+    sys.exit(main())
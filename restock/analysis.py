@@ -0,0 +1,191 @@
+"""Ringkasan dan grafik halaman Analisis yang siap untuk puluhan ribu barang.
+
+Agregat (per kategori, top-N, jumlah barang kritis/efisien) dihitung sekali per
+versi hasil prediksi, begitu juga objek figure plotly. Scatter besar dirender
+dengan WebGL (Scattergl) dan dapat di-downsample atau di-binning di server
+sehingga browser tidak menerima setiap baris.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+TOP_N = 10
+CRITICAL_THRESHOLD = 50
+EFFICIENT_THRESHOLD = 10
+
+# Di atas batas ini scatter memakai WebGL dan tanpa hover per barang
+SVG_MAX_POINTS = 5_000
+# Jumlah titik maksimum yang dikirim ke browser pada mode sampel
+SAMPLE_MAX_POINTS = 20_000
+HEATMAP_BINS = 80
+
+SCATTER_MODES = {
+    'auto': "Otomatis",
+    'sample': "Sampel (WebGL)",
+    'bin': "Binning (heatmap)",
+}
+
+CACHE_MAX_ENTRIES = 16
+
+
+def summarize(results, top_n=TOP_N):
+    """Agregat untuk halaman Analisis dari hasil prediksi"""
+    restock = results['REKOMENDASI_RESTOCK']
+    kategori_summary = results.groupby('KATEGORI', observed=True)['REKOMENDASI_RESTOCK'].sum().reset_index()
+
+    return {
+        'kategori_summary': kategori_summary,
+        'top_items': results.nlargest(top_n, 'REKOMENDASI_RESTOCK'),
+        'top_kategori': kategori_summary.loc[kategori_summary['REKOMENDASI_RESTOCK'].idxmax(), 'KATEGORI'],
+        'critical_items': int((restock > CRITICAL_THRESHOLD).sum()),
+        'efficient_items': int((restock <= EFFICIENT_THRESHOLD).sum()),
+        'total_restock': int(restock.sum()),
+        'n_items': len(results),
+    }
+
+
+def sample_points(results, max_points=SAMPLE_MAX_POINTS, keep_top=TOP_N * 10, seed=0):
+    """Sampel acak berstrata per kategori; barang dengan restock tertinggi selalu ikut"""
+    if len(results) <= max_points:
+        return results
+
+    top = results.nlargest(keep_top, 'REKOMENDASI_RESTOCK')
+    rest = results.drop(index=top.index)
+    fraction = (max_points - len(top)) / len(rest)
+    sampled = rest.groupby('KATEGORI', observed=True, group_keys=False).sample(frac=fraction, random_state=seed)
+    return pd.concat([top, sampled])
+
+
+def category_bar(kategori_summary):
+    fig = px.bar(
+        kategori_summary,
+        x='KATEGORI',
+        y='REKOMENDASI_RESTOCK',
+        title="Total Rekomendasi Restock per Kategori",
+        color='REKOMENDASI_RESTOCK',
+        color_continuous_scale='Viridis'
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+def top_items_bar(top_items, top_n=TOP_N):
+    fig = px.bar(
+        top_items,
+        x='REKOMENDASI_RESTOCK',
+        y='NAMA BARANG',
+        orientation='h',
+        title=f"Top {top_n} Barang - Rekomendasi Restock",
+        color='REKOMENDASI_RESTOCK',
+        color_continuous_scale='Reds'
+    )
+    fig.update_layout(height=500)
+    return fig
+
+
+def stock_scatter(results, mode='auto'):
+    """Scatter Stok Akhir vs Rekomendasi; return (figure, keterangan)"""
+    n_points = len(results)
+    title = "Stok Akhir vs Rekomendasi Restock"
+
+    if mode == 'auto' and n_points <= SVG_MAX_POINTS:
+        fig = px.scatter(
+            results,
+            x='STOK AKHIR',
+            y='REKOMENDASI_RESTOCK',
+            color='KATEGORI',
+            hover_data=['NAMA BARANG', 'JUMLAH TERJUAL'],
+            title=title
+        )
+        note = None
+
+    elif mode == 'bin':
+        # Histogram 2D dihitung di server, browser hanya menerima grid hitungan
+        x = results['STOK AKHIR'].to_numpy(dtype=float)
+        y = results['REKOMENDASI_RESTOCK'].to_numpy(dtype=float)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        counts, x_edges, y_edges = np.histogram2d(x[valid], y[valid], bins=HEATMAP_BINS)
+        fig = go.Figure(go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=np.where(counts.T > 0, counts.T, np.nan),
+            colorscale='Viridis',
+            colorbar={'title': 'Jumlah barang'},
+            hovertemplate='Stok Akhir %{x:.0f}<br>Rekomendasi %{y:.0f}<br>%{z:.0f} barang<extra></extra>',
+        ))
+        fig.update_layout(title=title, xaxis_title='STOK AKHIR', yaxis_title='REKOMENDASI_RESTOCK')
+        note = f"Heatmap {HEATMAP_BINS}×{HEATMAP_BINS} dari {n_points:,} barang"
+
+    else:
+        points = sample_points(results)
+        fig = px.scatter(
+            points,
+            x='STOK AKHIR',
+            y='REKOMENDASI_RESTOCK',
+            color='KATEGORI',
+            hover_name='NAMA BARANG',
+            render_mode='webgl',
+            title=title
+        )
+        note = f"WebGL • {len(points):,} dari {n_points:,} barang ditampilkan"
+
+    fig.update_layout(height=400)
+    return fig, note
+
+
+class AnalysisCache:
+    """Cache ringkasan dan figure per versi hasil prediksi"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_or_build(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def summary(self, version, results):
+        return self._get_or_build((version, 'summary'), lambda: summarize(results))
+
+    def figures(self, version, results, scatter_mode='auto'):
+        """(fig kategori, fig top-N, fig scatter, keterangan scatter)"""
+        summary = self.summary(version, results)
+
+        def build():
+            scatter, note = stock_scatter(results, scatter_mode)
+            return (
+                category_bar(summary['kategori_summary']),
+                top_items_bar(summary['top_items']),
+                scatter,
+                note,
+            )
+
+        return self._get_or_build((version, 'figures', scatter_mode), build)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_analysis_cache():
+    """Cache analisis tunggal untuk seluruh proses"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnalysisCache()
+    return _cache
@@ -0,0 +1,273 @@
+"""Mode batch multi-toko: banyak file (atau arsip .zip) diproses paralel.
+
+Satu file = satu toko; nama toko diambil dari nama file tanpa ekstensi. Setiap
+toko melewati jalur yang sama dengan upload tunggal (read_checked ->
+run_pipeline), dijalankan oleh worker pool:
+
+- Thread (default, juga di CLI): semua worker memakai satu objek model yang
+  sama. Forest terkompilasi hanya membaca array numpy, dan parsing pyarrow serta
+  operasi numpy/pandas melepas GIL sehingga CSV berskala dengan jumlah core.
+- Proses (``processes=True``): proses utama menyiapkan forest terkompilasi
+  sekali, lalu tiap worker hanya me-memory-map file ``.npy``-nya (tanpa
+  unpickle model sklearn) sehingga halaman memorinya dipakai bersama antar
+  proses. Cocok untuk banyak .xlsx (openpyxl terikat GIL).
+
+Hasil dikembalikan per toko (urutan input) ditambah ringkasan gabungan.
+"""
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from .dtypes import compact_frame
+from .ingest import read_checked
+from .model_registry import MODEL_PATH
+from .pipeline import load_model, run_pipeline
+
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+STORE_SUMMARY_COLUMNS = ['TOKO', 'STATUS', 'BARANG', 'TOTAL_RESTOCK', 'BARANG_KRITIS', 'DETIK', 'PESAN']
+
+
+@dataclass
+class StoreSource:
+    """Satu file toko: path di disk, anggota zip di disk, atau isi bytes (upload)"""
+    store: str
+    name: str
+    path: str = None
+    member: str = None
+    data: bytes = field(default=None, repr=False)
+
+    def open(self):
+        """Path atau file-like yang bisa dibaca ingest"""
+        if self.data is not None:
+            return io.BytesIO(self.data)
+        if self.member is not None:
+            with zipfile.ZipFile(self.path) as archive:
+                return io.BytesIO(archive.read(self.member))
+        return self.path
+
+
+@dataclass
+class StoreResult:
+    """Hasil satu toko; ``results`` None jika gagal"""
+    store: str
+    name: str
+    ok: bool
+    message: str
+    results: pd.DataFrame = field(default=None, repr=False)
+    forecast: pd.DataFrame = field(default=None, repr=False)
+    rows: int = 0
+    seconds: float = 0.0
+
+
+def default_workers(n_sources):
+    """Jumlah worker: core yang tersedia untuk proses ini, maksimal satu per toko"""
+    cores = getattr(os, 'process_cpu_count', os.cpu_count)() or 1
+    return max(1, min(cores, n_sources))
+
+
+def store_name(filename):
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def _is_store_file(member):
+    """Anggota zip yang diproses: file data, bukan folder/metadata macOS/file tersembunyi"""
+    base = os.path.basename(member)
+    return (
+        not member.endswith('/') and not member.startswith('__MACOSX/')
+        and not base.startswith('.') and base.lower().endswith(SUPPORTED_EXTENSIONS)
+    )
+
+
+def expand_sources(items):
+    """Daftar StoreSource dari path atau pasangan (nama, bytes); .zip dibuka per anggota
+
+    Nama toko yang sama (mis. ``a/toko.csv`` dan ``b/toko.csv`` di zip) diberi
+    akhiran ``(2)``, ``(3)``, ... agar hasil per toko tidak saling menimpa.
+    """
+    sources = []
+    for item in items:
+        if isinstance(item, (tuple, list)):
+            name, data = item
+            path = None
+        else:
+            name, data, path = os.path.basename(item), None, item
+
+        if not name.lower().endswith('.zip'):
+            sources.append(StoreSource(store_name(name), name, path=path, data=data))
+            continue
+
+        with zipfile.ZipFile(io.BytesIO(data) if data is not None else path) as archive:
+            for member in sorted(m for m in archive.namelist() if _is_store_file(m)):
+                member_name = os.path.basename(member)
+                if data is not None:
+                    # Zip hasil upload sudah di memori: simpan isi per anggota
+                    sources.append(StoreSource(store_name(member_name), member_name, data=archive.read(member)))
+                else:
+                    # Zip di disk: anggota dibaca oleh worker agar tidak dikirim antar proses
+                    sources.append(StoreSource(store_name(member_name), member_name, path=path, member=member))
+
+    seen = {}
+    for source in sources:
+        count = seen[source.store] = seen.get(source.store, 0) + 1
+        if count > 1:
+            source.store = f"{source.store} ({count})"
+    return sources
+
+
+def process_store(source, model, strict=False, weeks=1):
+    """Baca, validasi dan prediksi satu toko; selalu return StoreResult (tidak raise)"""
+    start = time.perf_counter()
+
+    def result(ok, message, **kwargs):
+        return StoreResult(source.store, source.name, ok, message, seconds=time.perf_counter() - start, **kwargs)
+
+    if not source.name.lower().endswith(SUPPORTED_EXTENSIONS):
+        return result(False, f"Format file tidak didukung: {source.name}")
+
+    try:
+        df, report = read_checked(source.open(), name=source.name, strict=strict)
+    except Exception as e:
+        return result(False, f"Error membaca file: {str(e)}")
+    if df is None:
+        return result(False, report.message() if not report.is_valid else "File kosong", rows=report.n_rows)
+
+    results, success, message = run_pipeline(df, model, validate=False)
+    if not success:
+        return result(False, message, rows=report.n_rows)
+
+    message = f"{len(results)} barang"
+    if report.n_errors:
+        message += f" • {report.message()}"
+
+    forecast = None
+    if weeks > 1:
+        from .forecast import forecast_horizon
+        forecast, success, forecast_message = forecast_horizon(results, model, weeks)
+        if not success:
+            return result(False, forecast_message, rows=report.n_rows)
+
+    return result(True, message, results=results, forecast=forecast, rows=report.n_rows)
+
+
+# Model per proses worker (diisi initializer ProcessPoolExecutor)
+_worker_model = None
+
+
+def _init_worker(model_path, forest_dir):
+    """Model worker: forest terkompilasi di-mmap; model sklearn baru dimuat jika dibutuhkan"""
+    global _worker_model
+    if forest_dir is not None:
+        from .forest import CompiledForest, ForestPredictor
+        # sklearn hanya di-unpickle jika worker mendapat batch besar (lihat ForestPredictor)
+        _worker_model = ForestPredictor(CompiledForest.load(forest_dir), model_path)
+    else:
+        _worker_model = load_model(model_path)
+
+
+def _process_in_worker(source, strict, weeks):
+    return process_store(source, _worker_model, strict, weeks)
+
+
+def run_batch(sources, model=None, model_path=MODEL_PATH, workers=None, processes=False,
+              strict=False, weeks=1, progress=None):
+    """Proses semua toko dengan worker pool; return list StoreResult sesuai urutan input
+
+    ``progress(selesai, total, store_result)`` dipanggil di thread pemanggil setiap
+    kali satu toko selesai (urutan selesai, bukan urutan input). ``workers=None``
+    memakai semua core yang tersedia.
+    """
+    total = len(sources)
+    workers = default_workers(total) if workers is None else max(1, min(int(workers), max(total, 1)))
+    if model is None and not (processes and workers > 1):
+        model = load_model(model_path)
+
+    results = [None] * total
+    completed = 0
+
+    def finish(index, store_result):
+        nonlocal completed
+        results[index] = store_result
+        completed += 1
+        if progress is not None:
+            progress(completed, total, store_result)
+
+    if workers == 1:
+        for index, source in enumerate(sources):
+            finish(index, process_store(source, model, strict, weeks))
+        return results
+
+    if processes:
+        from .forest import compiled_forest_dir
+        forest_dir = compiled_forest_dir(model_path)
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path, forest_dir))
+    else:
+        executor = ThreadPoolExecutor(workers, thread_name_prefix='restock-batch')
+
+    with executor:
+        futures = {}
+        for index, source in enumerate(sources):
+            if processes:
+                future = executor.submit(_process_in_worker, source, strict, weeks)
+            else:
+                future = executor.submit(process_store, source, model, strict, weeks)
+            futures[future] = index
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                store_result = future.result()
+            except Exception as e:
+                # Worker mati (mis. kehabisan memori) tidak menggagalkan toko lain
+                source = sources[index]
+                store_result = StoreResult(source.store, source.name, False, f"Error worker: {str(e)}")
+            finish(index, store_result)
+    return results
+
+
+def combine_results(store_results):
+    """Gabungkan hasil semua toko yang berhasil; kolom TOKO di depan"""
+    frames = [r.results.assign(TOKO=r.store) for r in store_results if r.ok]
+    if not frames:
+        return None
+    combined = pd.concat(frames, ignore_index=True)
+    combined.insert(0, 'TOKO', combined.pop('TOKO').astype('category'))
+    for col in ['KATEGORI', 'NAMA BARANG', 'SATUAN']:
+        # Kategori tiap toko berbeda sehingga concat menghasilkan object; ringkas lagi
+        if col in combined.columns and not isinstance(combined[col].dtype, pd.CategoricalDtype):
+            combined[col] = combined[col].astype('category')
+    return compact_frame(combined)
+
+
+def store_summary(store_results):
+    """Satu baris per toko: status, jumlah barang, total restock, barang kritis, waktu"""
+    from .analysis import CRITICAL_THRESHOLD
+
+    rows = []
+    for r in store_results:
+        restock = r.results['REKOMENDASI_RESTOCK'] if r.ok else None
+        rows.append({
+            'TOKO': r.store,
+            'STATUS': "✅ OK" if r.ok else "❌ Gagal",
+            'BARANG': len(r.results) if r.ok else 0,
+            'TOTAL_RESTOCK': int(restock.sum()) if r.ok else 0,
+            'BARANG_KRITIS': int((restock > CRITICAL_THRESHOLD).sum()) if r.ok else 0,
+            'DETIK': round(r.seconds, 2),
+            'PESAN': r.message,
+        })
+    return pd.DataFrame(rows, columns=STORE_SUMMARY_COLUMNS)
+
+
+def item_summary(combined):
+    """Total rekomendasi per barang di semua toko, urut dari restock terbesar"""
+    flagged = combined.assign(PERLU_RESTOCK=combined['REKOMENDASI_RESTOCK'] > 0)
+    summary = flagged.groupby(['KATEGORI', 'NAMA BARANG'], observed=True).agg(
+        TOTAL_RESTOCK=('REKOMENDASI_RESTOCK', 'sum'),
+        TOKO_PERLU_RESTOCK=('PERLU_RESTOCK', 'sum'),
+        JUMLAH_TOKO=('TOKO', 'nunique'),
+    )
+    return summary.sort_values('TOTAL_RESTOCK', ascending=False).reset_index()
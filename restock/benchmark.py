@@ -0,0 +1,270 @@
+"""Benchmark pipeline restock pada data sintetis.
+
+Setiap kasus (jumlah baris x jumlah barang) dijalankan melalui tahap
+validate_data -> feature_engineering -> inference_features -> predict_restock
+-> export, dengan waktu (wall clock) dan puncak memori per tahap. Hasil ditulis
+sebagai JSON agar bisa dibandingkan antar versi:
+
+    python -m restock.benchmark --rows 1000 100000 1000000 --items 41 5000 -o bench.json
+    python -m restock.benchmark -o baru.json --compare bench.json
+
+Histori sintetis dibatasi MAX_HISTORY_WEEKS minggu (±5 tahun): jumlah barang
+dinaikkan sesuai jumlah baris, sehingga 1 juta baris = 3.847 barang x 260 minggu.
+Kasus dengan jumlah barang efektif yang sama hanya dijalankan sekali.
+
+Dengan ``--compare`` exit code 1 jika ada tahap yang lebih lambat dari batas
+toleransi terhadap baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from .export import EXPORT_FORMATS, build_export
+from .memory import format_bytes, rss_bytes
+from .model_registry import MODEL_PATH, get_registry
+from .pipeline import feature_engineering, inference_features, load_model, predict_restock, validate_data
+from .synthetic import generate_sales, items_for_rows
+
+# Versi 2: jumlah barang dinaikkan agar histori maksimal MAX_HISTORY_WEEKS minggu
+BENCHMARK_VERSION = 2
+
+DEFAULT_ROWS = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_ITEMS = [41, 1_000]
+
+# Tahap lebih lambat dari (1 + toleransi) x baseline dianggap regresi
+DEFAULT_TOLERANCE = 0.25
+
+# Tahap di bawah batas ini terlalu cepat untuk dibandingkan dengan stabil
+MIN_COMPARE_SECONDS = 0.01
+
+
+def measure(func, *args, trace_memory=True):
+    """Jalankan func; return (hasil, detik, puncak alokasi bytes, selisih RSS bytes)"""
+    rss_before = rss_bytes()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return result, seconds, peak, rss_bytes() - rss_before
+
+
+def run_stages(data, model, formats, trace_memory=False):
+    """Satu pass semua tahap pada salinan data; return list (tahap, detik, puncak, Δ RSS, baris output)"""
+    def check(success, message, stage):
+        if not success:
+            raise RuntimeError(f"{stage} gagal ({len(data)} baris): {message}")
+
+    df = data.copy()
+    stages = []
+
+    (ok, message), *stats = measure(validate_data, df, trace_memory=trace_memory)
+    check(ok, message, 'validate_data')
+    stages.append(('validate_data', *stats, len(df)))
+
+    (processed, _, _, ok, message), *stats = measure(feature_engineering, df, trace_memory=trace_memory)
+    check(ok, message, 'feature_engineering')
+    stages.append(('feature_engineering', *stats, len(processed)))
+    del processed
+
+    (latest, ok, message), *stats = measure(inference_features, df, trace_memory=trace_memory)
+    check(ok, message, 'inference_features')
+    stages.append(('inference_features', *stats, len(latest)))
+
+    (results, ok, message), *stats = measure(predict_restock, latest, model, trace_memory=trace_memory)
+    check(ok, message, 'predict_restock')
+    stages.append(('predict_restock', *stats, len(results)))
+
+    for fmt in formats:
+        _, *stats = measure(build_export, results, fmt, trace_memory=trace_memory)
+        stages.append((f"export_{fmt}", *stats, len(results)))
+
+    return stages
+
+
+def run_case(n_rows, n_items, model, seed=0, repeat=1, trace_memory=True, formats=None):
+    """Benchmark satu kasus; return list record per tahap
+
+    Waktu diambil dari pass tanpa tracemalloc (waktu terbaik dari ``repeat``
+    pass); puncak memori dari satu pass tambahan dengan tracemalloc karena
+    tracing memperlambat alokasi objek Python secara signifikan.
+    """
+    formats = list(EXPORT_FORMATS) if formats is None else formats
+    n_items = items_for_rows(n_rows, n_items)
+    data = generate_sales(n_rows, n_items, seed=seed)
+    best = {}
+
+    for _ in range(repeat):
+        for stage, seconds, _, rss_delta, output_rows in run_stages(data, model, formats):
+            if stage not in best or seconds < best[stage]['seconds']:
+                best[stage] = {
+                    'rows': n_rows,
+                    'items': n_items,
+                    'stage': stage,
+                    'seconds': seconds,
+                    'peak_bytes': None,
+                    'rss_delta_bytes': rss_delta,
+                    'output_rows': output_rows,
+                }
+
+    if trace_memory:
+        for stage, _, peak, _, _ in run_stages(data, model, formats, trace_memory=True):
+            best[stage]['peak_bytes'] = peak
+
+    return list(best.values())
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(model_path, engine):
+    import sklearn
+
+    entry = get_registry().get(model_path)
+    return {
+        'benchmark_version': BENCHMARK_VERSION,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'model_path': model_path,
+        'model_sha256': entry.sha256,
+        'engine': engine,
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Bandingkan waktu per tahap dengan baseline; return list regresi"""
+    previous = {(r['rows'], r['items'], r['stage']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        old = previous.get((r['rows'], r['items'], r['stage']))
+        if old is None or old['seconds'] < MIN_COMPARE_SECONDS:
+            continue
+        ratio = r['seconds'] / old['seconds']
+        if ratio > 1 + tolerance:
+            regressions.append({**r, 'baseline_seconds': old['seconds'], 'ratio': ratio})
+    return regressions
+
+
+def format_table(results):
+    lines = [f"{'baris':>10} {'barang':>7}  {'tahap':<20} {'detik':>9} {'puncak memori':>14} {'Δ RSS':>12}"]
+    for r in results:
+        peak = format_bytes(r['peak_bytes']) if r['peak_bytes'] is not None else '-'
+        lines.append(
+            f"{r['rows']:>10,} {r['items']:>7,}  {r['stage']:<20} {r['seconds']:>9.4f} "
+            f"{peak:>14} {format_bytes(r['rss_delta_bytes']):>12}"
+        )
+    return '\n'.join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m restock.benchmark',
+        description="Benchmark tahap pipeline restock pada data penjualan sintetis",
+    )
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS, help="Jumlah baris per kasus")
+    parser.add_argument('--items', type=int, nargs='+', default=DEFAULT_ITEMS, help="Jumlah barang minimal per kasus")
+    parser.add_argument('--seed', type=int, default=0, help="Seed generator data")
+    parser.add_argument('--repeat', type=int, default=1, help="Ulangi setiap kasus, ambil waktu terbaik")
+    parser.add_argument('-m', '--model', default=MODEL_PATH, help=f"Path file model (default: {MODEL_PATH})")
+    parser.add_argument('--engine', choices=['auto', 'compiled', 'sklearn'], default='auto',
+                        help="Predictor: pilih per ukuran batch (seperti app), selalu forest terkompilasi, "
+                             "atau selalu estimator sklearn")
+    parser.add_argument('--formats', nargs='*', choices=list(EXPORT_FORMATS), default=list(EXPORT_FORMATS),
+                        help="Format export yang diukur")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Lewati pass tracemalloc (lebih cepat, tanpa puncak memori)")
+    parser.add_argument('-o', '--output', help="Tulis hasil JSON ke file ini (default: stdout)")
+    parser.add_argument('--compare', metavar='BASELINE', help="File JSON hasil benchmark sebelumnya")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Batas perlambatan relatif untuk --compare (default: {DEFAULT_TOLERANCE})")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    try:
+        if args.engine == 'compiled':
+            from .forest import get_compiled_forest
+            model = get_compiled_forest(args.model)
+        else:
+            model = load_model(args.model, compiled=args.engine == 'auto')
+    except Exception as e:
+        print(f"Error loading model: {str(e)}", file=sys.stderr)
+        return 2
+
+    report = {'environment': environment(args.model, args.engine), 'results': []}
+    # Jumlah barang efektif (histori <= MAX_HISTORY_WEEKS); kasus yang sama tidak diulang
+    cases = list(dict.fromkeys(
+        (rows, items_for_rows(rows, items)) for rows in args.rows for items in args.items if items <= rows
+    ))
+
+    # Pemanasan: import lazy (xlsxwriter, pyarrow) dan forest terkompilasi tidak ikut terukur
+    run_case(1_000, 41, model, trace_memory=False, formats=args.formats)
+
+    for n_rows, n_items in cases:
+        print(f"... {n_rows:,} baris, {n_items:,} barang", file=sys.stderr)
+        report['results'].extend(run_case(
+            n_rows, n_items, model,
+            seed=args.seed,
+            repeat=max(1, args.repeat),
+            trace_memory=not args.no_memory,
+            formats=args.formats,
+        ))
+
+    print(format_table(report['results']), file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report['results'], baseline, args.tolerance)
+        for r in regressions:
+            print(
+                f"[REGRESI] {r['rows']:,} baris, {r['items']:,} barang, {r['stage']}: "
+                f"{r['baseline_seconds']:.4f}s -> {r['seconds']:.4f}s ({r['ratio']:.2f}x)",
+                file=sys.stderr,
+            )
+        if regressions:
+            return 1
+        print(f"Tidak ada regresi di atas {args.tolerance:.0%} terhadap {args.compare}", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
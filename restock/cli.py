@@ -0,0 +1,128 @@
+"""Command line batch prediksi restock tanpa Streamlit.
+
+Contoh (job malam untuk banyak toko):
+
+    python -m restock data/toko_*.xlsx --output-dir hasil/
+
+Setiap file input menghasilkan ``<nama>_rekomendasi.csv`` (atau ``.xlsx``).
+Dengan ``--weeks N`` (N > 1) ditambah ``<nama>_proyeksi.csv`` berisi proyeksi
+rekomendasi N minggu ke depan per barang.
+
+Arsip .zip dibuka per file di dalamnya. Toko diproses paralel (``--jobs``,
+default semua core; ``--pool process`` untuk banyak .xlsx) dan ringkasan gabungan ditulis ke
+``ringkasan_toko.<fmt>`` dan ``ringkasan_barang.<fmt>`` jika input lebih dari
+satu toko.
+"""
+import argparse
+import os
+import sys
+import time
+
+from .batch import combine_results, expand_sources, item_summary, run_batch, store_summary
+from .forecast import MAX_HORIZON_WEEKS
+from .model_registry import MODEL_PATH
+from .pipeline import load_model
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m restock',
+        description="Prediksi rekomendasi restock dari file penjualan Excel/CSV",
+    )
+    parser.add_argument('inputs', nargs='+', help="File penjualan (.csv/.xlsx/.xls) atau arsip .zip")
+    parser.add_argument('-o', '--output-dir', default='.', help="Folder output (default: folder saat ini)")
+    parser.add_argument('-m', '--model', default=MODEL_PATH, help=f"Path file model (default: {MODEL_PATH})")
+    parser.add_argument('-f', '--format', choices=['csv', 'xlsx'], default='csv', help="Format output")
+    parser.add_argument('-w', '--weeks', type=int, default=1, choices=range(1, MAX_HORIZON_WEEKS + 1),
+                        metavar='N', help=f"Horizon proyeksi dalam minggu, 1-{MAX_HORIZON_WEEKS} (default: 1)")
+    parser.add_argument('--strict', action='store_true',
+                        help="Tolak file yang punya masalah per baris (angka/tanggal salah, stok negatif, duplikat, ...)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, metavar='N',
+                        help="Jumlah worker paralel (default: semua core, maksimal satu per toko)")
+    parser.add_argument('--pool', choices=['thread', 'process'], default='thread',
+                        help="Jenis worker pool (default: thread; process untuk banyak file .xlsx/.xls)")
+    return parser
+
+
+def write_results(results, path):
+    """Tulis hasil prediksi ke CSV atau Excel sesuai ekstensi"""
+    if path.endswith('.xlsx'):
+        results.to_excel(path, sheet_name='Prediksi_Restock', index=False)
+    else:
+        results.to_csv(path, index=False)
+
+
+def write_store(store_result, output_dir, fmt):
+    """Tulis hasil satu toko; return pesan daftar file output"""
+    output_path = os.path.join(output_dir, f"{store_result.store}_rekomendasi.{fmt}")
+    write_results(store_result.results, output_path)
+    message = f"{store_result.message} -> {output_path}"
+
+    if store_result.forecast is not None:
+        forecast_path = os.path.join(output_dir, f"{store_result.store}_proyeksi.{fmt}")
+        write_results(store_result.forecast, forecast_path)
+        weeks = int(store_result.forecast['MINGGU_KE'].max())
+        message += f", proyeksi {weeks} minggu -> {forecast_path}"
+    return message
+
+
+def write_summary(store_results, output_dir, fmt):
+    """Ringkasan gabungan semua toko; return path yang ditulis"""
+    paths = [os.path.join(output_dir, f"ringkasan_toko.{fmt}")]
+    write_results(store_summary(store_results), paths[0])
+    combined = combine_results(store_results)
+    if combined is not None:
+        paths.append(os.path.join(output_dir, f"ringkasan_barang.{fmt}"))
+        write_results(item_summary(combined), paths[1])
+    return paths
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    try:
+        sources = expand_sources(args.inputs)
+    except Exception as e:
+        print(f"Error membaca input: {str(e)}", file=sys.stderr)
+        return 2
+    if not sources:
+        print("Tidak ada file .csv/.xlsx/.xls di input", file=sys.stderr)
+        return 2
+
+    try:
+        # Dimuat sekali di sini (error muncul sekali); worker process me-mmap forest hasil kompilasinya
+        model = load_model(args.model)
+    except Exception as e:
+        print(f"Error loading model: {str(e)}", file=sys.stderr)
+        return 2
+
+    failures = 0
+
+    def report(done, total, store_result):
+        """Tulis output toko begitu selesai, selagi worker lain masih berjalan"""
+        nonlocal failures
+        message = store_result.message
+        if store_result.ok:
+            try:
+                message = write_store(store_result, args.output_dir, args.format)
+            except Exception as e:
+                store_result.ok = False
+                message = store_result.message = f"Error menulis output: {str(e)}"
+        status = 'OK' if store_result.ok else 'GAGAL'
+        print(f"[{done}/{total}] [{status}] {store_result.name} ({store_result.seconds:.2f}s): {message}",
+              file=sys.stdout if store_result.ok else sys.stderr)
+        failures += not store_result.ok
+
+    start = time.perf_counter()
+    store_results = run_batch(
+        sources, model=model, model_path=args.model, workers=args.jobs,
+        processes=args.pool == 'process', strict=args.strict, weeks=args.weeks, progress=report,
+    )
+    elapsed = time.perf_counter() - start
+
+    if len(store_results) > 1:
+        paths = write_summary(store_results, args.output_dir, args.format)
+        print(f"{len(store_results) - failures}/{len(store_results)} toko berhasil ({elapsed:.2f}s) -> {', '.join(paths)}")
+
+    return 1 if failures else 0
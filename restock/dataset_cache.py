@@ -0,0 +1,185 @@
+"""Cache dataset upload berbasis hash isi file (content-addressed).
+
+Setiap upload di-hash; frame hasil ingest + validasi disimpan sebagai Parquet di
+folder cache. Upload ulang file yang sama (atau session baru) cukup membaca
+kolom Parquet via memory map, tanpa parsing CSV/Excel lagi. Session state hanya
+menyimpan ``DatasetHandle`` yang ringan. Folder dibatasi ukurannya dengan
+eviction LRU (waktu akses terakhir = mtime file, diperbarui setiap hit).
+"""
+import hashlib
+import io
+import os
+import threading
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from .ingest import read_checked
+from .profiling import stage, timed
+from .validation import ValidationReport
+
+CACHE_DIR = os.environ.get('RESTOCK_CACHE_DIR', os.path.join('.cache', 'datasets'))
+CACHE_MAX_BYTES = int(os.environ.get('RESTOCK_CACHE_MAX_BYTES', 1 << 30))
+
+# Naikkan jika format frame hasil ingest berubah agar cache lama tidak dipakai
+CACHE_VERSION = 3
+
+SOURCE_NAME_KEY = b'restock.source_name'
+VALIDATION_KEY = b'restock.validation'
+
+
+@timed('content_hash')
+def content_hash(data):
+    """Hash isi file upload (ditambah versi cache)"""
+    digest = hashlib.blake2b(data, digest_size=16)
+    digest.update(f"v{CACHE_VERSION}".encode())
+    return digest.hexdigest()
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+@dataclass
+class DatasetHandle:
+    """Referensi ringan ke dataset tervalidasi (disimpan di session state)"""
+    key: str
+    name: str
+    n_rows: int
+    path: str = None
+    # Laporan validasi saat ingest (ikut tersimpan di metadata Parquet)
+    validation: ValidationReport = field(default=None, repr=False)
+    # Dipakai hanya jika pyarrow tidak tersedia (cache nonaktif)
+    _frame: pd.DataFrame = field(default=None, repr=False)
+
+    def load(self, columns=None):
+        """Baca frame dari cache (memory-mapped) atau dari memori"""
+        if self._frame is not None:
+            return self._frame if columns is None else self._frame[columns]
+        import pyarrow.parquet as pq
+        with stage('cache_read', rows=self.n_rows):
+            table = pq.read_table(self.path, columns=columns, memory_map=True)
+            return table.to_pandas()
+
+
+class DatasetCache:
+    """Folder cache Parquet dengan batas ukuran dan eviction LRU"""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = _has_pyarrow()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def lookup(self, key, touch=True):
+        """Kembalikan handle jika dataset sudah ada di cache"""
+        path = self._path(key)
+        if not self.enabled or not os.path.exists(path):
+            return None
+
+        import pyarrow.parquet as pq
+        try:
+            metadata = pq.read_metadata(path)
+        except Exception:
+            # File rusak/terpotong: anggap miss, akan ditulis ulang
+            return None
+        if touch:
+            os.utime(path)
+        file_metadata = metadata.metadata or {}
+        name = file_metadata.get(SOURCE_NAME_KEY, b'').decode()
+        validation = file_metadata.get(VALIDATION_KEY)
+        if validation is not None:
+            validation = ValidationReport.from_json(validation.decode())
+        return DatasetHandle(key=key, name=name, n_rows=metadata.num_rows, path=path, validation=validation)
+
+    def store(self, key, name, df, validation=None):
+        """Simpan frame ke cache secara atomik lalu jalankan eviction"""
+        if not self.enabled:
+            return DatasetHandle(key=key, name=name, n_rows=len(df), validation=validation, _frame=df)
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            SOURCE_NAME_KEY: name.encode(),
+            **({VALIDATION_KEY: validation.to_json().encode()} if validation is not None else {}),
+        })
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+        self.evict(keep=path)
+        return DatasetHandle(key=key, name=name, n_rows=len(df), path=path, validation=validation)
+
+    def get_or_ingest(self, data, name):
+        """Ambil dataset dari cache atau ingest file; return (handle, df, ok, message)
+
+        ``df`` hanya terisi jika file baru saja diparse (untuk preview tanpa
+        membaca ulang dari cache).
+        """
+        key = content_hash(data)
+        handle = self.lookup(key)
+        if handle is not None:
+            message = handle.validation.message() if handle.validation is not None else "Data valid"
+            return handle, None, True, f"{message} (dari cache)"
+
+        df, report = read_checked(io.BytesIO(data), name=name)
+        if df is None:
+            return None, None, False, report.message() if not report.is_valid else "File kosong"
+
+        with self._lock, stage('cache_write', rows=len(df)):
+            handle = self.store(key, name, df, validation=report)
+        return handle, df, True, report.message()
+
+    def entries(self):
+        """Daftar file cache: (path, ukuran, waktu akses terakhir), terbaru dulu"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        result = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.parquet'):
+                stat = entry.stat()
+                result.append((entry.path, stat.st_size, stat.st_mtime))
+        return sorted(result, key=lambda item: item[2], reverse=True)
+
+    def evict(self, keep=None):
+        """Hapus file paling lama tidak dipakai sampai total <= max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in reversed(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        return total
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_dataset_cache():
+    """Cache dataset tunggal untuk seluruh proses"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DatasetCache()
+    return _cache
@@ -0,0 +1,56 @@
+"""Representasi dtype ringkas untuk seluruh pipeline.
+
+- Kolom teks (KATEGORI, NAMA BARANG, SATUAN) -> ``category``
+- Stok/penjualan/MINGGU -> integer terkecil yang muat (float32 jika ada NaN
+  atau pecahan; model RandomForest tetap menghitung dalam float32)
+- Komponen tanggal -> int16/int8
+"""
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+CATEGORY_COLUMNS = ['KATEGORI', 'NAMA BARANG', 'SATUAN']
+
+INTEGER_COLUMNS = ['MINGGU', 'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR']
+
+DATE_PART_DTYPES = {'TAHUN': 'int16', 'BULAN': 'int8', 'HARI_DALAM_BULAN': 'int8'}
+
+
+def compact_numeric(series):
+    """Downcast ke integer terkecil; float32 jika ada NaN/pecahan"""
+    if series.isna().any() or not (series % 1 == 0).all():
+        return series.astype('float32')
+    return pd.to_numeric(series, downcast='integer')
+
+
+def compact_date_part(series, dtype):
+    """Komponen tanggal ke int16/int8 (float32 jika ada tanggal kosong)"""
+    if series.isna().any():
+        return series.astype('float32')
+    return series.astype(dtype)
+
+
+def compact_frame(df):
+    """Ubah kolom yang dikenal ke dtype ringkas (in place, return df)"""
+    for col in df.columns:
+        if col in CATEGORY_COLUMNS and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+        elif col in INTEGER_COLUMNS:
+            df[col] = compact_numeric(df[col])
+        elif col in DATE_PART_DTYPES:
+            df[col] = compact_date_part(df[col], DATE_PART_DTYPES[col])
+    return df
+
+
+def concat_compact(frames):
+    """Gabungkan chunk ringkas; kategori disatukan agar tidak kembali ke object"""
+    if len(frames) == 1:
+        return frames[0]
+
+    columns = {}
+    for col in frames[0].columns:
+        parts = [frame[col] for frame in frames]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            columns[col] = union_categoricals(parts, sort_categories=True)
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+    return compact_frame(pd.DataFrame(columns))
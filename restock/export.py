@@ -0,0 +1,165 @@
+"""Export hasil prediksi: dibuat hanya saat diminta dan di-cache per versi hasil.
+
+Excel ditulis secara streaming (xlsxwriter ``constant_memory``, atau openpyxl
+``write_only`` jika xlsxwriter tidak ada) sehingga tidak ada workbook penuh di
+memori. Tersedia juga CSV, CSV gzip dan Parquet.
+"""
+import gzip
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .profiling import timed
+
+# format -> (label tombol, ekstensi file, mime type)
+EXPORT_FORMATS = {
+    'xlsx': ("📊 Excel (.xlsx)", 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ("📄 CSV", 'csv', 'text/csv'),
+    'csv.gz': ("🗜️ CSV terkompresi (.csv.gz)", 'csv.gz', 'application/gzip'),
+    'parquet': ("🧱 Parquet", 'parquet', 'application/vnd.apache.parquet'),
+}
+
+SHEET_NAME = 'Prediksi_Restock'
+
+# Jumlah baris yang dikonversi ke objek Python sekaligus saat menulis Excel
+ROW_CHUNK = 10_000
+
+EXPORT_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+
+def _iter_rows(results):
+    """Yield baris sebagai tuple nilai Python (NaN/NaT -> None), per chunk"""
+    for start in range(0, len(results), ROW_CHUNK):
+        chunk = results.iloc[start:start + ROW_CHUNK]
+        columns = []
+        for col in chunk.columns:
+            series = chunk[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                values = [None if pd.isna(v) else v.to_pydatetime() for v in series]
+            elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                # tolist() pada array numpy menghasilkan int/float Python
+                values = series.to_numpy(dtype=np.float64 if series.hasnans else None).tolist()
+                if series.hasnans:
+                    values = [None if v != v else v for v in values]
+            else:
+                values = series.astype(object).where(series.notna(), None).tolist()
+            columns.append(values)
+        yield from zip(*columns)
+
+
+def _xlsx_xlsxwriter(results, buffer):
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(buffer, {'constant_memory': True, 'in_memory': False})
+    worksheet = workbook.add_worksheet(SHEET_NAME)
+    date_format = workbook.add_format({'num_format': 'dd/mm/yyyy'})
+    header_format = workbook.add_format({'bold': True})
+
+    # Pilih fungsi tulis per kolom sekali saja, bukan per sel
+    writers = []
+    for col in results.columns:
+        series = results[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            writers.append(lambda r, c, v: worksheet.write_datetime(r, c, v, date_format))
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            writers.append(worksheet.write_number)
+        else:
+            writers.append(worksheet.write)
+
+    worksheet.write_row(0, 0, list(results.columns), header_format)
+    for row_idx, row in enumerate(_iter_rows(results), start=1):
+        for col_idx, value in enumerate(row):
+            if value is not None:
+                writers[col_idx](row_idx, col_idx, value)
+    workbook.close()
+
+
+def _xlsx_openpyxl(results, buffer):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(SHEET_NAME)
+    worksheet.append(list(results.columns))
+    for row in _iter_rows(results):
+        worksheet.append(row)
+    workbook.save(buffer)
+
+
+@timed('export')
+def build_export(results, fmt):
+    """Buat isi file export dalam bytes untuk satu format"""
+    if fmt == 'xlsx':
+        buffer = io.BytesIO()
+        try:
+            _xlsx_xlsxwriter(results, buffer)
+        except ImportError:
+            _xlsx_openpyxl(results, buffer)
+        return buffer.getvalue()
+
+    if fmt == 'csv':
+        return results.to_csv(index=False).encode('utf-8')
+
+    if fmt == 'csv.gz':
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=6, mtime=0) as gz:
+            with io.TextIOWrapper(gz, encoding='utf-8', newline='') as text:
+                results.to_csv(text, index=False, chunksize=ROW_CHUNK)
+        return buffer.getvalue()
+
+    if fmt == 'parquet':
+        buffer = io.BytesIO()
+        results.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+
+    raise ValueError(f"Format export tidak dikenal: {fmt}")
+
+
+class ExportCache:
+    """Cache LRU isi file export per (versi hasil, format)"""
+
+    def __init__(self, max_bytes=EXPORT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def peek(self, version, fmt):
+        """Isi export jika sudah pernah dibuat, tanpa membuat baru"""
+        with self._lock:
+            data = self._entries.get((version, fmt))
+            if data is not None:
+                self._entries.move_to_end((version, fmt))
+            return data
+
+    def get_or_build(self, version, fmt, results):
+        """Ambil dari cache atau buat export lalu simpan"""
+        data = self.peek(version, fmt)
+        if data is not None:
+            return data
+
+        data = build_export(results, fmt)
+        with self._lock:
+            if (version, fmt) not in self._entries:
+                self._entries[(version, fmt)] = data
+                self._bytes += len(data)
+            while len(self._entries) > 1 and self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+        return data
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_export_cache():
+    """Cache export tunggal untuk seluruh proses"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ExportCache()
+    return _cache
@@ -0,0 +1,137 @@
+"""Proyeksi rekomendasi restock beberapa minggu ke depan (prediksi rekursif).
+
+Semua barang digulirkan bersamaan: setiap langkah memanggil ``model.predict``
+sekali untuk seluruh barang, lalu feature minggu berikutnya dihitung dengan
+operasi array:
+
+- STOK AWAL     = STOK AKHIR minggu lalu + rekomendasi restock minggu lalu
+- JUMLAH TERJUAL = perkiraan permintaan, dibatasi STOK AWAL
+- STOK AKHIR    = STOK AWAL - JUMLAH TERJUAL
+- MINGGU + 1, TANGGAL + 7 hari (TAHUN/BULAN/HARI_DALAM_BULAN ikut)
+
+Model dilatih dengan target RESTOCK_NEEDED = penjualan minggu depan - STOK AKHIR,
+sehingga perkiraan permintaan = rekomendasi + STOK AKHIR. Jika rekomendasi 0
+(permintaan <= stok), penjualan minggu terakhir dipakai sebagai perkiraan.
+Langkah pertama identik dengan ``predict_restock``.
+"""
+import numpy as np
+import pandas as pd
+
+from .dtypes import compact_frame
+from .pipeline import FEATURES, predict_restock
+from .profiling import stage, timed
+
+MAX_HORIZON_WEEKS = 12
+DEFAULT_HORIZON_WEEKS = 4
+
+FORECAST_COLUMNS = [
+    'KATEGORI', 'NAMA BARANG', 'SATUAN', 'MINGGU_KE', 'MINGGU', 'TANGGAL',
+    'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR', 'REKOMENDASI_RESTOCK'
+]
+
+
+def _round_restock(predictions):
+    """Pembulatan sama dengan predict_restock: bilangan bulat tidak negatif"""
+    return np.maximum(np.round(predictions).astype(int), 0)
+
+
+@timed('forecast_horizon')
+def forecast_horizon(latest_data, model, weeks=DEFAULT_HORIZON_WEEKS):
+    """Proyeksi ``weeks`` minggu untuk semua barang; return (forecast, success, message)
+
+    ``latest_data`` = satu baris feature terbaru per barang (hasil
+    inference_features). ``forecast`` berformat panjang: satu baris per barang
+    per minggu ke depan (MINGGU_KE = 1..weeks).
+    """
+    try:
+        weeks = int(weeks)
+        if not 1 <= weeks <= MAX_HORIZON_WEEKS:
+            return None, False, f"Horizon harus 1-{MAX_HORIZON_WEEKS} minggu"
+
+        # Minggu pertama = prediksi biasa (termasuk dedup per barang bila perlu)
+        first, success, message = predict_restock(latest_data, model)
+        if not success:
+            return None, False, message
+
+        n_items = len(first)
+        X = first[FEATURES].to_numpy(dtype=np.float64, copy=True)
+        column = {name: idx for idx, name in enumerate(FEATURES)}
+        tanggal = pd.to_datetime(first['TANGGAL']).to_numpy(dtype='datetime64[D]')
+        restock = first['REKOMENDASI_RESTOCK'].to_numpy()
+
+        # Keadaan minggu terakhir yang diketahui (basis langkah berikutnya)
+        stok_awal = X[:, column['STOK AWAL']].copy()
+        terjual = X[:, column['JUMLAH TERJUAL']].copy()
+        stok_akhir = X[:, column['STOK AKHIR']].copy()
+        minggu = X[:, column['MINGGU']].copy()
+
+        steps = {name: np.empty((weeks, n_items)) for name in ['MINGGU', 'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR']}
+        step_dates = np.empty((weeks, n_items), dtype='datetime64[D]')
+        step_restock = np.empty((weeks, n_items), dtype=int)
+
+        for step in range(weeks):
+            # Minggu yang direkomendasikan: state minggu ini + restock yang disarankan
+            demand = np.where(restock > 0, restock + stok_akhir, terjual)
+            stok_awal = stok_akhir + restock
+            terjual = np.minimum(demand, stok_awal)
+            stok_akhir = stok_awal - terjual
+            minggu = minggu + 1
+            tanggal = tanggal + np.timedelta64(7, 'D')
+
+            steps['MINGGU'][step] = minggu
+            steps['STOK AWAL'][step] = stok_awal
+            steps['JUMLAH TERJUAL'][step] = terjual
+            steps['STOK AKHIR'][step] = stok_akhir
+            step_dates[step] = tanggal
+            step_restock[step] = restock
+
+            if step == weeks - 1:
+                break
+
+            # Feature untuk rekomendasi minggu berikutnya
+            dates = pd.DatetimeIndex(tanggal)
+            X[:, column['MINGGU']] = minggu
+            X[:, column['STOK AWAL']] = stok_awal
+            X[:, column['JUMLAH TERJUAL']] = terjual
+            X[:, column['STOK AKHIR']] = stok_akhir
+            X[:, column['TAHUN']] = dates.year
+            X[:, column['BULAN']] = dates.month
+            X[:, column['HARI_DALAM_BULAN']] = dates.day
+
+            with stage('model_predict', rows=n_items):
+                restock = _round_restock(model.predict(pd.DataFrame(X, columns=FEATURES)))
+
+        # Format panjang: minggu ke-1 semua barang, lalu minggu ke-2, dst.
+        item_index = np.tile(np.arange(n_items), weeks)
+        forecast = pd.DataFrame({
+            'KATEGORI': first['KATEGORI'].to_numpy()[item_index],
+            'NAMA BARANG': first['NAMA BARANG'].to_numpy()[item_index],
+            'SATUAN': first['SATUAN'].to_numpy()[item_index],
+            'MINGGU_KE': np.repeat(np.arange(1, weeks + 1), n_items),
+            'MINGGU': steps['MINGGU'].ravel(),
+            'TANGGAL': step_dates.ravel().astype('datetime64[ns]'),
+            'STOK AWAL': steps['STOK AWAL'].ravel(),
+            'JUMLAH TERJUAL': steps['JUMLAH TERJUAL'].ravel(),
+            'STOK AKHIR': steps['STOK AKHIR'].ravel(),
+            'REKOMENDASI_RESTOCK': step_restock.ravel(),
+        })
+        for col in ['KATEGORI', 'NAMA BARANG', 'SATUAN']:
+            if isinstance(first[col].dtype, pd.CategoricalDtype):
+                forecast[col] = pd.Categorical(forecast[col], dtype=first[col].dtype)
+        compact_frame(forecast)
+
+        return forecast, True, f"Proyeksi {weeks} minggu untuk {n_items} barang berhasil"
+
+    except Exception as e:
+        return None, False, f"Error dalam proyeksi multi-minggu: {str(e)}"
+
+
+def forecast_table(forecast, value='REKOMENDASI_RESTOCK'):
+    """Tabel lebar: satu baris per barang, satu kolom per minggu ke depan"""
+    table = forecast.pivot_table(
+        index=['KATEGORI', 'NAMA BARANG'], columns='MINGGU_KE', values=value,
+        aggfunc='sum', observed=True,
+    )
+    table.columns = [f"Minggu +{week}" for week in table.columns]
+    table['TOTAL'] = table.sum(axis=1)
+    return table.reset_index()
@@ -0,0 +1,251 @@
+"""Mesin inference RandomForest dalam bentuk array datar (structure-of-arrays).
+
+Semua pohon digabung menjadi array NumPy kontigu (feature, threshold, pasangan
+anak kiri/kanan, arah nilai kosong, nilai leaf). Prediksi menelusuri semua pohon
+untuk semua baris sekaligus, satu langkah kedalaman per iterasi, tanpa overhead
+Python per pohon. Hasilnya identik dengan ``RandomForestRegressor.predict``.
+
+Traversal array menang untuk batch kecil (latensi, overhead per panggilan
+sklearn ~10 ms) tetapi kalah dari traversal C sklearn untuk batch besar;
+``get_predictor`` memilih engine per panggilan berdasarkan jumlah baris
+(batas COMPILED_MAX_ROWS).
+
+Bentuk terkompilasi disimpan sebagai file ``.npy`` di samping model sehingga
+bisa dimuat dengan ``mmap_mode='r'``: start murah dan halaman memorinya dipakai
+bersama oleh semua worker process.
+"""
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from .model_registry import MODEL_PATH, get_registry
+
+ARRAY_NAMES = ['feature', 'threshold', 'children', 'missing_left', 'value', 'roots']
+
+# Jumlah baris per batch traversal agar array (n_pohon x n_baris) tetap kecil
+BATCH_ROWS = 512
+
+# Di atas jumlah baris ini sklearn lebih cepat (model 100 pohon: impas sekitar 1.500 baris)
+COMPILED_MAX_ROWS = 1_500
+
+
+class CompiledForest:
+    """RandomForestRegressor yang diratakan menjadi array NumPy"""
+
+    def __init__(self, arrays, feature_names, max_depth):
+        for name in ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        self.feature_names = list(feature_names)
+        self.max_depth = int(max_depth)
+        self.n_trees = len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Ratakan semua pohon dari estimator sklearn yang sudah di-fit"""
+        features, thresholds, children, missing, values, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            nodes = tree.__getstate__()['nodes']
+            n_nodes = len(nodes)
+            index = np.arange(offset, offset + n_nodes)
+            is_leaf = nodes['left_child'] < 0
+
+            # Leaf menunjuk ke dirinya sendiri sehingga traversal cukup diulang max_depth kali
+            left = np.where(is_leaf, index, nodes['left_child'] + offset)
+            right = np.where(is_leaf, index, nodes['right_child'] + offset)
+            children.append(np.stack([left, right], axis=1))
+            features.append(np.where(is_leaf, 0, nodes['feature']))
+            thresholds.append(nodes['threshold'])
+            if 'missing_go_to_left' in nodes.dtype.names:
+                missing.append(nodes['missing_go_to_left'].astype(bool))
+            else:
+                missing.append(np.zeros(n_nodes, dtype=bool))
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += n_nodes
+
+        arrays = {
+            'feature': np.concatenate(features).astype(np.int32),
+            'threshold': np.concatenate(thresholds).astype(np.float64),
+            'children': np.concatenate(children).astype(np.int32),
+            'missing_left': np.concatenate(missing),
+            'value': np.concatenate(values).astype(np.float64),
+            'roots': np.asarray(roots, dtype=np.int32),
+        }
+        feature_names = getattr(model, 'feature_names_in_', range(model.n_features_in_))
+        max_depth = max(estimator.tree_.max_depth for estimator in model.estimators_)
+        return cls(arrays, feature_names, max_depth)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ARRAY_NAMES)
+
+    def _as_matrix(self, X):
+        """Susun X sesuai urutan feature saat training, float32 seperti sklearn"""
+        if hasattr(X, 'columns'):
+            X = X[self.feature_names].to_numpy(dtype=np.float32)
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def _leaf_values(self, X):
+        n_rows, n_features = X.shape
+        flat_x = X.ravel()
+        children = self.children.reshape(-1)
+        row_offset = (np.arange(n_rows, dtype=np.int32) * n_features)[None, :]
+        has_nan = bool(np.isnan(X).any())
+
+        # node: (n_pohon, n_baris), semua pohon maju satu level per iterasi
+        node = np.repeat(self.roots[:, None], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            x = flat_x.take(row_offset + self.feature.take(node))
+            go_left = x <= self.threshold.take(node)
+            if has_nan:
+                go_left |= np.isnan(x) & self.missing_left.take(node)
+            # children[2 * node] = anak kiri, children[2 * node + 1] = anak kanan
+            node = children.take(2 * node + ~go_left)
+        return self.value.take(node)
+
+    def predict_per_tree(self, X):
+        """Prediksi setiap pohon, shape (n_pohon, n_baris)"""
+        X = self._as_matrix(X)
+        out = np.empty((self.n_trees, len(X)), dtype=np.float64)
+        for start in range(0, len(X), BATCH_ROWS):
+            out[:, start:start + BATCH_ROWS] = self._leaf_values(X[start:start + BATCH_ROWS])
+        return out
+
+    def predict(self, X):
+        """Rata-rata semua pohon (urutan penjumlahan sama dengan sklearn)"""
+        per_tree = self.predict_per_tree(X)
+        total = np.zeros(per_tree.shape[1], dtype=np.float64)
+        for tree_values in per_tree:
+            total += tree_values
+        total /= self.n_trees
+        return total
+
+    def save(self, directory):
+        """Simpan array sebagai file .npy (bisa di-mmap) + metadata JSON"""
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'feature_names': self.feature_names, 'max_depth': self.max_depth}, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """Muat bentuk terkompilasi, default memory-mapped"""
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ARRAY_NAMES
+        }
+        return cls(arrays, meta['feature_names'], meta['max_depth'])
+
+
+def compiled_dir(model_path, sha256):
+    """Folder bentuk terkompilasi untuk satu versi (hash) file model"""
+    root, _ = os.path.splitext(model_path)
+    return os.path.join(f"{root}.forest", sha256[:16])
+
+
+def is_compilable(model):
+    """True untuk ensemble pohon regresi dengan satu output"""
+    estimators = getattr(model, 'estimators_', None)
+    return bool(estimators) and all(
+        hasattr(estimator, 'tree_') and estimator.tree_.n_outputs == 1
+        for estimator in estimators
+    )
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def get_compiled_forest(model_path=MODEL_PATH):
+    """Bentuk terkompilasi dari model di registry; dibuat sekali per versi file"""
+    entry = get_registry().get(model_path)
+    key = (entry.path, entry.sha256)
+
+    with _compiled_lock:
+        forest = _compiled.get(key)
+        if forest is not None:
+            return forest
+
+        directory = compiled_dir(entry.path, entry.sha256)
+        if not os.path.exists(os.path.join(directory, 'meta.json')):
+            # Tulis ke folder sementara lalu rename agar pembaca lain tidak melihat file setengah jadi
+            tmp_directory = f"{directory}.{os.getpid()}.tmp"
+            CompiledForest.from_sklearn(entry.model).save(tmp_directory)
+            try:
+                os.rename(tmp_directory, directory)
+            except OSError:
+                # Process lain sudah lebih dulu menulis versi yang sama
+                shutil.rmtree(tmp_directory, ignore_errors=True)
+
+        forest = CompiledForest.load(directory)
+        # Versi lama dari file yang sama tidak dipakai lagi
+        for old_key in [k for k in _compiled if k[0] == entry.path]:
+            del _compiled[old_key]
+        _compiled[key] = forest
+        return forest
+
+
+def compiled_forest_dir(model_path=MODEL_PATH):
+    """Folder .npy bentuk terkompilasi versi model saat ini (None jika tidak bisa dikompilasi)
+
+    Dipakai worker process: cukup ``CompiledForest.load(folder)`` (mmap) tanpa
+    unpickle model sklearn, sehingga halaman array dipakai bersama antar proses.
+    """
+    entry = get_registry().get(model_path)
+    if not is_compilable(entry.model):
+        return None
+    # Pastikan folder sudah ditulis untuk hash yang sama dengan entry
+    get_compiled_forest(model_path)
+    return compiled_dir(entry.path, entry.sha256)
+
+
+class ForestPredictor:
+    """Pilih engine per panggilan: forest terkompilasi untuk batch kecil, sklearn untuk batch besar
+
+    Hasil kedua engine identik. Estimator sklearn diambil dari registry saat
+    pertama dibutuhkan, sehingga worker process yang hanya memprediksi batch
+    kecil cukup memakai forest yang di-mmap.
+    """
+
+    def __init__(self, compiled, model_path=MODEL_PATH, max_compiled_rows=COMPILED_MAX_ROWS):
+        self.compiled = compiled
+        self.model_path = model_path
+        self.max_compiled_rows = max_compiled_rows
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = get_registry().get(self.model_path).model
+        return self._model
+
+    def _use_compiled(self, X):
+        return len(X) <= self.max_compiled_rows
+
+    def predict(self, X):
+        if self._use_compiled(X):
+            return self.compiled.predict(X)
+        return self.model.predict(X)
+
+    def predict_per_tree(self, X):
+        """Prediksi setiap pohon, shape (n_pohon, n_baris)"""
+        if self._use_compiled(X):
+            return self.compiled.predict_per_tree(X)
+        X = self.compiled._as_matrix(X)
+        return np.stack([estimator.predict(X) for estimator in self.model.estimators_])
+
+
+def get_predictor(model_path=MODEL_PATH):
+    """Objek dengan .predict(X): ForestPredictor jika model bisa dikompilasi, selain itu model sklearn"""
+    model = get_registry().get(model_path).model
+    if is_compilable(model):
+        return ForestPredictor(get_compiled_forest(model_path), model_path)
+    return model
@@ -0,0 +1,353 @@
+"""Histori penjualan lokal (SQLite) agar upload mingguan cukup berisi minggu terbaru.
+
+Baris tervalidasi dari upload ditambahkan ke satu file SQLite. Tabel
+``penjualan`` ber-primary key (NAMA BARANG, TANGGAL) tanpa rowid, sehingga data
+tersimpan terurut per barang lalu tanggal dan baris yang sudah ada diperbarui
+(upload ulang atau koreksi) alih-alih digandakan. Tabel ``barang`` menyimpan
+daftar barang beserta tanggal terakhirnya.
+
+Pipeline mengambil ``k`` baris terakhir per barang dengan satu pencarian index
+per barang: waktu query dan memori sebanding dengan jumlah barang x k, bukan
+dengan panjang histori. Histori lama cukup diisi sekali:
+
+    python -m restock.history data/2023_*.csv data/2024_*.xlsx
+    python -m restock.history --stats
+"""
+import argparse
+import os
+import secrets
+import sqlite3
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .dataset_cache import DatasetHandle
+from .dtypes import compact_frame
+from .pipeline import NUMERIC_COLUMNS, REQUIRED_COLUMNS
+from .profiling import stage, timed
+
+HISTORY_PATH = os.environ.get('RESTOCK_HISTORY_PATH', os.path.join('.cache', 'history.sqlite'))
+
+# Awalan key DatasetHandle dari histori (training memuat seluruh histori, bukan k baris)
+HISTORY_KEY_PREFIX = 'histori-'
+
+# Inference hanya butuh baris terbaru; beberapa minggu ekstra untuk preview/tren
+DEFAULT_RECENT_ROWS = 4
+
+# Kolom wajib -> kolom SQL (urutan sama dengan REQUIRED_COLUMNS)
+SQL_COLUMNS = {
+    'MINGGU': 'minggu',
+    'TANGGAL': 'tanggal',
+    'KATEGORI': 'kategori',
+    'NAMA BARANG': 'nama_barang',
+    'SATUAN': 'satuan',
+    'STOK AWAL': 'stok_awal',
+    'JUMLAH TERJUAL': 'jumlah_terjual',
+    'STOK AKHIR': 'stok_akhir',
+}
+
+# TANGGAL disimpan sebagai teks ISO (YYYY-MM-DD) agar urutan teks = urutan tanggal
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS penjualan (
+    minggu REAL,
+    tanggal TEXT NOT NULL,
+    kategori TEXT,
+    nama_barang TEXT NOT NULL,
+    satuan TEXT,
+    stok_awal REAL,
+    jumlah_terjual REAL,
+    stok_akhir REAL,
+    PRIMARY KEY (nama_barang, tanggal)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS barang (
+    nama_barang TEXT PRIMARY KEY,
+    tanggal_terakhir TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Id acak per file database, dibuat sekali saat file dibuat: versi mulai dari 1 lagi
+# untuk file baru, jadi key cache harus membedakan file (lihat dataset_handle)
+DATABASE_ID_KEY = 'db_id'
+
+_COLUMN_LIST = ', '.join(SQL_COLUMNS.values())
+_VALUE_COLUMNS = [col for col in SQL_COLUMNS.values() if col not in ('nama_barang', 'tanggal')]
+
+# Baris yang sama persis tidak ditulis ulang (tidak dihitung sebagai perubahan)
+_UPSERT = f"""
+INSERT INTO penjualan ({_COLUMN_LIST})
+SELECT {_COLUMN_LIST} FROM temp.upload WHERE true
+ON CONFLICT (nama_barang, tanggal) DO UPDATE SET
+    {', '.join(f'{col} = excluded.{col}' for col in _VALUE_COLUMNS)}
+WHERE {' OR '.join(f'{col} IS NOT excluded.{col}' for col in _VALUE_COLUMNS)}
+"""
+
+# k baris terakhir per barang: batas tanggal dicari lewat index (nama_barang, tanggal) per barang
+_RECENT = f"""
+SELECT {', '.join(f'p.{col}' for col in SQL_COLUMNS.values())}
+FROM barang b
+CROSS JOIN penjualan p ON p.nama_barang = b.nama_barang
+WHERE p.tanggal >= COALESCE(
+    (SELECT q.tanggal FROM penjualan q WHERE q.nama_barang = b.nama_barang
+     ORDER BY q.tanggal DESC LIMIT 1 OFFSET :offset),
+    ''
+)
+ORDER BY p.nama_barang, p.tanggal
+"""
+
+
+def _text_values(series):
+    values = series.astype(object).to_numpy()
+    return np.where(pd.isna(values), None, values)
+
+
+def to_records(df):
+    """Baris siap insert (tuple per baris), terurut per NAMA BARANG lalu TANGGAL
+
+    Baris tanpa NAMA BARANG/TANGGAL dibuang; duplikat di dalam upload diambil
+    baris terakhirnya (sama seperti upload ulang yang menimpa data lama).
+    Return (records, jumlah_dibuang).
+    """
+    tanggal = df['TANGGAL']
+    if not pd.api.types.is_datetime64_any_dtype(tanggal):
+        tanggal = pd.to_datetime(tanggal, format='%d/%m/%Y', errors='coerce')
+    has_key = (tanggal.notna() & df['NAMA BARANG'].notna()).to_numpy()
+
+    columns = {}
+    for col in REQUIRED_COLUMNS:
+        if col == 'TANGGAL':
+            values = _text_values(tanggal.dt.strftime('%Y-%m-%d'))
+        elif col in NUMERIC_COLUMNS:
+            numbers = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+            values = np.where(np.isnan(numbers), None, numbers.astype(object))
+        else:
+            values = _text_values(df[col])
+        columns[col] = values[has_key]
+
+    # Urutan primary key: insert ke B-tree berurutan, bukan acak per minggu
+    keyed = pd.DataFrame(columns, dtype=object)
+    keyed = keyed.drop_duplicates(['NAMA BARANG', 'TANGGAL'], keep='last')
+    keyed = keyed.sort_values(['NAMA BARANG', 'TANGGAL'], kind='stable')
+    return list(zip(*(keyed[col].to_numpy() for col in REQUIRED_COLUMNS))), int((~has_key).sum())
+
+
+def from_sql(frame):
+    """Frame hasil query -> kolom wajib dengan dtype ringkas, TANGGAL datetime"""
+    frame = frame.rename(columns={sql: col for col, sql in SQL_COLUMNS.items()})
+    frame['TANGGAL'] = pd.to_datetime(frame['TANGGAL'], format='%Y-%m-%d')
+    return compact_frame(frame[REQUIRED_COLUMNS])
+
+
+class HistoryStore:
+    """File SQLite histori penjualan; satu koneksi per operasi (aman antar thread)"""
+
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # Schema dan id dicek setiap koneksi (murah) agar file yang dihapus/diganti tetap valid
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        # WAL: pembaca (prediksi) tidak terblokir selama upload ditulis
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)",
+                (DATABASE_ID_KEY, secrets.randbits(63)),
+            )
+        return conn
+
+    def _meta(self, conn, key):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    @timed('history_append')
+    def append(self, df):
+        """Tambahkan baris upload; return dict jumlah baris baru, diperbarui, sama, dibuang"""
+        records, dropped = to_records(df)
+        with self._lock, stage('history_write', rows=len(records)) as record:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.execute(
+                        "CREATE TEMP TABLE IF NOT EXISTS upload AS SELECT * FROM penjualan WHERE 0"
+                    )
+                    conn.execute("DELETE FROM temp.upload")
+                    conn.executemany(
+                        f"INSERT INTO temp.upload ({_COLUMN_LIST}) VALUES ({', '.join('?' * len(SQL_COLUMNS))})",
+                        records,
+                    )
+                    new = conn.execute(
+                        "SELECT COUNT(*) FROM temp.upload u WHERE NOT EXISTS "
+                        "(SELECT 1 FROM penjualan p WHERE p.nama_barang = u.nama_barang AND p.tanggal = u.tanggal)"
+                    ).fetchone()[0]
+
+                    changes = conn.total_changes
+                    conn.execute(_UPSERT)
+                    updated = conn.total_changes - changes - new
+
+                    conn.execute(
+                        "INSERT INTO barang (nama_barang, tanggal_terakhir) "
+                        "SELECT nama_barang, MAX(tanggal) FROM temp.upload WHERE true GROUP BY nama_barang "
+                        "ON CONFLICT (nama_barang) DO UPDATE SET "
+                        "tanggal_terakhir = MAX(tanggal_terakhir, excluded.tanggal_terakhir)"
+                    )
+                    if new or updated:
+                        conn.execute(
+                            "INSERT INTO meta (key, value) VALUES ('versi', 1), ('baris', ?) "
+                            "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value",
+                            (new,),
+                        )
+                    conn.execute("DELETE FROM temp.upload")
+            finally:
+                conn.close()
+            record.rows_out = new + updated
+
+        return {'baru': new, 'diperbarui': updated, 'sama': len(records) - new - updated, 'dibuang': dropped}
+
+    def _read_recent(self, conn, k):
+        with stage('history_query') as record:
+            frame = pd.read_sql_query(_RECENT, conn, params={'offset': max(int(k), 1) - 1})
+            record.rows_out = len(frame)
+        return from_sql(frame)
+
+    @timed('history_recent')
+    def recent(self, k=DEFAULT_RECENT_ROWS):
+        """``k`` baris terakhir per barang, terurut per NAMA BARANG lalu TANGGAL"""
+        conn = self._connect()
+        try:
+            return self._read_recent(conn, k)
+        finally:
+            conn.close()
+
+    @timed('history_load')
+    def load(self, since=None):
+        """Seluruh histori (mis. untuk training), opsional mulai tanggal ``since``"""
+        conn = self._connect()
+        try:
+            since = '' if since is None else pd.Timestamp(since).strftime('%Y-%m-%d')
+            frame = pd.read_sql_query(
+                f"SELECT {_COLUMN_LIST} FROM penjualan WHERE tanggal >= ? ORDER BY nama_barang, tanggal",
+                conn, params=(since,),
+            )
+        finally:
+            conn.close()
+        return from_sql(frame)
+
+    def stats(self):
+        """Jumlah baris dan barang, tanggal terakhir, id dan versi data, ukuran file"""
+        conn = self._connect()
+        try:
+            items, last_date = conn.execute(
+                "SELECT COUNT(*), MAX(tanggal_terakhir) FROM barang"
+            ).fetchone()
+            rows, version = self._meta(conn, 'baris'), self._meta(conn, 'versi')
+            database_id = self._meta(conn, DATABASE_ID_KEY)
+        finally:
+            conn.close()
+        size = sum(
+            os.path.getsize(path) for path in (self.path, f"{self.path}-wal") if os.path.exists(path)
+        )
+        return {
+            'rows': rows,
+            'items': items,
+            'last_date': pd.Timestamp(last_date) if last_date else None,
+            'id': f"{database_id:016x}",
+            'version': version,
+            'bytes': size,
+        }
+
+    def dataset_handle(self, k=DEFAULT_RECENT_ROWS):
+        """DatasetHandle berisi ``k`` baris terakhir per barang
+
+        Key = id database + versi data + k, dibaca dalam satu transaksi baca
+        bersama barisnya: berubah setiap histori berubah dan tidak pernah sama
+        untuk file database lain (mis. setelah file dihapus dan dibuat ulang).
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN")
+                database_id = self._meta(conn, DATABASE_ID_KEY)
+                version = self._meta(conn, 'versi')
+                frame = self._read_recent(conn, k)
+        finally:
+            conn.close()
+        return DatasetHandle(
+            key=f"{HISTORY_KEY_PREFIX}{database_id:016x}-v{version}-k{k}", name=os.path.basename(self.path),
+            n_rows=len(frame), _frame=frame,
+        )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    """Histori tunggal untuk seluruh proses"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = HistoryStore()
+    return _store
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m restock.history', description=__doc__.splitlines()[0])
+    parser.add_argument('inputs', nargs='*', help="File penjualan (.csv/.xlsx/.xls) untuk ditambahkan ke histori")
+    parser.add_argument('--path', default=HISTORY_PATH, help=f"File histori SQLite (default: {HISTORY_PATH})")
+    parser.add_argument('--strict', action='store_true', help="Tolak file yang punya masalah per baris")
+    parser.add_argument('--stats', action='store_true', help="Tampilkan ringkasan histori")
+    return parser
+
+
+def main(argv=None):
+    from .ingest import read_checked
+
+    args = build_parser().parse_args(argv)
+    store = HistoryStore(args.path)
+    failures = 0
+
+    for path in args.inputs:
+        try:
+            df, report = read_checked(path, strict=args.strict)
+        except Exception as e:
+            df, message = None, f"Error membaca file: {str(e)}"
+        else:
+            message = report.message() if not report.is_valid else "File kosong"
+        if df is None:
+            print(f"[GAGAL] {path}: {message}", file=sys.stderr)
+            failures += 1
+            continue
+        counts = store.append(df)
+        print(
+            f"[OK] {path}: {counts['baru']:,} baru, {counts['diperbarui']:,} diperbarui, "
+            f"{counts['sama']:,} sama, {counts['dibuang']:,} dibuang"
+        )
+
+    if args.stats or not args.inputs:
+        stats = store.stats()
+        last_date = stats['last_date'].strftime('%d/%m/%Y') if stats['last_date'] is not None else '-'
+        print(
+            f"{store.path}: {stats['rows']:,} baris, {stats['items']:,} barang, "
+            f"sampai {last_date}, versi {stats['version']}"
+        )
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
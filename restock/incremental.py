@@ -0,0 +1,76 @@
+"""Feature engineering inkremental untuk minggu baru.
+
+State per barang = baris terakhir hasil feature engineering (TANGGAL, penjualan
+dan stok akhir terakhir beserta feature lainnya). Minggu baru cukup diproses
+bersama state ini: lag feature hanya dihitung untuk baris baru, sehingga biaya
+update sebanding dengan ukuran batch, bukan dengan panjang histori.
+"""
+import pandas as pd
+
+from .pipeline import add_date_features, add_encodings
+from .profiling import timed
+
+
+def build_state(df_processed):
+    """State per barang dari hasil feature_engineering (baris terakhir per barang)"""
+    # df_processed sudah terurut berdasarkan NAMA BARANG dan TANGGAL
+    return df_processed.drop_duplicates('NAMA BARANG', keep='last').reset_index(drop=True)
+
+
+@timed('update_features')
+def update_features(state, new_rows):
+    """Feature engineering hanya untuk baris baru berdasarkan state per barang
+
+    Return (features_baru, state_baru, label_updates, success, message).
+    ``label_updates`` berisi FUTURE_SALES/RESTOCK_NEEDED untuk baris terakhir
+    di state yang kini diketahui dari penjualan minggu baru (untuk training).
+    """
+    try:
+        batch = new_rows.copy()
+        add_date_features(batch)
+
+        last_by_item = state.set_index('NAMA BARANG')
+
+        # Baris yang tidak lebih baru dari state sudah ada di histori
+        last_date = batch['NAMA BARANG'].map(last_by_item['TANGGAL'])
+        is_new = last_date.isna() | (batch['TANGGAL'] > last_date)
+        skipped = int((~is_new).sum())
+
+        batch = batch[is_new].sort_values(['NAMA BARANG', 'TANGGAL']).reset_index(drop=True)
+        grouped = batch.groupby('NAMA BARANG')
+
+        # Lag di dalam batch; baris pertama tiap barang mengambil nilai dari state
+        first_in_batch = ~batch['NAMA BARANG'].duplicated()
+        first_items = batch.loc[first_in_batch, 'NAMA BARANG']
+
+        batch['PREV_JUMLAH_TERJUAL'] = grouped['JUMLAH TERJUAL'].shift(1)
+        batch['PREV_STOK_AKHIR'] = grouped['STOK AKHIR'].shift(1)
+        batch.loc[first_in_batch, 'PREV_JUMLAH_TERJUAL'] = first_items.map(last_by_item['JUMLAH TERJUAL'])
+        batch.loc[first_in_batch, 'PREV_STOK_AKHIR'] = first_items.map(last_by_item['STOK AKHIR'])
+
+        batch['FUTURE_SALES'] = grouped['JUMLAH TERJUAL'].shift(-1)
+        batch['RESTOCK_NEEDED'] = batch['FUTURE_SALES'] - batch['STOK AKHIR']
+        batch['RESTOCK_NEEDED'] = batch['RESTOCK_NEEDED'].clip(lower=0)
+
+        add_encodings(batch)
+
+        # Target baris terakhir di state kini diketahui dari penjualan pertama di batch
+        first_sales = batch.loc[first_in_batch].set_index('NAMA BARANG')['JUMLAH TERJUAL']
+        has_update = state['NAMA BARANG'].isin(first_sales.index)
+        label_updates = state.loc[has_update, ['NAMA BARANG', 'TANGGAL', 'STOK AKHIR']].copy()
+        label_updates['FUTURE_SALES'] = label_updates['NAMA BARANG'].map(first_sales)
+        label_updates['RESTOCK_NEEDED'] = (label_updates['FUTURE_SALES'] - label_updates['STOK AKHIR']).clip(lower=0)
+
+        new_state = pd.concat(
+            [state[~has_update], build_state(batch)],
+            ignore_index=True
+        )
+
+        message = f"Update inkremental berhasil: {len(batch)} baris baru"
+        if skipped:
+            message += f", {skipped} baris lama dilewati"
+
+        return batch, new_state, label_updates, True, message
+
+    except Exception as e:
+        return None, None, None, False, f"Error dalam update inkremental: {str(e)}"
@@ -0,0 +1,249 @@
+"""Pembacaan file penjualan secara streaming dengan schema dtype eksplisit.
+
+Hanya delapan kolom wajib yang dibaca (projection ``usecols``) dan setiap chunk
+langsung divalidasi, sehingga tidak pernah ada DataFrame lebar tanpa tipe
+sebesar seluruh file di memori.
+
+- CSV: ``pd.read_csv`` ber-chunk (engine C) atau reader streaming pyarrow.
+- .xlsx: openpyxl mode read-only, baris dibaca satu per satu.
+- .xls: format lama tidak bisa di-stream, dibaca dengan xlrd lalu dipotong.
+"""
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+
+from .dtypes import compact_frame, concat_compact
+from .pipeline import NUMERIC_COLUMNS, REQUIRED_COLUMNS, check_data
+from .profiling import stage, timed
+
+CHUNK_ROWS = 100_000
+
+# Key ``DataFrame.attrs``: nomor baris file per baris chunk jika reader melewati baris kosong
+LINE_NUMBERS_ATTR = 'line_numbers'
+
+# Schema kolom wajib; TANGGAL dibaca teks lalu diparse sekali saat validasi
+COLUMN_DTYPES = {
+    col: ('float64' if col in NUMERIC_COLUMNS else str)
+    for col in REQUIRED_COLUMNS
+}
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow.csv  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _rewind(source):
+    """Kembalikan posisi file-like ke awal agar bisa dibaca ulang"""
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def _read_csv_header(source):
+    """Baca baris header CSV tanpa membaca isi file"""
+    _rewind(source)
+    if hasattr(source, 'read'):
+        line = source.readline()
+        if isinstance(line, bytes):
+            line = line.decode('utf-8-sig')
+    else:
+        with open(source, encoding='utf-8-sig') as f:
+            line = f.readline()
+    _rewind(source)
+    return next(csv.reader([line]), [])
+
+
+def _iter_csv_pandas(source, chunksize, coerce, skip_rows=0):
+    dtype = COLUMN_DTYPES
+    if coerce:
+        # Fallback untuk data kotor: kolom numerik dibaca teks lalu di-coerce
+        dtype = {col: str for col in REQUIRED_COLUMNS}
+
+    _rewind(source)
+    reader = pd.read_csv(
+        source,
+        usecols=lambda col: col in COLUMN_DTYPES,
+        dtype=dtype,
+        chunksize=chunksize,
+        skiprows=range(1, skip_rows + 1) if skip_rows else None,
+    )
+    with reader:
+        yield from reader
+
+
+def _iter_csv_pyarrow(source, chunksize, columns):
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    _rewind(source)
+    column_types = {
+        col: (pa.float64() if col in NUMERIC_COLUMNS else pa.string())
+        for col in columns
+    }
+    reader = pa_csv.open_csv(
+        source,
+        read_options=pa_csv.ReadOptions(block_size=1 << 22),
+        convert_options=pa_csv.ConvertOptions(include_columns=columns, column_types=column_types),
+    )
+    pending = []
+    pending_rows = 0
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= chunksize:
+            yield pa.Table.from_batches(pending).to_pandas()
+            pending, pending_rows = [], 0
+    if pending:
+        yield pa.Table.from_batches(pending).to_pandas()
+
+
+def iter_csv_chunks(source, chunksize=CHUNK_ROWS, engine='auto'):
+    """Yield chunk CSV bertipe; jalur cepat dulu, fallback coerce jika data kotor"""
+    columns = [col for col in _read_csv_header(source) if col in COLUMN_DTYPES]
+    use_pyarrow = bool(columns) and (engine == 'pyarrow' or (engine == 'auto' and _has_pyarrow()))
+
+    if use_pyarrow:
+        fast_path = _iter_csv_pyarrow(source, chunksize, columns)
+    else:
+        fast_path = _iter_csv_pandas(source, chunksize, False)
+
+    rows_done = 0
+    try:
+        for chunk in fast_path:
+            rows_done += len(chunk)
+            yield chunk
+        return
+    except (ValueError, TypeError):
+        # Nilai non-numerik di kolom numerik (ArrowInvalid turunan ValueError):
+        # lanjutkan dengan jalur coerce mulai dari baris yang belum dikirim
+        pass
+
+    yield from _iter_csv_pandas(source, chunksize, True, skip_rows=rows_done)
+
+
+def _rows_to_frame(rows, header, line_numbers):
+    frame = pd.DataFrame.from_records(rows, columns=header)
+    for col in frame.columns:
+        # Kolom angka dibiarkan apa adanya: validasi yang mem-parse dan melaporkan nilai salah
+        if col not in NUMERIC_COLUMNS:
+            column = frame[col].astype(object)
+            if col == 'TANGGAL':
+                # Sel tanggal Excel berupa datetime: samakan dengan format teks DD/MM/YYYY
+                column = pd.Series([
+                    value.strftime('%d/%m/%Y') if hasattr(value, 'strftime') else value
+                    for value in column
+                ], index=frame.index, dtype=object)
+            # Sel kosong (None) menjadi NaN sebelum astype(str), yang mengubah None menjadi
+            # teks 'None' (lolos validasi); sel kosong tetap kosong setelah cast
+            column = column.where(column.notna(), np.nan)
+            frame[col] = column.astype(str).where(column.notna())
+    frame.attrs[LINE_NUMBERS_ATTR] = np.asarray(line_numbers, dtype=np.int64)
+    return frame
+
+
+def iter_xlsx_chunks(source, chunksize=CHUNK_ROWS):
+    """Yield chunk dari sheet pertama .xlsx dengan openpyxl read-only"""
+    from openpyxl import load_workbook
+
+    _rewind(source)
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header_row = next(rows, ())
+        positions = [
+            (idx, str(col).strip() if col is not None else col)
+            for idx, col in enumerate(header_row)
+        ]
+        positions = [(idx, col) for idx, col in positions if col in COLUMN_DTYPES]
+        header = [col for _, col in positions]
+
+        buffer, line_numbers = [], []
+        # Baris kosong dilewati tetapi tetap dihitung agar nomor baris error = nomor baris sheet
+        for line, row in enumerate(rows, start=2):
+            values = [row[idx] if idx < len(row) else None for idx, _ in positions]
+            if all(value is None for value in values):
+                continue
+            buffer.append(values)
+            line_numbers.append(line)
+            if len(buffer) >= chunksize:
+                yield _rows_to_frame(buffer, header, line_numbers)
+                buffer, line_numbers = [], []
+        if buffer or not header:
+            yield _rows_to_frame(buffer, header, line_numbers)
+    finally:
+        workbook.close()
+
+
+def iter_xls_chunks(source, chunksize=CHUNK_ROWS):
+    """Format .xls lama: baca sekali dengan kolom terbatas lalu potong per chunk"""
+    _rewind(source)
+    df = pd.read_excel(source, usecols=lambda col: col in COLUMN_DTYPES)
+    for start in range(0, max(len(df), 1), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def iter_chunks(source, name=None, chunksize=CHUNK_ROWS, engine='auto'):
+    """Pilih reader streaming sesuai ekstensi file"""
+    name = (name or getattr(source, 'name', None) or str(source)).lower()
+    if name.endswith('.csv'):
+        return iter_csv_chunks(source, chunksize=chunksize, engine=engine)
+    if name.endswith('.xls'):
+        return iter_xls_chunks(source, chunksize=chunksize)
+    return iter_xlsx_chunks(source, chunksize=chunksize)
+
+
+@timed('parsing')
+def read_checked(source, name=None, chunksize=CHUNK_ROWS, engine='auto', strict=False):
+    """Baca file per chunk dan validasi tiap chunk; return (df, ValidationReport)
+
+    ``df`` None jika data tidak valid atau file kosong. Duplikat NAMA BARANG + TANGGAL dicek
+    sekali setelah semua chunk digabung agar duplikat lintas chunk ikut terdeteksi.
+    """
+    from .validation import ValidationReport, check_duplicates
+
+    chunks = []
+    # Nomor baris file per chunk (hanya reader yang melewati baris kosong, lihat LINE_NUMBERS_ATTR)
+    chunk_lines = []
+    report = ValidationReport(strict=strict)
+    for chunk in iter_chunks(source, name=name, chunksize=chunksize, engine=engine):
+        lines = chunk.attrs.get(LINE_NUMBERS_ATTR)
+        chunk_lines.append(lines)
+        with stage('validate_data', rows=len(chunk)):
+            chunk_report = check_data(chunk, row_offset=report.n_rows, duplicates=False, strict=strict,
+                                      line_numbers=lines)
+        report.merge(chunk_report)
+        if chunk_report.missing_columns:
+            return None, report
+        # Ringkas dtype per chunk agar string tidak menumpuk sebagai object
+        with stage('compact_dtypes', rows=len(chunk)):
+            chunks.append(compact_frame(chunk))
+
+    if not chunks:
+        return None, report
+
+    with stage('concat', rows=report.n_rows):
+        df = concat_compact(chunks)
+    line_numbers = None
+    if any(lines is not None for lines in chunk_lines):
+        line_numbers = np.concatenate(chunk_lines)
+    with stage('check_duplicates', rows=len(df)):
+        check_duplicates(df, report, line_numbers=line_numbers)
+    return (df if report.is_valid else None), report
+
+
+def read_validated(source, name=None, chunksize=CHUNK_ROWS, engine='auto', strict=False):
+    """Seperti read_checked; return (df, is_valid, message)"""
+    df, report = read_checked(source, name=name, chunksize=chunksize, engine=engine, strict=strict)
+    if df is None and report.is_valid:
+        return None, False, "File kosong"
+    return df, report.is_valid, report.message()
+
+
+def read_bytes_validated(data, name, **kwargs):
+    """Seperti read_validated tetapi dari isi file dalam bytes"""
+    return read_validated(io.BytesIO(data), name=name, **kwargs)
@@ -0,0 +1,193 @@
+"""Load test lokal untuk restock.service.
+
+Tanpa ``--url`` service dijalankan sendiri dua kali (subprocess): sekali tanpa
+batching (satu pass pipeline per request) dan sekali dengan micro-batching,
+lalu request per detik dan latensi keduanya dibandingkan:
+
+    python -m restock.loadtest -n 2000 -c 64
+    python -m restock.loadtest --url http://127.0.0.1:8000 -n 5000 -c 128 -o load.json
+
+Setiap request berisi histori ``--weeks`` minggu terakhir untuk
+``--items-per-request`` barang dari data sintetis (restock.synthetic).
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .model_registry import MODEL_PATH
+from .synthetic import generate_sales
+
+
+def build_payloads(n_payloads=500, weeks=4, items_per_request=1, seed=0):
+    """Body JSON siap kirim; tiap body berisi ``weeks`` baris terakhir per barang"""
+    n_items = n_payloads * items_per_request
+    df = generate_sales(n_items * weeks, n_items=n_items, seed=seed)
+    df = df.astype(object).groupby('NAMA BARANG', sort=False).tail(weeks)
+
+    codes = pd.factorize(df['NAMA BARANG'])[0] // items_per_request
+    payloads = []
+    for _, rows in df.groupby(codes, sort=True):
+        payloads.append(json.dumps({'rows': rows.to_dict(orient='records')}, default=str).encode('utf-8'))
+    return payloads
+
+
+async def _send(reader, writer, host, method, path, body=b''):
+    """Satu request HTTP/1.1 keep-alive; return (status, body)"""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+    )
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status_line, *header_lines = head.decode('latin-1').rstrip('\r\n').split('\r\n')
+    length = 0
+    for line in header_lines:
+        name, _, value = line.partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return int(status_line.split(' ', 2)[1]), await reader.readexactly(length)
+
+
+async def fetch_json(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, body = await _send(reader, writer, host, 'GET', path)
+        return json.loads(body)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, payloads, n_requests=2000, concurrency=64):
+    """``concurrency`` klien keep-alive mengirim total ``n_requests`` POST /predict"""
+    latencies = []
+    statuses = {}
+    counter = iter(range(n_requests))
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for index in counter:
+                start = time.perf_counter()
+                status, _ = await _send(reader, writer, host, 'POST', '/predict', payloads[index % len(payloads)])
+                latencies.append(time.perf_counter() - start)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    return {
+        'requests': len(latencies),
+        'status': {str(status): count for status, count in sorted(statuses.items())},
+        'concurrency': concurrency,
+        'seconds': round(seconds, 3),
+        'rps': round(len(latencies) / seconds, 1),
+        'latency_ms': {'p50': round(p50, 2), 'p90': round(p90, 2), 'p99': round(p99, 2),
+                       'max': round(max(latencies) * 1000, 2)},
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_service(port, model_path=MODEL_PATH, batching=True, batch_window_ms=None, timeout=120):
+    """Jalankan ``python -m restock.service`` dan tunggu sampai siap menerima request"""
+    command = [sys.executable, '-m', 'restock.service', '--port', str(port), '--model', model_path]
+    if not batching:
+        command.append('--no-batching')
+    if batch_window_ms is not None:
+        command += ['--batch-window-ms', str(batch_window_ms)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, cwd=os.getcwd())
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        line = process.stdout.readline()
+        if not line:
+            break
+        if 'berjalan di' in line:
+            return process
+    process.kill()
+    raise RuntimeError("Service gagal start (lihat stderr)")
+
+
+def run_mode(label, port, payloads, args, batching):
+    process = start_service(port, args.model, batching, args.batch_window_ms)
+    try:
+        result = asyncio.run(run_load('127.0.0.1', port, payloads, args.requests, args.concurrency))
+        metrics = asyncio.run(fetch_json('127.0.0.1', port, '/metrics'))
+    finally:
+        process.terminate()
+        process.wait()
+    return {'mode': label, **result, 'mean_batch_requests': metrics['mean_batch_requests']}
+
+
+def format_table(results):
+    lines = [f"{'mode':<16} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'req/batch':>10} {'status':>14}"]
+    for r in results:
+        status = ','.join(f"{code}:{count}" for code, count in r['status'].items())
+        lines.append(
+            f"{r['mode']:<16} {r['rps']:>9,.1f} {r['latency_ms']['p50']:>9.2f} "
+            f"{r['latency_ms']['p99']:>9.2f} {r.get('mean_batch_requests', 0):>10.2f} {status:>14}"
+        )
+    return '\n'.join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m restock.loadtest', description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help="Service yang sudah berjalan (tanpa ini: bandingkan per request vs batching)")
+    parser.add_argument('-n', '--requests', type=int, default=2000, help="Total request (default: %(default)s)")
+    parser.add_argument('-c', '--concurrency', type=int, default=64, help="Klien paralel (default: %(default)s)")
+    parser.add_argument('--weeks', type=int, default=4, help="Baris histori per barang (default: %(default)s)")
+    parser.add_argument('--items-per-request', type=int, default=1, help="Barang per request (default: %(default)s)")
+    parser.add_argument('--payloads', type=int, default=500, help="Jumlah body berbeda (default: %(default)s)")
+    parser.add_argument('-m', '--model', default=MODEL_PATH, help=f"Path file model (default: {MODEL_PATH})")
+    parser.add_argument('--batch-window-ms', type=float, default=None, help="Diteruskan ke service")
+    parser.add_argument('-o', '--output', help="Tulis hasil JSON ke file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    payloads = build_payloads(args.payloads, args.weeks, args.items_per_request)
+
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+        results = [{'mode': 'service', **asyncio.run(run_load(host, port, payloads, args.requests, args.concurrency))}]
+        results[0]['mean_batch_requests'] = asyncio.run(fetch_json(host, port, '/metrics'))['mean_batch_requests']
+    else:
+        results = []
+        for label, batching in [('per_request', False), ('micro_batching', True)]:
+            print(f"... {label}: {args.requests:,} request, {args.concurrency} klien", file=sys.stderr)
+            results.append(run_mode(label, _free_port(), payloads, args, batching))
+
+    print(format_table(results), file=sys.stderr)
+    if len(results) == 2:
+        print(f"Micro-batching: {results[1]['rps'] / results[0]['rps']:.1f}x request per detik", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
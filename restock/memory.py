@@ -0,0 +1,82 @@
+"""Utility pengukuran memori proses dan DataFrame."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+def rss_bytes():
+    """Resident set size proses saat ini dalam bytes (0 jika tidak tersedia)"""
+    # Linux: baca langsung dari /proc agar tidak perlu dependency tambahan
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+
+def format_bytes(n):
+    """Format jumlah bytes agar mudah dibaca"""
+    n = float(n)
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if abs(n) < 1024 or unit == 'GB':
+            return f"{n:,.1f} {unit}"
+        n /= 1024
+
+
+def frame_bytes(df):
+    """Ukuran memori DataFrame (deep) dalam bytes"""
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+
+def wide_frame_bytes(df):
+    """Estimasi ukuran frame yang sama dengan dtype default (float64/int64/object)
+
+    Dihitung tanpa materialisasi: kolom kategori dihitung sebagai object string
+    (pointer + objek str per baris), kolom numerik 8 byte per baris.
+    """
+    total = 0
+    n_rows = len(df)
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            counts = np.bincount(series.cat.codes.to_numpy() + 1, minlength=len(series.cat.categories) + 1)
+            sizes = np.array([sys.getsizeof(None)] + [sys.getsizeof(str(v)) for v in series.cat.categories])
+            total += 8 * n_rows + int((counts * sizes).sum())
+        elif series.dtype.kind in 'biufmM':
+            total += 8 * n_rows
+        else:
+            total += int(series.memory_usage(index=False, deep=True))
+    return total
+
+
+def stage_memory(df):
+    """Statistik memori satu tahap: baris, bytes dtype default, bytes aktual"""
+    return {
+        'rows': len(df),
+        'default_bytes': wide_frame_bytes(df),
+        'compact_bytes': frame_bytes(df),
+    }
+
+
+def memory_report(stages):
+    """Tabel penghematan memori per tahap dari dict {nama_tahap: stage_memory}"""
+    rows = []
+    for stage, stats in stages.items():
+        saved = stats['default_bytes'] - stats['compact_bytes']
+        rows.append({
+            'Tahap': stage,
+            'Baris': stats['rows'],
+            'Dtype Default': format_bytes(stats['default_bytes']),
+            'Dtype Ringkas': format_bytes(stats['compact_bytes']),
+            'Hemat': format_bytes(saved),
+            'Hemat (%)': round(100 * saved / stats['default_bytes'], 1) if stats['default_bytes'] else 0.0,
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,131 @@
+"""Registry model bersama per proses server.
+
+Model dimuat sekali lalu dipakai ulang oleh semua session Streamlit. File model
+hanya dibaca ulang jika mtime/ukuran berubah DAN hash isinya berbeda.
+
+Catatan mmap: dengan ``mmap_mode='r'`` array numpy di dalam artifact dibaca
+langsung dari page cache tanpa buffer salinan, sehingga worker process yang
+memuat file yang sama berbagi halaman fisiknya. (Objek ``Tree`` sklearn tetap
+menyalin node ke memorinya sendiri saat unpickle.) Karena dipetakan langsung,
+file model harus diganti secara atomik (tulis ke file sementara lalu
+``os.replace``), jangan ditimpa di tempat.
+"""
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import joblib
+
+from .memory import rss_bytes
+
+MODEL_PATH = 'model_restock.joblib'
+
+# Key yang umum dipakai jika model disimpan dalam dictionary
+MODEL_KEYS = ['model', 'rf_model', 'regressor', 'estimator', 'best_estimator_']
+
+
+@dataclass
+class LoadedModel:
+    """Model yang sudah dimuat beserta metadata file dan statistik load"""
+    path: str
+    artifact: object
+    model: object
+    mtime_ns: int
+    size: int
+    sha256: str
+    mmap_mode: str
+    load_seconds: float
+    resident_bytes: int
+    loaded_at: float
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hitung hash SHA-256 isi file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_model(artifact):
+    """Ambil estimator dari isi file joblib (dictionary atau estimator langsung)"""
+    if isinstance(artifact, dict):
+        for key in MODEL_KEYS:
+            if key in artifact:
+                return artifact[key]
+        raise ValueError(f"Model dalam format dictionary. Keys tersedia: {list(artifact.keys())}")
+    return artifact
+
+
+class ModelRegistry:
+    """Cache model per path file, aman dipakai dari banyak thread"""
+
+    def __init__(self, mmap_mode='r'):
+        self.mmap_mode = mmap_mode
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.load_count = 0
+
+    def get(self, path=MODEL_PATH):
+        """Kembalikan LoadedModel, muat ulang hanya jika file berubah"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+                return entry
+
+            sha256 = file_sha256(path)
+            if entry is not None and entry.sha256 == sha256:
+                # File hanya di-touch, isi sama: cukup perbarui metadata
+                entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+                return entry
+
+            entry = self._load(path, stat, sha256)
+            self._entries[path] = entry
+            return entry
+
+    def _load(self, path, stat, sha256):
+        rss_before = rss_bytes()
+        start = time.perf_counter()
+        artifact = joblib.load(path, mmap_mode=self.mmap_mode)
+        model = extract_model(artifact)
+        load_seconds = time.perf_counter() - start
+        self.load_count += 1
+
+        return LoadedModel(
+            path=path,
+            artifact=artifact,
+            model=model,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            sha256=sha256,
+            mmap_mode=self.mmap_mode,
+            load_seconds=load_seconds,
+            resident_bytes=max(rss_bytes() - rss_before, 0),
+            loaded_at=time.time(),
+        )
+
+    def invalidate(self, path=MODEL_PATH):
+        """Hapus model dari cache sehingga dimuat ulang pada akses berikutnya"""
+        with self._lock:
+            self._entries.pop(os.path.abspath(path), None)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Registry tunggal untuk seluruh proses"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                mmap_mode = os.environ.get('RESTOCK_MODEL_MMAP', 'r') or None
+                _registry = ModelRegistry(mmap_mode=mmap_mode)
+    return _registry
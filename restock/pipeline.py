@@ -0,0 +1,234 @@
+"""Pipeline prediksi restock: validasi -> feature engineering -> prediksi.
+
+Modul ini tidak bergantung pada Streamlit/plotly sehingga bisa dipakai oleh
+app.py maupun job batch (lihat ``python -m restock``).
+"""
+import numpy as np
+import pandas as pd
+
+from .dtypes import DATE_PART_DTYPES, compact_date_part
+from .model_registry import MODEL_PATH, get_registry
+from .profiling import stage, timed
+from .vocab import encode, get_vocabularies
+
+REQUIRED_COLUMNS = [
+    'MINGGU', 'TANGGAL', 'KATEGORI', 'NAMA BARANG',
+    'SATUAN', 'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR'
+]
+
+NUMERIC_COLUMNS = ['MINGGU', 'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR']
+
+# Naikkan jika cara menghitung feature berubah (dipakai sebagai key cache prediksi)
+FEATURE_SCHEMA_VERSION = 1
+
+# Features yang digunakan untuk prediksi (urutan sesuai saat training)
+FEATURES = [
+    'MINGGU', 'KATEGORI_ENCODED', 'NAMA_BARANG_ENCODED',
+    'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR', 'BULAN', 'TAHUN', 'HARI_DALAM_BULAN'
+]
+
+
+def load_model(path=MODEL_PATH, compiled=True):
+    """Ambil model dari registry proses (raise jika gagal dimuat)
+
+    Dengan ``compiled=True`` RandomForest dibungkus ``ForestPredictor`` (lihat
+    restock.forest): array datar untuk batch kecil, sklearn untuk batch besar,
+    hasil prediksi identik.
+    """
+    if compiled:
+        from .forest import get_predictor
+        return get_predictor(path)
+    return get_registry().get(path).model
+
+
+@timed('validate_data')
+def validate_data(df, strict=False):
+    """Validasi data input; angka dan TANGGAL diparse sekali (in place)
+
+    Masalah per baris (lihat restock.validation) dirangkum di pesan; gunakan
+    ``check_data`` untuk indeks error lengkapnya.
+    """
+    report = check_data(df, strict=strict)
+    return report.is_valid, report.message()
+
+
+def check_data(df, row_offset=0, duplicates=True, strict=False, track_positions=False, line_numbers=None):
+    """Validasi vektor satu pass; return ValidationReport (frame diparse in place)"""
+    from .validation import check_frame
+    return check_frame(df, REQUIRED_COLUMNS, row_offset=row_offset, duplicates=duplicates,
+                       strict=strict, track_positions=track_positions, line_numbers=line_numbers)
+
+
+@timed('date_conversion')
+def add_date_features(df):
+    """Convert TANGGAL dan tambahkan TAHUN/BULAN/HARI_DALAM_BULAN (in place)"""
+    # TANGGAL dari validate_data sudah datetime, tidak diparse ulang
+    if not pd.api.types.is_datetime64_any_dtype(df['TANGGAL']):
+        df['TANGGAL'] = pd.to_datetime(df['TANGGAL'], format='%d/%m/%Y', errors='coerce')
+    
+    df['TAHUN'] = compact_date_part(df['TANGGAL'].dt.year, DATE_PART_DTYPES['TAHUN'])
+    df['BULAN'] = compact_date_part(df['TANGGAL'].dt.month, DATE_PART_DTYPES['BULAN'])
+    df['HARI_DALAM_BULAN'] = compact_date_part(df['TANGGAL'].dt.day, DATE_PART_DTYPES['HARI_DALAM_BULAN'])
+
+
+@timed('encoding')
+def add_encodings(df, decode=True):
+    """Encoding kategori dan nama barang dengan vocabulary tetap dari model (in place)"""
+    vocabularies = get_vocabularies()
+    vocab_kategori = vocabularies['KATEGORI']
+    vocab_nama_barang = vocabularies['NAMA BARANG']
+    
+    df['KATEGORI_ENCODED'] = encode(df['KATEGORI'], vocab_kategori)
+    df['NAMA_BARANG_ENCODED'] = encode(df['NAMA BARANG'], vocab_nama_barang)
+    
+    # Simpan decoder untuk output
+    if decode:
+        df['KATEGORI_DECODE'] = df['KATEGORI']
+        df['NAMA_BARANG_DECODE'] = df['NAMA BARANG']
+    
+    return vocab_kategori, vocab_nama_barang
+
+
+@timed('feature_engineering')
+def feature_engineering(df):
+    """Melakukan feature engineering sesuai dengan model"""
+    try:
+        df_processed = df.copy()
+        
+        # Convert tanggal dan extract features dari tanggal
+        add_date_features(df_processed)
+        
+        # Sort data berdasarkan nama barang dan tanggal
+        with stage('sort', rows=len(df_processed)):
+            df_processed = df_processed.sort_values(['NAMA BARANG', 'TANGGAL']).reset_index(drop=True)
+        
+        # Feature engineering untuk data historis
+        with stage('groupby_shift', rows=len(df_processed)):
+            df_processed['PREV_JUMLAH_TERJUAL'] = df_processed.groupby('NAMA BARANG', observed=True)['JUMLAH TERJUAL'].shift(1)
+            df_processed['PREV_STOK_AKHIR'] = df_processed.groupby('NAMA BARANG', observed=True)['STOK AKHIR'].shift(1)
+            
+            # Future sales untuk training (jika ada data masa depan)
+            df_processed['FUTURE_SALES'] = df_processed.groupby('NAMA BARANG', observed=True)['JUMLAH TERJUAL'].shift(-1)
+            df_processed['RESTOCK_NEEDED'] = df_processed['FUTURE_SALES'] - df_processed['STOK AKHIR']
+            df_processed['RESTOCK_NEEDED'] = df_processed['RESTOCK_NEEDED'].clip(lower=0)
+        
+        vocab_kategori, vocab_nama_barang = add_encodings(df_processed)
+        
+        return df_processed, vocab_kategori, vocab_nama_barang, True, "Feature engineering berhasil"
+        
+    except Exception as e:
+        return None, None, None, False, f"Error dalam feature engineering: {str(e)}"
+
+
+def _latest_positions(tanggal, keys):
+    """Posisi baris terbaru per key (index hasil = key)
+
+    Tanggal sama -> kemunculan terakhir di file, seperti sort stabil lalu
+    ``groupby().last()``; dicari dari urutan terbalik karena idxmax memilih
+    kemunculan pertama.
+    """
+    reversed_tanggal = tanggal.iloc[::-1]
+    return reversed_tanggal.groupby([key.iloc[::-1] for key in keys], observed=True).idxmax()
+
+
+@timed('inference_features')
+def inference_features(df, by=None):
+    """Feature model hanya untuk baris terbaru per barang (mode inference)
+
+    Tidak ada copy/sort seluruh histori: baris terbaru dipilih dengan arg-max
+    TANGGAL per barang, lalu hanya baris tersebut yang diberi feature. Hasilnya
+    sama dengan ``feature_engineering`` + ``groupby('NAMA BARANG').last()``:
+    tanggal sama diambil yang terakhir, TANGGAL kosong terurut paling akhir,
+    dan nilai kosong diisi nilai terakhir yang ada per kolom.
+    ``by``: kolom pengelompokan tambahan (mis. id request di restock.service)
+    sehingga barang yang sama dari sumber berbeda tidak digabung.
+    """
+    try:
+        tanggal = df['TANGGAL']
+        if not pd.api.types.is_datetime64_any_dtype(tanggal):
+            with stage('date_conversion', rows=len(df)):
+                tanggal = pd.to_datetime(tanggal, format='%d/%m/%Y', errors='coerce')
+        
+        with stage('latest_per_item', rows=len(df)) as latest_stage:
+            # Tanggal kosong terurut paling akhir (na_position='last' pada sort_values)
+            tanggal = pd.Series(tanggal.to_numpy()).fillna(pd.Timestamp.max)
+            keys = [df['NAMA BARANG'].reset_index(drop=True)]
+            columns = REQUIRED_COLUMNS
+            if by is not None:
+                keys.insert(0, df[by].reset_index(drop=True))
+                columns = [by] + REQUIRED_COLUMNS
+            latest_positions = _latest_positions(tanggal, keys)
+            
+            latest_data = df[columns].iloc[latest_positions.to_numpy()].reset_index(drop=True)
+            
+            # Nilai kosong di baris terbaru: nilai terakhir yang ada di kolom itu (seperti last())
+            for col in columns:
+                if col in ('NAMA BARANG', by):
+                    continue
+                missing = latest_data[col].isna().to_numpy()
+                if not missing.any():
+                    continue
+                has_value = df[col].notna().to_numpy()
+                fill_positions = _latest_positions(
+                    tanggal[has_value], [key[has_value] for key in keys]
+                ).reindex(latest_positions.index[missing])
+                found = fill_positions.notna().to_numpy()
+                targets = np.flatnonzero(missing)[found]
+                values = df[col].iloc[fill_positions[found].to_numpy(dtype=np.int64)].to_numpy()
+                latest_data.iloc[targets, latest_data.columns.get_loc(col)] = values
+            latest_stage.rows_out = len(latest_data)
+        add_date_features(latest_data)
+        add_encodings(latest_data, decode=False)
+        
+        return latest_data, True, "Feature engineering berhasil"
+        
+    except Exception as e:
+        return None, False, f"Error dalam feature engineering: {str(e)}"
+
+
+@timed('predict_restock')
+def predict_restock(df_processed, model, by=None):
+    """Melakukan prediksi restock (``by`` sama dengan inference_features)"""
+    try:
+        # Ambil data untuk prediksi (data terbaru per item); hasil inference_features
+        # sudah satu baris per barang
+        if by is None:
+            unique = df_processed['NAMA BARANG'].is_unique
+        else:
+            unique = not df_processed.duplicated([by, 'NAMA BARANG']).any()
+        if unique:
+            latest_data = df_processed.reset_index(drop=True)
+        else:
+            keys = ['NAMA BARANG'] if by is None else [by, 'NAMA BARANG']
+            latest_data = df_processed.groupby(keys, observed=True).last().reset_index()
+        
+        # Prediksi
+        X_pred = latest_data[FEATURES]
+        with stage('model_predict', rows=len(X_pred)):
+            predictions = model.predict(X_pred)
+        
+        # Bulatkan ke angka bulat
+        predictions = np.round(predictions).astype(int)
+        predictions = np.maximum(predictions, 0)  # Pastikan tidak negatif
+        
+        # Tambahkan kolom prediksi (tanpa mengubah frame milik pemanggil)
+        latest_data = latest_data.assign(REKOMENDASI_RESTOCK=predictions)
+        
+        return latest_data, True, "Prediksi berhasil"
+        
+    except Exception as e:
+        return None, False, f"Error dalam prediksi: {str(e)}"
+
+
+def run_pipeline(df, model, validate=True):
+    """Jalankan validate_data -> feature_engineering -> predict_restock"""
+    if validate:
+        is_valid, message = validate_data(df)
+        if not is_valid:
+            return None, False, message
+
+    latest_data, success, message = inference_features(df)
+    if not success:
+        return None, False, message
+
+    return predict_restock(latest_data, model)
@@ -0,0 +1,78 @@
+"""Cache hasil prediksi per proses server.
+
+Key = (hash isi dataset, hash file model, versi schema feature). Jika data dan
+model tidak berubah, hasil prediksi langsung dipakai ulang (juga lintas user
+yang mengupload export mingguan yang sama). Ukuran dibatasi jumlah entri dan
+total bytes dengan eviction LRU.
+
+DataFrame hasil dipakai bersama antar session: perlakukan sebagai read-only.
+"""
+import threading
+from collections import OrderedDict
+
+from .memory import frame_bytes
+
+CACHE_MAX_ENTRIES = 64
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+class PredictionCache:
+    """LRU cache hasil prediksi dengan statistik hit/miss"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Hasil prediksi untuk key, atau None (dicatat sebagai hit/miss)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, results):
+        """Simpan hasil prediksi lalu buang entri paling lama jika melebihi batas"""
+        nbytes = frame_bytes(results)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (results, nbytes)
+            self._bytes += nbytes
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    """Cache prediksi tunggal untuk seluruh proses"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PredictionCache()
+    return _cache
@@ -0,0 +1,185 @@
+"""Instrumentasi waktu dan memori per tahap pipeline.
+
+Fungsi pipeline ditandai dengan ``@timed(...)`` atau blok ``with stage(...)``.
+Pengukuran hanya aktif di dalam ``profile_run(...)``; di luar itu hook hanya
+membaca satu ContextVar sehingga overhead-nya bisa diabaikan (benchmark dan CLI
+tetap berjalan tanpa instrumentasi).
+
+Setiap run menghasilkan satu baris log JSON di logger ``restock.perf`` (stderr,
+atau file di ``RESTOCK_PERF_LOG``) agar bisa diagregasi lintas session.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from .memory import rss_bytes
+
+LOGGER_NAME = 'restock.perf'
+PERF_LOG_ENV = 'RESTOCK_PERF_LOG'
+
+_current = contextvars.ContextVar('restock_profile', default=None)
+
+
+def _rows(value):
+    """Jumlah baris DataFrame pertama pada value (atau tuple hasil), None jika tidak ada"""
+    if isinstance(value, tuple):
+        value = next((item for item in value if hasattr(item, 'columns')), None)
+    if hasattr(value, 'columns'):
+        return len(value)
+    return None
+
+
+class StageRecord:
+    """Hasil ukur satu tahap; ``rows_out`` boleh diisi dari dalam blok"""
+
+    __slots__ = ('path', 'rows_in', 'rows_out', 'seconds', 'rss_delta_bytes')
+
+    def __init__(self, path, rows_in=None):
+        self.path = path
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.seconds = None
+        self.rss_delta_bytes = None
+
+
+class RunProfile:
+    """Kumpulan tahap dari satu run (upload, prediksi, export, ...)"""
+
+    def __init__(self, run, **context):
+        self.run = run
+        self.run_id = uuid.uuid4().hex
+        self.context = context
+        self.stages = []
+        self.path = ()
+        self.started_at = datetime.now(timezone.utc)
+        self.seconds = None
+        self.rss_start_bytes = rss_bytes()
+        self.rss_end_bytes = None
+        self.error = None
+
+    def stage_summary(self):
+        """Tahap digabung per path (mis. validate_data per chunk), urut sesuai mulai"""
+        summary = {}
+        for record in self.stages:
+            entry = summary.get(record.path)
+            if entry is None:
+                entry = summary[record.path] = {
+                    'stage': record.path[-1],
+                    'path': '/'.join(record.path),
+                    'depth': len(record.path) - 1,
+                    'calls': 0,
+                    'seconds': 0.0,
+                    'rows_in': None,
+                    'rows_out': None,
+                    'rss_delta_bytes': 0,
+                }
+            entry['calls'] += 1
+            entry['seconds'] += record.seconds or 0.0
+            entry['rss_delta_bytes'] += record.rss_delta_bytes or 0
+            for key in ('rows_in', 'rows_out'):
+                rows = getattr(record, key)
+                if rows is not None:
+                    entry[key] = (entry[key] or 0) + rows
+        return list(summary.values())
+
+    def to_record(self):
+        """Dict siap JSON untuk log dan panel performa"""
+        return {
+            'event': 'restock_run',
+            'run': self.run,
+            'run_id': self.run_id,
+            'started_at': self.started_at.isoformat(timespec='milliseconds'),
+            **self.context,
+            'ok': self.error is None,
+            'error': self.error,
+            'seconds': self.seconds,
+            'rss_start_bytes': self.rss_start_bytes,
+            'rss_end_bytes': self.rss_end_bytes,
+            'stages': self.stage_summary(),
+        }
+
+
+@contextmanager
+def stage(name, rows=None):
+    """Ukur satu tahap jika ada profile aktif; yield StageRecord"""
+    profile = _current.get()
+    if profile is None:
+        yield StageRecord((name,), rows)
+        return
+
+    parent_path = profile.path
+    record = StageRecord(parent_path + (name,), rows)
+    # Urutan list = urutan mulai, sehingga sub-tahap tampil di bawah induknya
+    profile.stages.append(record)
+    profile.path = record.path
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - start
+        record.rss_delta_bytes = rss_bytes() - rss_before
+        profile.path = parent_path
+
+
+def timed(name):
+    """Decorator: ukur fungsi sebagai tahap; baris input/output dari DataFrame pertama"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with stage(name, rows=_rows(args[0]) if args else None) as record:
+                result = func(*args, **kwargs)
+                record.rows_out = _rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def profile_run(run, **context):
+    """Aktifkan instrumentasi untuk satu run lalu tulis satu baris log JSON"""
+    profile = RunProfile(run, **context)
+    token = _current.set(profile)
+    start = time.perf_counter()
+    try:
+        yield profile
+    except Exception as e:
+        profile.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        profile.seconds = time.perf_counter() - start
+        profile.rss_end_bytes = rss_bytes()
+        get_perf_logger().info(json.dumps(profile.to_record(), ensure_ascii=False, default=str))
+
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def get_perf_logger():
+    """Logger JSON lines performa: file di RESTOCK_PERF_LOG atau stderr"""
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                logger = logging.getLogger(LOGGER_NAME)
+                if not logger.handlers:
+                    path = os.environ.get(PERF_LOG_ENV)
+                    handler = logging.FileHandler(path, encoding='utf-8') if path else logging.StreamHandler(sys.stderr)
+                    handler.setFormatter(logging.Formatter('%(message)s'))
+                    logger.addHandler(handler)
+                    logger.setLevel(logging.INFO)
+                    logger.propagate = False
+                _logger = logger
+    return _logger
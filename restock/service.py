@@ -0,0 +1,468 @@
+"""HTTP service prediksi restock (asyncio, tanpa dependency tambahan).
+
+    python -m restock.service --port 8000
+
+Endpoint:
+
+- ``POST /predict``  body ``{"rows": [{"MINGGU": ..., "TANGGAL": "DD/MM/YYYY", ...}]}``
+  berisi histori terbaru satu/beberapa barang (kolom sama dengan file upload).
+  Response: satu rekomendasi per barang.
+- ``GET /metrics``   latensi (p50/p90/p99), throughput dan ukuran batch.
+- ``GET /health``
+
+Model tetap di memori (registry proses + forest terkompilasi) dan request kecil
+yang datang bersamaan digabung (micro-batching): request pertama membuka jendela
+``batch_window`` detik, semua request yang masuk selama jendela itu atau selama
+batch sebelumnya masih dihitung diproses dalam satu pass validasi ->
+inference_features -> ``model.predict``. Overhead pandas per panggilan (belasan
+ms) dibayar sekali per batch, bukan sekali per request.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .model_registry import MODEL_PATH
+from .pipeline import REQUIRED_COLUMNS, check_data, inference_features, load_model, predict_restock
+
+REQUEST_COLUMN = 'ID_REQUEST'
+
+OUTPUT_COLUMNS = ['KATEGORI', 'NAMA BARANG', 'SATUAN', 'TANGGAL', 'STOK AKHIR', 'REKOMENDASI_RESTOCK']
+
+DEFAULT_BATCH_WINDOW = 0.005
+DEFAULT_MAX_BATCH_ROWS = 50_000
+MAX_REQUEST_ROWS = 10_000
+MAX_BODY_BYTES = 16 * 1024 * 1024
+# Detail peringatan validasi per request (jumlah masalah di message tetap penuh)
+MAX_REQUEST_WARNINGS = 1_000
+
+# Jumlah latensi terakhir yang dipakai untuk persentil, dan jendela throughput
+LATENCY_WINDOW = 10_000
+THROUGHPUT_WINDOW_SECONDS = 60
+
+HTTP_REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    411: 'Length Required', 413: 'Payload Too Large', 422: 'Unprocessable Entity', 500: 'Internal Server Error',
+}
+
+
+class ServiceError(Exception):
+    """Error request dengan status HTTP"""
+
+    def __init__(self, status, message, warnings=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.warnings = warnings or []
+
+
+def _percentiles(values, scale=1000.0):
+    if not values:
+        return {'p50': None, 'p90': None, 'p99': None, 'max': None}
+    p50, p90, p99 = np.percentile(np.fromiter(values, dtype=float), [50, 90, 99]) * scale
+    return {'p50': round(p50, 3), 'p90': round(p90, 3), 'p99': round(p99, 3), 'max': round(max(values) * scale, 3)}
+
+
+class ServiceMetrics:
+    """Metrik request dan batch; hanya diperbarui dari thread event loop"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.status_counts = {}
+        self.rows = 0
+        self.items = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.completed_at = deque()
+        self.batches = 0
+        self.batch_requests = 0
+        self.max_batch_requests = 0
+        self.batch_seconds = deque(maxlen=LATENCY_WINDOW)
+
+    def record_request(self, status, seconds, rows=0, items=0):
+        now = time.monotonic()
+        self.requests += 1
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        self.rows += rows
+        self.items += items
+        self.latencies.append(seconds)
+        self.completed_at.append(now)
+        while self.completed_at and self.completed_at[0] < now - THROUGHPUT_WINDOW_SECONDS:
+            self.completed_at.popleft()
+
+    def record_batch(self, n_requests, seconds):
+        self.batches += 1
+        self.batch_requests += n_requests
+        self.max_batch_requests = max(self.max_batch_requests, n_requests)
+        self.batch_seconds.append(seconds)
+
+    def snapshot(self):
+        uptime = time.monotonic() - self.started
+        window = min(uptime, THROUGHPUT_WINDOW_SECONDS)
+        return {
+            'uptime_seconds': round(uptime, 3),
+            'requests': self.requests,
+            'status': {str(status): count for status, count in sorted(self.status_counts.items())},
+            'rows': self.rows,
+            'items': self.items,
+            'throughput_rps': round(self.requests / uptime, 2) if uptime else 0.0,
+            'throughput_rps_1m': round(len(self.completed_at) / window, 2) if window else 0.0,
+            'latency_ms': _percentiles(self.latencies),
+            'batches': self.batches,
+            'mean_batch_requests': round(self.batch_requests / self.batches, 2) if self.batches else 0.0,
+            'max_batch_requests': self.max_batch_requests,
+            'batch_ms': _percentiles(self.batch_seconds),
+        }
+
+
+def _request_warnings(problems, offsets):
+    """Peringatan per request (baris 0-based dalam request), maksimal MAX_REQUEST_WARNINGS per request
+
+    Dipotong dari daftar semua masalah batch (bukan indeks error yang dibatasi
+    untuk seluruh batch), sehingga isi response tidak bergantung pada request
+    lain di micro-batch yang sama.
+    """
+    bounds = np.searchsorted(problems['POSISI'].to_numpy(), offsets, side='left')
+    warnings = []
+    for request_id, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+        rows = problems.iloc[start:min(stop, start + MAX_REQUEST_WARNINGS)]
+        warnings.append([
+            {
+                'row': int(position - offsets[request_id]),
+                'column': column,
+                'reason': reason,
+                'value': None if pd.isna(value) else str(value),
+            }
+            for position, column, reason, value in zip(rows['POSISI'], rows['KOLOM'], rows['ALASAN'], rows['NILAI'])
+        ])
+    return warnings
+
+
+def _json_records(frame):
+    """Baris frame sebagai list dict; NaN/NaT menjadi None (null) agar body tetap JSON valid"""
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient='records')
+
+
+def predict_batch(batch_rows, model, strict=False):
+    """Satu pass pipeline untuk gabungan beberapa request; return list (status, body) per request"""
+    sizes = [len(rows) for rows in batch_rows]
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    records = [row for rows in batch_rows for row in rows]
+
+    df = pd.DataFrame.from_records(records, columns=REQUIRED_COLUMNS)
+    request_ids = np.repeat(np.arange(len(batch_rows)), sizes)
+    # Semua masalah dicatat: detail error dibatasi MAX_ERROR_ROWS untuk seluruh batch
+    report = check_data(df, duplicates=False, strict=strict, track_positions=True)
+
+    # Duplikat hanya dicek di dalam request yang sama
+    df[REQUEST_COLUMN] = request_ids
+    duplicated = (
+        df.duplicated([REQUEST_COLUMN, 'NAMA BARANG', 'TANGGAL']).to_numpy()
+        & df['NAMA BARANG'].notna().to_numpy() & df['TANGGAL'].notna().to_numpy()
+    )
+    report.add('duplikat', 'NAMA BARANG', np.flatnonzero(duplicated), df['NAMA BARANG'])
+
+    warnings = _request_warnings(report.problems(), offsets)
+    problems = np.bincount(request_ids[report.problem_positions()], minlength=len(batch_rows))
+    rejected = np.zeros(len(batch_rows), dtype=bool)
+    if strict:
+        rejected = problems > 0
+        df = df[~rejected[request_ids]]
+
+    outcomes = [None] * len(batch_rows)
+    for request_id in np.flatnonzero(rejected):
+        outcomes[request_id] = (422, {
+            'message': f"Data tidak valid: {problems[request_id]:,} masalah",
+            'warnings': warnings[request_id],
+        })
+
+    if len(df):
+        latest_data, success, message = inference_features(df, by=REQUEST_COLUMN)
+        if success:
+            results, success, message = predict_restock(latest_data, model, by=REQUEST_COLUMN)
+        if not success:
+            raise ServiceError(500, message)
+
+        output = results[OUTPUT_COLUMNS].assign(TANGGAL=results['TANGGAL'].dt.strftime('%d/%m/%Y'))
+        output_records = _json_records(output)
+        for request_id, positions in results.groupby(REQUEST_COLUMN).indices.items():
+            outcomes[request_id] = (200, {'results': [output_records[i] for i in positions]})
+
+    for request_id, outcome in enumerate(outcomes):
+        if outcome is None:
+            # Semua baris request tanpa NAMA BARANG: tidak ada barang untuk diprediksi
+            outcome = outcomes[request_id] = (200, {'results': []})
+        status, body = outcome
+        if status == 200:
+            body['items'] = len(body['results'])
+            body['message'] = (
+                f"Prediksi berhasil dengan catatan: {problems[request_id]:,} masalah"
+                if problems[request_id] else "Prediksi berhasil"
+            )
+            body['warnings'] = warnings[request_id]
+    return outcomes
+
+
+class MicroBatcher:
+    """Antrian request prediksi yang diproses per batch di satu thread worker"""
+
+    def __init__(self, model_path=MODEL_PATH, batch_window=DEFAULT_BATCH_WINDOW,
+                 max_batch_rows=DEFAULT_MAX_BATCH_ROWS, batching=True, strict=False, metrics=None):
+        self.model_path = model_path
+        self.batch_window = batch_window
+        self.max_batch_rows = max_batch_rows
+        self.batching = batching
+        self.strict = strict
+        self.metrics = metrics or ServiceMetrics()
+        self.queue = asyncio.Queue()
+        # Satu thread: pandas/numpy tidak memblokir event loop, batch diproses berurutan
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix='restock-predict')
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        self.executor.shutdown(wait=False)
+
+    async def submit(self, rows):
+        """Masukkan request ke antrian; return (status, body) setelah batch-nya selesai"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, future))
+        return await future
+
+    async def _collect(self):
+        """Ambil request pertama lalu tunggu request lain sampai jendela batch habis"""
+        batch = [await self.queue.get()]
+        if not self.batching:
+            return batch
+        rows = len(batch[0][0])
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_window
+        while rows < self.max_batch_rows:
+            if self.queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self.queue.get_nowait()
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def _predict(self, batch_rows):
+        # Model diambil dari registry tiap batch: tetap di memori, tetapi file model yang
+        # diganti ikut terpakai tanpa restart service
+        model = load_model(self.model_path)
+        try:
+            return predict_batch(batch_rows, model, strict=self.strict)
+        except Exception:
+            if len(batch_rows) == 1:
+                raise
+        # Batch gagal: proses satu per satu agar request yang salah tidak menggagalkan yang lain
+        outcomes = []
+        for rows in batch_rows:
+            try:
+                outcomes.extend(predict_batch([rows], model, strict=self.strict))
+            except ServiceError as e:
+                outcomes.append((e.status, {'message': e.message}))
+            except Exception as e:
+                outcomes.append((500, {'message': f"Error dalam prediksi: {str(e)}"}))
+        return outcomes
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            start = time.perf_counter()
+            try:
+                outcomes = await loop.run_in_executor(self.executor, self._predict, [rows for rows, _ in batch])
+            except ServiceError as e:
+                outcomes = [(e.status, {'message': e.message})] * len(batch)
+            except Exception as e:
+                outcomes = [(500, {'message': f"Error dalam prediksi: {str(e)}"})] * len(batch)
+            self.metrics.record_batch(len(batch), time.perf_counter() - start)
+            for (_, future), outcome in zip(batch, outcomes):
+                if not future.done():
+                    future.set_result(outcome)
+
+
+def parse_rows(body):
+    """Body JSON -> list baris (dict); raise ServiceError jika format salah"""
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise ServiceError(400, f"Body bukan JSON yang valid: {str(e)}")
+    rows = payload.get('rows') if isinstance(payload, dict) else payload
+    if not isinstance(rows, list) or not rows or not all(isinstance(row, dict) for row in rows):
+        raise ServiceError(400, "Body harus berisi 'rows': list objek (satu objek per baris data)")
+    if len(rows) > MAX_REQUEST_ROWS:
+        raise ServiceError(413, f"Maksimal {MAX_REQUEST_ROWS:,} baris per request")
+
+    present = set().union(*(row.keys() for row in rows))
+    missing = [col for col in REQUIRED_COLUMNS if col not in present]
+    if missing:
+        raise ServiceError(422, f"Kolom yang hilang: {', '.join(missing)}")
+    return rows
+
+
+def content_length(method, headers):
+    """Panjang body dari header Content-Length; raise ServiceError jika hilang/tidak valid"""
+    value = headers.get('content-length')
+    if value is None:
+        if method == 'POST':
+            raise ServiceError(411, "Header Content-Length wajib untuk POST")
+        return 0
+    if not value.isdigit():
+        raise ServiceError(400, f"Content-Length tidak valid: {value!r}")
+    return int(value)
+
+
+class PredictionService:
+    """Server HTTP/1.1 minimal (keep-alive) di atas asyncio streams"""
+
+    def __init__(self, batcher, model_path=MODEL_PATH):
+        self.batcher = batcher
+        self.model_path = model_path
+        self.metrics = batcher.metrics
+
+    async def predict(self, body):
+        start = time.perf_counter()
+        rows = []
+        try:
+            rows = parse_rows(body)
+            status, response = await self.batcher.submit(rows)
+        except ServiceError as e:
+            status, response = e.status, {'message': e.message, 'warnings': e.warnings}
+        self.metrics.record_request(status, time.perf_counter() - start, len(rows), response.get('items', 0))
+        return status, response
+
+    async def route(self, method, path, body):
+        if path == '/predict':
+            if method != 'POST':
+                return 405, {'message': "Gunakan POST"}
+            return await self.predict(body)
+        if path in ('/metrics', '/health') and method != 'GET':
+            return 405, {'message': "Gunakan GET"}
+        if path == '/metrics':
+            return 200, self.metrics.snapshot()
+        if path == '/health':
+            return 200, {'status': 'ok', 'model': self.model_path, 'batching': self.batcher.batching}
+        return 404, {'message': f"Endpoint tidak ada: {path}"}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                request_line, *header_lines = head.decode('latin-1').rstrip('\r\n').split('\r\n')
+                try:
+                    method, target, version = request_line.split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = content_length(method, headers)
+                except ServiceError as e:
+                    length, status, response = None, e.status, {'message': e.message}
+                if length is None or length > MAX_BODY_BYTES:
+                    # Batas body tidak diketahui/tidak dibaca: koneksi ditutup setelah respons
+                    if length is not None:
+                        status, response = 413, {'message': "Body terlalu besar"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    status, response = await self.route(method, target.split('?', 1)[0], body)
+                    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+                try:
+                    # allow_nan=False: NaN bukan JSON valid dan ditolak client yang ketat
+                    data = json.dumps(response, ensure_ascii=False, allow_nan=False, default=str)
+                except ValueError as e:
+                    status, data = 500, json.dumps({'message': f"Error dalam serialisasi response: {str(e)}"})
+                data = data.encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def warm_up(model_path=MODEL_PATH):
+    """Muat model dan jalankan satu prediksi agar request pertama tidak menanggung biaya load"""
+    from .synthetic import generate_sales
+
+    sample = generate_sales(2, n_items=1).astype(object)
+    predict_batch([sample.to_dict(orient='records')], load_model(model_path))
+
+
+async def serve(host='127.0.0.1', port=8000, model_path=MODEL_PATH, batch_window=DEFAULT_BATCH_WINDOW,
+                max_batch_rows=DEFAULT_MAX_BATCH_ROWS, batching=True, strict=False):
+    warm_up(model_path)
+    batcher = MicroBatcher(model_path, batch_window, max_batch_rows, batching, strict)
+    batcher.start()
+    service = PredictionService(batcher, model_path)
+    server = await asyncio.start_server(service.handle, host, port)
+    mode = f"micro-batching {batch_window * 1000:g} ms" if batching else "tanpa batching"
+    print(f"Service prediksi restock berjalan di http://{host}:{port} ({mode})", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m restock.service', description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('-m', '--model', default=MODEL_PATH, help=f"Path file model (default: {MODEL_PATH})")
+    parser.add_argument('--batch-window-ms', type=float, default=DEFAULT_BATCH_WINDOW * 1000,
+                        help="Lama menunggu request lain untuk digabung (default: %(default)s ms)")
+    parser.add_argument('--max-batch-rows', type=int, default=DEFAULT_MAX_BATCH_ROWS,
+                        help="Batas baris per batch (default: %(default)s)")
+    parser.add_argument('--no-batching', action='store_true', help="Satu pass pipeline per request (pembanding)")
+    parser.add_argument('--strict', action='store_true', help="Tolak request yang punya masalah per baris")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        asyncio.run(serve(
+            args.host, args.port, args.model, args.batch_window_ms / 1000, args.max_batch_rows,
+            not args.no_batching, args.strict,
+        ))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Simulasi what-if persediaan dengan ketidakpastian per pohon RandomForest.
+
+Prediksi setiap pohon dipakai sebagai sampel permintaan minggu depan per barang
+(bukan hanya rata-ratanya). Konversi restock -> permintaan sama dengan
+restock.forecast: permintaan = restock + STOK AKHIR jika restock (dibulatkan) > 0,
+selain itu penjualan minggu terakhir.
+
+Kebijakan per skenario (order-up-to, satu pesanan sekarang):
+
+- permintaan skenario = sampel x faktor_harga ** elastisitas
+- JUMLAH_PESAN = ceil((lead_time + 1 + stok_pengaman) x rata-rata permintaan - STOK AKHIR), minimal 0
+- stockout jika permintaan selama lead time > STOK AKHIR (pesanan belum datang)
+  atau permintaan lead time + 1 minggu > STOK AKHIR + JUMLAH_PESAN
+- INVESTASI = JUMLAH_PESAN x harga satuan x faktor_harga
+
+Semua barang x skenario dihitung dengan operasi array dalam satu pass: sampel
+per barang diurutkan sekali, jumlah sampel di atas ambang dicari dengan satu
+``np.searchsorted`` pada array datar (offset per barang) dan kekurangan rata-rata
+dari suffix-sum, tanpa array barang x skenario x pohon dan tanpa loop Python.
+"""
+import numpy as np
+import pandas as pd
+
+from .pipeline import FEATURES
+from .profiling import stage, timed
+
+# Sama dengan asumsi harga di halaman Analisis
+DEFAULT_UNIT_PRICE = 10_000
+
+DEFAULT_SAFETY_WEEKS = (0.0, 0.5, 1.0)
+DEFAULT_LEAD_WEEKS = (0, 1, 2)
+DEFAULT_PRICE_FACTORS = (0.9, 1.0, 1.1)
+
+# Barang dianggap berisiko jika peluang stockout di atas batas ini
+RISK_THRESHOLD = 0.2
+
+SCENARIO_COLUMNS = ['STOK_PENGAMAN_MINGGU', 'LEAD_TIME_MINGGU', 'FAKTOR_HARGA']
+
+
+def scenario_grid(safety_weeks=DEFAULT_SAFETY_WEEKS, lead_weeks=DEFAULT_LEAD_WEEKS,
+                  price_factors=DEFAULT_PRICE_FACTORS):
+    """Semua kombinasi parameter sebagai frame, satu baris per skenario"""
+    grid = pd.MultiIndex.from_product(
+        [sorted(set(safety_weeks)), sorted(set(lead_weeks)), sorted(set(price_factors))],
+        names=SCENARIO_COLUMNS,
+    ).to_frame(index=False)
+    grid.insert(0, 'SKENARIO', np.arange(1, len(grid) + 1))
+    return grid
+
+
+def per_tree_predictions(model, X):
+    """Prediksi tiap pohon, shape (n_pohon, n_barang)"""
+    if hasattr(model, 'predict_per_tree'):
+        return model.predict_per_tree(X)
+    # Fallback RandomForest sklearn (loop per pohon, bukan per barang)
+    X = pd.DataFrame(np.asarray(X, dtype=np.float64), columns=FEATURES)
+    return np.stack([tree.predict(X.to_numpy()) for tree in model.estimators_])
+
+
+def demand_samples(latest_data, model):
+    """Sampel permintaan minggu depan, shape (n_barang, n_pohon), terurut naik per barang"""
+    X = latest_data[FEATURES].to_numpy(dtype=np.float64)
+    with stage('per_tree_predict', rows=len(X)):
+        restock = np.maximum(per_tree_predictions(model, X).T, 0)
+    stok_akhir = latest_data['STOK AKHIR'].to_numpy(dtype=np.float64)[:, None]
+    terjual = latest_data['JUMLAH TERJUAL'].to_numpy(dtype=np.float64)[:, None]
+    samples = np.where(np.round(restock) > 0, restock + stok_akhir, terjual)
+    # Permintaan tidak negatif (juga syarat offset di _count_above)
+    samples = np.maximum(np.nan_to_num(samples, nan=0.0), 0)
+    samples.sort(axis=1)
+    return samples
+
+
+def _count_above(sorted_samples, offsets, thresholds):
+    """Jumlah sampel > ambang untuk setiap (skenario, barang) dengan satu searchsorted
+
+    ``sorted_samples + offsets`` terurut secara global karena sampel tiap barang
+    terurut dan offset barang berikutnya lebih besar dari sampel terbesar.
+    """
+    n_items, n_trees = sorted_samples.shape
+    flat = (sorted_samples + offsets[:, None]).ravel()
+    positions = np.searchsorted(flat, thresholds + offsets[None, :], side='right')
+    at_or_below = np.clip(positions - np.arange(n_items)[None, :] * n_trees, 0, n_trees)
+    return n_trees - at_or_below
+
+
+def item_prices(latest_data, unit_price=DEFAULT_UNIT_PRICE):
+    """Harga satuan per barang: angka tunggal, dict per KATEGORI, atau Series per NAMA BARANG"""
+    if isinstance(unit_price, dict):
+        prices = latest_data['KATEGORI'].astype(object).map(unit_price)
+    elif isinstance(unit_price, pd.Series):
+        prices = latest_data['NAMA BARANG'].astype(object).map(unit_price)
+    else:
+        return np.full(len(latest_data), float(unit_price))
+    return prices.astype('float64').fillna(DEFAULT_UNIT_PRICE).to_numpy()
+
+
+@timed('simulate')
+def simulate(latest_data, model, scenarios=None, unit_price=DEFAULT_UNIT_PRICE, elasticity=0.0):
+    """Jalankan semua skenario; return (per_item, per_kategori, per_skenario, success, message)
+
+    ``latest_data`` = satu baris feature terbaru per barang (hasil prediksi).
+    ``per_item`` berformat panjang: satu baris per skenario per barang.
+    """
+    try:
+        scenarios = scenario_grid() if scenarios is None else scenarios.reset_index(drop=True)
+        samples = demand_samples(latest_data, model)
+        n_items, n_trees = samples.shape
+
+        with stage('scenarios', rows=n_items * len(scenarios)) as record:
+            # Parameter skenario sebagai kolom (S, 1), data barang sebagai baris (1, n)
+            safety = scenarios['STOK_PENGAMAN_MINGGU'].to_numpy(dtype=np.float64)[:, None]
+            lead = scenarios['LEAD_TIME_MINGGU'].to_numpy(dtype=np.float64)[:, None]
+            price_factor = scenarios['FAKTOR_HARGA'].to_numpy(dtype=np.float64)[:, None]
+            demand_factor = price_factor ** elasticity
+
+            stok_akhir = np.nan_to_num(latest_data['STOK AKHIR'].to_numpy(dtype=np.float64))
+            mean_demand = samples.mean(axis=1)
+            std_demand = samples.std(axis=1)
+            prices = item_prices(latest_data, unit_price)
+
+            expected = mean_demand[None, :] * demand_factor
+            order_qty = np.maximum(np.ceil((lead + 1 + safety) * expected - stok_akhir - 1e-9), 0)
+            available = stok_akhir + order_qty
+
+            # Ambang sampel (sebelum faktor permintaan) yang menyebabkan stockout
+            with np.errstate(divide='ignore'):
+                during_lead = np.where(lead > 0, stok_akhir / (lead * demand_factor), np.inf)
+            after_arrival = available / ((lead + 1) * demand_factor)
+            offsets = np.arange(n_items) * (samples.max(initial=0.0) + 1.0)
+            stockout_count = _count_above(samples, offsets, np.minimum(during_lead, after_arrival))
+
+            # Kekurangan rata-rata = E[max(k x sampel - tersedia, 0)] dari suffix-sum sampel terurut
+            short_count = _count_above(samples, offsets, after_arrival)
+            suffix = np.concatenate([np.cumsum(samples[:, ::-1], axis=1)[:, ::-1], np.zeros((n_items, 1))], axis=1)
+            tail_sum = suffix[np.arange(n_items)[None, :], n_trees - short_count]
+            k = (lead + 1) * demand_factor
+            shortage = np.maximum(k * tail_sum - available * short_count, 0) / n_trees
+
+            n_scenarios = len(scenarios)
+            per_item = pd.DataFrame({
+                'SKENARIO': np.repeat(scenarios['SKENARIO'].to_numpy(), n_items),
+                **{col: np.repeat(scenarios[col].to_numpy(), n_items) for col in SCENARIO_COLUMNS},
+                'KATEGORI': np.tile(latest_data['KATEGORI'].to_numpy(), n_scenarios),
+                'NAMA BARANG': np.tile(latest_data['NAMA BARANG'].to_numpy(), n_scenarios),
+                'STOK AKHIR': np.tile(stok_akhir, n_scenarios),
+                'PERMINTAAN_RATA2': expected.ravel(),
+                'PERMINTAAN_STD': (std_demand[None, :] * demand_factor).ravel(),
+                'JUMLAH_PESAN': order_qty.ravel().astype(np.int64),
+                'PELUANG_STOCKOUT': (stockout_count / n_trees).ravel(),
+                'KEKURANGAN_RATA2': shortage.ravel(),
+                'INVESTASI': (order_qty * prices[None, :] * price_factor).ravel(),
+            })
+            for col in ['KATEGORI', 'NAMA BARANG']:
+                if isinstance(latest_data[col].dtype, pd.CategoricalDtype):
+                    per_item[col] = pd.Categorical(per_item[col], dtype=latest_data[col].dtype)
+            record.rows_out = len(per_item)
+
+        per_kategori, per_scenario = summarize_simulation(per_item)
+        return per_item, per_kategori, per_scenario, True, (
+            f"Simulasi {n_scenarios} skenario x {n_items:,} barang ({n_trees} sampel per barang) berhasil"
+        )
+
+    except Exception as e:
+        return None, None, None, False, f"Error dalam simulasi: {str(e)}"
+
+
+def summarize_simulation(per_item, risk_threshold=RISK_THRESHOLD):
+    """Agregat per (skenario, KATEGORI) dan per skenario"""
+    flagged = per_item.assign(BERISIKO=per_item['PELUANG_STOCKOUT'] > risk_threshold)
+    aggregations = {
+        'BARANG': ('NAMA BARANG', 'size'),
+        'JUMLAH_PESAN': ('JUMLAH_PESAN', 'sum'),
+        'INVESTASI': ('INVESTASI', 'sum'),
+        'PELUANG_STOCKOUT_RATA2': ('PELUANG_STOCKOUT', 'mean'),
+        'BARANG_BERISIKO': ('BERISIKO', 'sum'),
+        'KEKURANGAN_TOTAL': ('KEKURANGAN_RATA2', 'sum'),
+    }
+    keys = ['SKENARIO'] + SCENARIO_COLUMNS
+    per_kategori = flagged.groupby(keys + ['KATEGORI'], observed=True).agg(**aggregations).reset_index()
+    per_scenario = flagged.groupby(keys, observed=True).agg(**aggregations).reset_index()
+    return per_kategori, per_scenario
@@ -0,0 +1,92 @@
+"""Generator data penjualan sintetis dengan schema upload (8 kolom).
+
+Dipakai untuk benchmark dan uji beban: hasilnya deterministik untuk seed yang
+sama. Setiap barang punya rata-rata permintaan sendiri dengan pola musiman,
+penjualan tidak pernah melebihi stok, STOK AKHIR = STOK AWAL - JUMLAH TERJUAL,
+dan stok diisi ulang saat menipis.
+"""
+import numpy as np
+import pandas as pd
+
+from .pipeline import REQUIRED_COLUMNS
+from .vocab import get_vocabularies
+
+SATUAN = ['pcs', 'pack', 'botol', 'kg', 'dus', 'sachet']
+
+START_DATE = '2024-01-01'
+
+# Histori paling panjang (±5 tahun); jumlah baris lebih besar dicapai dengan menambah barang
+MAX_HISTORY_WEEKS = 260
+
+
+def item_catalog(n_items, rng):
+    """Nama barang dan kategori: nama dari vocabulary model dulu, sisanya varian bernomor"""
+    vocabularies = get_vocabularies()
+    known_names = np.asarray(vocabularies['NAMA BARANG'].categories, dtype=object)
+    kategori = np.asarray(vocabularies['KATEGORI'].categories, dtype=object)
+
+    index = np.arange(n_items)
+    base = known_names[index % len(known_names)]
+    variant = index // len(known_names)
+    names = np.where(variant == 0, base, [f"{name} #{v}" for name, v in zip(base, variant)])
+
+    return {
+        'NAMA BARANG': names.astype(object),
+        'KATEGORI': kategori[index % len(kategori)],
+        'SATUAN': np.asarray(SATUAN, dtype=object)[rng.integers(0, len(SATUAN), n_items)],
+    }
+
+
+def items_for_rows(n_rows, n_items=41):
+    """Jumlah barang efektif: minimal ``n_items``, cukup banyak agar histori <= MAX_HISTORY_WEEKS"""
+    return max(1, min(max(n_items, -(-n_rows // MAX_HISTORY_WEEKS)), n_rows))
+
+
+def generate_sales(n_rows, n_items=41, seed=0, start=START_DATE):
+    """DataFrame penjualan mingguan sebanyak ``n_rows`` baris untuk minimal ``n_items`` barang
+
+    Baris diurutkan per minggu (seperti export mingguan). Minggu terakhir bisa
+    terisi sebagian jika ``n_rows`` bukan kelipatan jumlah barang. Jumlah barang
+    dinaikkan (lihat ``items_for_rows``) jika ``n_items`` barang butuh histori
+    lebih dari MAX_HISTORY_WEEKS minggu.
+    """
+    n_items = items_for_rows(n_rows, n_items)
+    n_weeks = -(-n_rows // n_items)
+    rng = np.random.default_rng(seed)
+    catalog = item_catalog(n_items, rng)
+
+    demand = rng.lognormal(mean=3.0, sigma=0.7, size=n_items)
+    reorder_point = np.ceil(demand * 1.5)
+    reorder_qty = np.ceil(demand * rng.uniform(2.0, 4.0, size=n_items))
+    stock = np.ceil(demand * 3)
+
+    awal = np.empty((n_weeks, n_items), dtype=np.int64)
+    terjual = np.empty((n_weeks, n_items), dtype=np.int64)
+    week_index = np.arange(n_weeks)
+    season = 1 + 0.25 * np.sin(2 * np.pi * week_index / 52)
+
+    # Satu iterasi per minggu, vektor per barang
+    for week in range(n_weeks):
+        stock = np.where(stock < reorder_point, stock + reorder_qty, stock)
+        sold = np.minimum(rng.poisson(demand * season[week]), stock)
+        awal[week] = stock
+        terjual[week] = sold
+        stock = stock - sold
+
+    dates = pd.date_range(start, periods=n_weeks, freq='7D').strftime('%d/%m/%Y').to_numpy(dtype=object)
+    weeks = np.repeat(week_index, n_items)[:n_rows]
+    items = np.tile(np.arange(n_items), n_weeks)[:n_rows]
+    awal = awal.ravel()[:n_rows]
+    terjual = terjual.ravel()[:n_rows]
+
+    df = pd.DataFrame({
+        'MINGGU': weeks + 1,
+        'TANGGAL': dates[weeks],
+        'KATEGORI': catalog['KATEGORI'][items],
+        'NAMA BARANG': catalog['NAMA BARANG'][items],
+        'SATUAN': catalog['SATUAN'][items],
+        'STOK AWAL': awal,
+        'JUMLAH TERJUAL': terjual,
+        'STOK AKHIR': awal - terjual,
+    })
+    return df[REQUIRED_COLUMNS]
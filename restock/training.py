@@ -0,0 +1,303 @@
+"""Latih ulang model restock di background dari histori yang di-upload.
+
+Target = RESTOCK_NEEDED dari ``feature_engineering`` (penjualan minggu depan −
+STOK AKHIR, minimal 0); baris minggu terakhir tiap barang tidak punya target.
+Vocabulary (LabelEncoder) model aktif dipakai apa adanya agar kode barang tetap
+sama; barang baru dilatih dengan kode ``UNKNOWN_CODE``.
+
+Mode:
+- ``full``: RandomForest baru dengan hyperparameter model aktif, semua core (``n_jobs``).
+- ``warm_start``: salinan model aktif ditambah ``add_trees`` pohon yang dilatih
+  hanya dari minggu baru (setelah ``trained_until`` model aktif, atau
+  ``recent_weeks`` minggu sebelum holdout ditambah minggu holdout jika model
+  belum punya metadata training).
+
+Error dihitung pada ``holdout_weeks`` minggu terakhir (split waktu) untuk
+kandidat yang dilatih tanpa minggu tersebut, dibandingkan dengan model aktif.
+Setelah itu kandidat dilatih ulang dengan semua minggu (``refit``), ditulis ke
+file kandidat, lalu dipasang dengan ``os.replace`` (atomik; registry memuat
+versi baru pada akses berikutnya, model lama disimpan sebagai ``*.prev.joblib``).
+"""
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .model_registry import MODEL_PATH, extract_model, get_registry
+from .pipeline import FEATURES, feature_engineering
+from .profiling import profile_run
+
+TARGET = 'RESTOCK_NEEDED'
+TRAINING_KEY = 'training'
+
+DEFAULT_HOLDOUT_WEEKS = 4
+DEFAULT_ADD_TREES = 20
+DEFAULT_RECENT_WEEKS = 4
+
+# Kandidat dipasang otomatis jika MAE holdout tidak lebih buruk dari model aktif + toleransi
+SWAP_TOLERANCE = 0.02
+
+
+def sibling_path(model_path, suffix):
+    """Path di samping file model, mis. model_restock.candidate.joblib"""
+    root, ext = os.path.splitext(model_path)
+    return f"{root}.{suffix}{ext}"
+
+
+def regression_metrics(y_true, y_pred):
+    """MAE, RMSE dan R² (prediksi dibulatkan dan dipotong di 0 seperti predict_restock)"""
+    y_pred = np.maximum(np.round(y_pred), 0)
+    error = y_pred - y_true
+    total = ((y_true - y_true.mean()) ** 2).sum()
+    return {
+        'mae': float(np.abs(error).mean()),
+        'rmse': float(np.sqrt((error ** 2).mean())),
+        'r2': float(1 - (error ** 2).sum() / total) if total else None,
+    }
+
+
+def training_frame(df):
+    """Feature + target dari histori; hanya baris dengan target dan feature lengkap"""
+    df_processed, _, _, success, message = feature_engineering(df)
+    if not success:
+        raise ValueError(message)
+    labeled = df_processed.dropna(subset=FEATURES + [TARGET, 'TANGGAL'])
+    if labeled.empty:
+        raise ValueError("Tidak ada baris berlabel (butuh minimal dua minggu per barang)")
+    return labeled
+
+
+def time_split(labeled, holdout_weeks):
+    """Split berdasarkan tanggal: ``holdout_weeks`` tanggal terakhir sebagai holdout"""
+    dates = np.sort(labeled['TANGGAL'].unique())
+    if len(dates) <= holdout_weeks:
+        raise ValueError(f"Data terlalu sedikit: {len(dates)} minggu berlabel, holdout {holdout_weeks} minggu")
+    cutoff = dates[-holdout_weeks]
+    is_holdout = (labeled['TANGGAL'] >= cutoff).to_numpy()
+    return labeled[~is_holdout], labeled[is_holdout]
+
+
+def model_trained_until(artifact):
+    """Tanggal terakhir data training model aktif (None jika tidak ada metadata)"""
+    value = artifact.get(TRAINING_KEY, {}).get('trained_until') if isinstance(artifact, dict) else None
+    return pd.Timestamp(value) if value is not None else None
+
+
+def new_weeks(labeled, artifact, recent_weeks=DEFAULT_RECENT_WEEKS, holdout_weeks=0):
+    """Baris setelah data training model aktif (untuk warm start)
+
+    Tanpa ``trained_until`` diambil ``recent_weeks + holdout_weeks`` tanggal
+    terakhir, sehingga tetap ada ``recent_weeks`` minggu untuk melatih kandidat
+    evaluasi sebelum minggu holdout.
+    """
+    until = model_trained_until(artifact)
+    if until is not None:
+        return labeled[labeled['TANGGAL'] > until]
+    dates = np.sort(labeled['TANGGAL'].unique())
+    return labeled[labeled['TANGGAL'] >= dates[-min(recent_weeks + holdout_weeks, len(dates))]]
+
+
+def fit_model(rows, base_model, mode, add_trees=DEFAULT_ADD_TREES, n_jobs=-1):
+    """Latih model dari baris berlabel; ``base_model`` tidak diubah"""
+    X = rows[FEATURES].to_numpy(dtype=np.float64)
+    y = rows[TARGET].to_numpy(dtype=np.float64)
+    if mode == 'warm_start':
+        import copy
+        model = copy.deepcopy(base_model)
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + add_trees, n_jobs=n_jobs)
+    else:
+        from sklearn.base import clone
+        model = clone(base_model).set_params(warm_start=False, n_jobs=n_jobs)
+    model.fit(pd.DataFrame(X, columns=FEATURES), y)
+    # Prediksi di app memakai forest terkompilasi; n_jobs hanya untuk training
+    model.set_params(warm_start=False, n_jobs=None)
+    return model
+
+
+def predict_rows(model, rows):
+    return model.predict(pd.DataFrame(rows[FEATURES].to_numpy(dtype=np.float64), columns=FEATURES))
+
+
+@dataclass
+class TrainingResult:
+    """Ringkasan satu training: metrik holdout, jumlah baris, file kandidat"""
+    mode: str
+    n_trees: int
+    train_rows: int
+    holdout_rows: int
+    fit_rows: int
+    trained_until: str
+    candidate_metrics: dict
+    active_metrics: dict
+    candidate_path: str
+    seconds: float
+    activated: bool = False
+
+    @property
+    def improved(self):
+        return self.candidate_metrics['mae'] <= self.active_metrics['mae'] * (1 + SWAP_TOLERANCE)
+
+
+def retrain(df, model_path=MODEL_PATH, mode='full', holdout_weeks=DEFAULT_HOLDOUT_WEEKS,
+            add_trees=DEFAULT_ADD_TREES, recent_weeks=DEFAULT_RECENT_WEEKS, refit=True,
+            auto_activate=True, n_jobs=-1, progress=None):
+    """Latih kandidat, ukur error holdout, simpan dan (opsional) pasang; return TrainingResult"""
+    start = time.perf_counter()
+    report = progress or (lambda message: None)
+
+    report("Menyiapkan feature dan target")
+    labeled = training_frame(df)
+    train_rows, holdout_rows = time_split(labeled, holdout_weeks)
+
+    # Salinan penuh di memori: artifact registry di-memory-map (read-only)
+    entry = get_registry().get(model_path)
+    artifact = joblib.load(entry.path)
+    active_model = extract_model(artifact)
+
+    if mode == 'warm_start':
+        fit_rows = new_weeks(labeled, artifact, recent_weeks, holdout_weeks)
+        eval_rows = fit_rows[fit_rows['TANGGAL'] < holdout_rows['TANGGAL'].min()]
+        if eval_rows.empty:
+            # Hanya terjadi jika model punya trained_until: semua minggu setelahnya jatuh di holdout
+            raise ValueError(
+                f"Semua minggu setelah data training model aktif ({model_trained_until(artifact):%d/%m/%Y}) "
+                f"terpakai sebagai holdout {holdout_weeks} minggu; upload minggu yang lebih baru "
+                "atau kurangi minggu holdout"
+            )
+    else:
+        fit_rows, eval_rows = labeled, train_rows
+
+    report(f"Melatih kandidat untuk evaluasi ({len(eval_rows):,} baris)")
+    candidate = fit_model(eval_rows, active_model, mode, add_trees, n_jobs)
+    y_holdout = holdout_rows[TARGET].to_numpy(dtype=np.float64)
+    candidate_metrics = regression_metrics(y_holdout, predict_rows(candidate, holdout_rows))
+    active_metrics = regression_metrics(y_holdout, predict_rows(active_model, holdout_rows))
+
+    if refit:
+        report(f"Melatih ulang dengan semua minggu ({len(fit_rows):,} baris)")
+        candidate = fit_model(fit_rows, active_model, mode, add_trees, n_jobs)
+
+    trained_until = labeled['TANGGAL'].max()
+    importance = pd.DataFrame({'feature': FEATURES, 'importance': candidate.feature_importances_})
+    new_artifact = dict(artifact) if isinstance(artifact, dict) else {}
+    new_artifact.update({
+        'model': candidate,
+        'features': list(FEATURES),
+        'feature_importance': importance.sort_values('importance', ascending=False),
+        TRAINING_KEY: {
+            'mode': mode,
+            'trained_at': datetime.now().isoformat(timespec='seconds'),
+            'trained_until': trained_until.isoformat(),
+            'rows': len(fit_rows),
+            'holdout_weeks': holdout_weeks,
+            'holdout_metrics': candidate_metrics,
+        },
+    })
+
+    report("Menyimpan model kandidat")
+    candidate_path = sibling_path(entry.path, 'candidate')
+    tmp_path = f"{candidate_path}.{os.getpid()}.tmp"
+    joblib.dump(new_artifact, tmp_path)
+    os.replace(tmp_path, candidate_path)
+
+    result = TrainingResult(
+        mode=mode,
+        n_trees=len(candidate.estimators_),
+        train_rows=len(eval_rows),
+        holdout_rows=len(holdout_rows),
+        fit_rows=len(fit_rows) if refit else len(eval_rows),
+        trained_until=trained_until.strftime('%d/%m/%Y'),
+        candidate_metrics=candidate_metrics,
+        active_metrics=active_metrics,
+        candidate_path=candidate_path,
+        seconds=0.0,
+    )
+    if auto_activate and result.improved:
+        report("Memasang model baru")
+        activate_model(candidate_path, entry.path)
+        result.activated = True
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def activate_model(candidate_path, model_path=MODEL_PATH):
+    """Pasang kandidat secara atomik; model lama disimpan sebagai ``*.prev.joblib``"""
+    backup_path = sibling_path(model_path, 'prev')
+    tmp_path = f"{backup_path}.{os.getpid()}.tmp"
+    shutil.copy2(model_path, tmp_path)
+    os.replace(tmp_path, backup_path)
+    # Rename di folder yang sama: pembaca melihat file lama atau baru, tidak pernah setengah jadi
+    os.replace(candidate_path, model_path)
+    return model_path
+
+
+@dataclass
+class TrainingJob:
+    """Status satu job training di background"""
+    job_id: str
+    mode: str
+    status: str = 'berjalan'
+    message: str = "Menunggu"
+    started_at: float = field(default_factory=time.time)
+    finished_at: float = None
+    result: TrainingResult = None
+    error: str = None
+
+    @property
+    def running(self):
+        return self.status == 'berjalan'
+
+
+class RetrainManager:
+    """Menjalankan maksimal satu job training per proses di thread background"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.job = None
+
+    def start(self, df, model_path=MODEL_PATH, mode='full', **options):
+        """Mulai job baru; return (job, success, message)"""
+        with self._lock:
+            if self.job is not None and self.job.running:
+                return self.job, False, "Masih ada training yang berjalan"
+            job = self.job = TrainingJob(job_id=uuid.uuid4().hex[:12], mode=mode)
+
+        def progress(message):
+            job.message = message
+
+        def run():
+            try:
+                # Satu baris log performa per job (tahap feature_engineering ikut tercatat)
+                with profile_run('training', job_id=job.job_id, mode=mode, rows=len(df)):
+                    job.result = retrain(df, model_path, mode=mode, progress=progress, **options)
+                job.status = 'selesai'
+                job.message = "Model baru dipasang" if job.result.activated else "Kandidat tersimpan, model aktif tidak diganti"
+            except Exception as e:
+                job.status = 'gagal'
+                job.error = job.message = f"Error dalam training: {str(e)}"
+            finally:
+                job.finished_at = time.time()
+
+        threading.Thread(target=run, name=f"restock-train-{job.job_id}", daemon=True).start()
+        return job, True, "Training dimulai di background"
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_retrain_manager():
+    """Manager training tunggal untuk seluruh proses"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = RetrainManager()
+    return _manager
@@ -0,0 +1,292 @@
+"""Validasi schema dan aturan domain secara vektor, satu pass per kolom.
+
+Kolom angka dan TANGGAL (DD/MM/YYYY) diparse sekali di sini dan hasilnya
+ditulis kembali ke frame, sehingga feature engineering tidak perlu parsing
+ulang. Setiap masalah dicatat sebagai baris di indeks error ringkas
+(BARIS, KOLOM, ALASAN, NILAI) dengan nomor baris sesuai file (header = baris 1).
+Reader yang melewati baris kosong (xlsx) memberikan ``line_numbers`` per baris
+agar nomor baris tetap sama dengan spreadsheet.
+
+Aturan:
+- angka tidak valid / nilai kosong pada kolom wajib
+- TANGGAL bukan DD/MM/YYYY
+- stok atau penjualan negatif
+- STOK AKHIR ≈ STOK AWAL − JUMLAH TERJUAL
+- duplikat NAMA BARANG + TANGGAL
+
+Hanya kolom yang hilang membuat data tidak valid; masalah per baris dilaporkan
+sebagai peringatan (nilainya menjadi kosong seperti sebelumnya), kecuali
+``strict=True``.
+"""
+import json
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = '%d/%m/%Y'
+
+NUMERIC_COLUMNS = ['MINGGU', 'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR']
+NON_NEGATIVE_COLUMNS = ['STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR']
+
+# Selisih yang masih dianggap seimbang (toleransi pembulatan)
+STOCK_BALANCE_TOLERANCE = 0.5
+
+# Nomor baris file = posisi data + baris header + 1
+HEADER_ROWS = 1
+
+# Detail error yang disimpan; jumlah per alasan tetap dihitung penuh
+MAX_ERROR_ROWS = 1_000
+
+REASONS = {
+    'nilai_kosong': "Nilai kosong",
+    'angka_tidak_valid': "Bukan angka",
+    'tanggal_tidak_valid': "Tanggal bukan DD/MM/YYYY",
+    'negatif': "Nilai negatif",
+    'stok_tidak_seimbang': "STOK AKHIR ≠ STOK AWAL − JUMLAH TERJUAL",
+    'duplikat': "Duplikat NAMA BARANG + TANGGAL",
+}
+
+ERROR_COLUMNS = ['BARIS', 'KOLOM', 'ALASAN', 'NILAI']
+
+
+def _empty_errors():
+    return pd.DataFrame({
+        'BARIS': pd.Series(dtype='int64'),
+        'KOLOM': pd.Series(dtype=object),
+        'ALASAN': pd.Series(dtype=object),
+        'NILAI': pd.Series(dtype=object),
+    })
+
+
+@dataclass
+class ValidationReport:
+    """Hasil validasi: kolom hilang, jumlah masalah per (kolom, alasan), detail terbatas"""
+    n_rows: int = 0
+    missing_columns: list = field(default_factory=list)
+    counts: dict = field(default_factory=dict)
+    errors: pd.DataFrame = field(default_factory=_empty_errors, repr=False)
+    strict: bool = False
+    # Semua masalah tanpa batas MAX_ERROR_ROWS sebagai (kolom, alasan, posisi, nilai) per aturan
+    # (None = tidak dicatat)
+    positions: list = field(default=None, repr=False)
+
+    @property
+    def n_errors(self):
+        return sum(self.counts.values())
+
+    @property
+    def is_valid(self):
+        return not self.missing_columns and not (self.strict and self.n_errors)
+
+    def add(self, reason, column, positions, values=None, row_offset=0, line_numbers=None):
+        """Catat masalah pada posisi (0-based dalam frame) untuk satu kolom
+
+        ``line_numbers``: nomor baris file per baris frame; default posisi + offset + header.
+        """
+        if len(positions) == 0:
+            return
+        key = (column, reason)
+        self.counts[key] = self.counts.get(key, 0) + len(positions)
+        if self.positions is not None:
+            self.positions.append((
+                column, reason, np.asarray(positions, dtype=np.int64) + row_offset,
+                _take(values, positions) if values is not None else None,
+            ))
+
+        # Posisi sudah urut, cukup ambil MAX_ERROR_ROWS pertama dari tiap aturan
+        positions = positions[:MAX_ERROR_ROWS]
+        detail = pd.DataFrame({
+            'BARIS': (line_numbers[positions] if line_numbers is not None
+                      else positions + row_offset + HEADER_ROWS + 1),
+            'KOLOM': column,
+            'ALASAN': REASONS[reason],
+            'NILAI': _take(values, positions) if values is not None else None,
+        })
+        merged = pd.concat([self.errors, detail], ignore_index=True) if len(self.errors) else detail
+        self.errors = merged.sort_values('BARIS', kind='stable').head(MAX_ERROR_ROWS).reset_index(drop=True)
+
+    def merge(self, other):
+        """Gabungkan laporan chunk berikutnya (nomor baris sudah absolut)"""
+        self.n_rows += other.n_rows
+        self.missing_columns = self.missing_columns or other.missing_columns
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        if self.positions is not None and other.positions:
+            self.positions.extend(other.positions)
+        if len(other.errors):
+            merged = pd.concat([self.errors, other.errors], ignore_index=True) if len(self.errors) else other.errors
+            self.errors = merged.sort_values('BARIS', kind='stable').head(MAX_ERROR_ROWS).reset_index(drop=True)
+        return self
+
+    def problem_positions(self):
+        """Posisi 0-based semua masalah (satu entri per masalah); butuh ``track_positions``"""
+        if not self.positions:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([positions for _, _, positions, _ in self.positions])
+
+    def problems(self):
+        """Semua masalah (POSISI 0-based, KOLOM, ALASAN, NILAI) terurut posisi, tanpa batas
+
+        Butuh ``track_positions``; urutan dalam satu posisi sama dengan ``errors``.
+        """
+        if not self.positions:
+            return pd.DataFrame({
+                'POSISI': pd.Series(dtype='int64'), 'KOLOM': pd.Series(dtype=object),
+                'ALASAN': pd.Series(dtype=object), 'NILAI': pd.Series(dtype=object),
+            })
+        sizes = [len(positions) for _, _, positions, _ in self.positions]
+        frame = pd.DataFrame({
+            'POSISI': self.problem_positions(),
+            'KOLOM': np.repeat([column for column, _, _, _ in self.positions], sizes).astype(object),
+            'ALASAN': np.repeat([REASONS[reason] for _, reason, _, _ in self.positions], sizes).astype(object),
+            'NILAI': np.concatenate([
+                values if values is not None else np.full(len(positions), None, dtype=object)
+                for _, _, positions, values in self.positions
+            ]),
+        })
+        return frame.sort_values('POSISI', kind='stable').reset_index(drop=True)
+
+    def summary(self):
+        """Tabel jumlah masalah per kolom dan alasan"""
+        return pd.DataFrame(
+            [{'KOLOM': column, 'ALASAN': REASONS[reason], 'JUMLAH': count}
+             for (column, reason), count in self.counts.items()],
+            columns=['KOLOM', 'ALASAN', 'JUMLAH'],
+        )
+
+    def message(self):
+        if self.missing_columns:
+            return f"Kolom yang hilang: {', '.join(self.missing_columns)}"
+        if not self.n_errors:
+            return "Data valid"
+        reasons = {}
+        for (_, reason), count in self.counts.items():
+            reasons[REASONS[reason]] = reasons.get(REASONS[reason], 0) + count
+        detail = ', '.join(f"{reason}: {count:,}" for reason, count in reasons.items())
+        prefix = "Data tidak valid" if self.strict else "Data valid dengan catatan"
+        return f"{prefix}: {self.n_errors:,} masalah ({detail})"
+
+    def to_json(self):
+        """Serialisasi ringkas (untuk metadata cache dataset)"""
+        return json.dumps({
+            'n_rows': self.n_rows,
+            'missing_columns': self.missing_columns,
+            'counts': [[column, reason, count] for (column, reason), count in self.counts.items()],
+            'errors': self.errors.astype({'NILAI': str}).to_dict(orient='split')['data'],
+            'strict': self.strict,
+        }, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        errors = pd.DataFrame(data['errors'], columns=ERROR_COLUMNS) if data['errors'] else _empty_errors()
+        return cls(
+            n_rows=data['n_rows'],
+            missing_columns=data['missing_columns'],
+            counts={(column, reason): count for column, reason, count in data['counts']},
+            errors=errors.astype({'BARIS': 'int64'}),
+            strict=data.get('strict', False),
+        )
+
+
+def _take(values, positions):
+    """Ambil nilai di posisi tertentu tanpa mengonversi seluruh kolom"""
+    if hasattr(values, 'iloc'):
+        return values.iloc[positions].to_numpy(dtype=object)
+    return values.take(positions).astype(object)
+
+
+def parse_numeric(series):
+    """Angka sebagai float64; return (hasil, mask nilai yang bukan angka)"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        # Copy-on-Write: astype tidak menyalin data selama hasilnya tidak diubah
+        return series.astype('float64'), np.zeros(len(series), dtype=bool)
+    parsed = pd.to_numeric(series, errors='coerce').astype('float64')
+    # Bukan angka = gagal diparse padahal sel tidak kosong (teks hanya dicek untuk kandidat)
+    invalid = np.zeros(len(series), dtype=bool)
+    candidates = np.flatnonzero(parsed.isna().to_numpy() & series.notna().to_numpy())
+    if len(candidates):
+        text = series.iloc[candidates].astype(str).str.strip()
+        invalid[candidates[(text != '').to_numpy()]] = True
+    return parsed, invalid
+
+
+def parse_dates(series):
+    """TANGGAL DD/MM/YYYY ke datetime64, diparse per nilai unik; return (hasil, mask tidak valid)"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, np.zeros(len(series), dtype=bool)
+
+    # Data mingguan: jutaan baris tetapi hanya puluhan/ratusan tanggal unik
+    codes, uniques = pd.factorize(series)
+    unique_text = pd.Index(uniques).astype(str).str.strip()
+    parsed_uniques = pd.to_datetime(unique_text, format=DATE_FORMAT, errors='coerce').to_numpy()
+    # Kode -1 (sel kosong) mengambil NaT di posisi terakhir
+    values = np.append(parsed_uniques, np.datetime64('NaT'))[codes]
+    invalid_uniques = np.append(np.isnat(parsed_uniques) & np.asarray(unique_text != ''), False)
+    return pd.Series(values, index=series.index), invalid_uniques[codes]
+
+
+def check_duplicates(df, report, row_offset=0, line_numbers=None):
+    """Tandai baris NAMA BARANG + TANGGAL yang sudah muncul sebelumnya"""
+    if 'NAMA BARANG' not in df.columns or 'TANGGAL' not in df.columns:
+        return report
+    nama_codes, nama_uniques = pd.factorize(df['NAMA BARANG'])
+    tanggal_codes, tanggal_uniques = pd.factorize(df['TANGGAL'])
+    # Satu key integer per pasangan; baris dengan nilai kosong sudah dilaporkan terpisah
+    keys = pd.Series(nama_codes.astype(np.int64) * (len(tanggal_uniques) + 1) + tanggal_codes)
+    complete = (nama_codes >= 0) & (tanggal_codes >= 0)
+    duplicated = np.flatnonzero(keys.duplicated().to_numpy() & complete)
+    report.add('duplikat', 'NAMA BARANG', duplicated, df['NAMA BARANG'], row_offset, line_numbers)
+    return report
+
+
+def check_frame(df, required_columns, row_offset=0, duplicates=True, strict=False, track_positions=False,
+                line_numbers=None):
+    """Parse dan validasi frame (in place); return ValidationReport
+
+    ``track_positions=True`` mencatat posisi semua masalah (lihat
+    ``ValidationReport.problem_positions``), bukan hanya MAX_ERROR_ROWS detail.
+    ``line_numbers`` (array nomor baris file per baris) menggantikan ``row_offset``
+    untuk kolom BARIS.
+    """
+    report = ValidationReport(n_rows=len(df), strict=strict, positions=[] if track_positions else None)
+    report.missing_columns = [col for col in required_columns if col not in df.columns]
+    if report.missing_columns:
+        return report
+
+    for col in required_columns:
+        original = df[col]
+        if col in NUMERIC_COLUMNS:
+            parsed, invalid = parse_numeric(original)
+            reason = 'angka_tidak_valid'
+        elif col == 'TANGGAL':
+            parsed, invalid = parse_dates(original)
+            reason = 'tanggal_tidak_valid'
+        else:
+            parsed, invalid = original, None
+
+        if invalid is not None:
+            # Kosong = tidak terparse dan bukan nilai yang salah format (termasuk sel berisi spasi)
+            missing = parsed.isna().to_numpy() & ~invalid
+            report.add(reason, col, np.flatnonzero(invalid), original, row_offset, line_numbers)
+        else:
+            missing = original.isna().to_numpy()
+            if not isinstance(original.dtype, pd.CategoricalDtype) and original.dtype.kind in 'OTU':
+                missing = missing | (original.astype(str).str.strip() == '').to_numpy()
+        report.add('nilai_kosong', col, np.flatnonzero(missing), row_offset=row_offset, line_numbers=line_numbers)
+        if parsed is not original:
+            df[col] = parsed
+
+    values = {col: df[col].to_numpy() for col in NON_NEGATIVE_COLUMNS}
+    for col, column_values in values.items():
+        report.add('negatif', col, np.flatnonzero(column_values < 0), column_values, row_offset, line_numbers)
+
+    with np.errstate(invalid='ignore'):
+        difference = values['STOK AKHIR'] - (values['STOK AWAL'] - values['JUMLAH TERJUAL'])
+        unbalanced = np.flatnonzero(np.abs(difference) > STOCK_BALANCE_TOLERANCE)
+    report.add('stok_tidak_seimbang', 'STOK AKHIR', unbalanced, values['STOK AKHIR'], row_offset, line_numbers)
+
+    if duplicates:
+        check_duplicates(df, report, row_offset, line_numbers)
+    return report
@@ -0,0 +1,91 @@
+"""Vocabulary kategorikal yang dipersist di samping file model.
+
+Kode KATEGORI_ENCODED dan NAMA_BARANG_ENCODED harus sama dengan kode saat model
+ditraining, jadi vocabulary tidak boleh di-fit ulang per upload. Encoding memakai
+``Index.get_indexer`` pada kategori tetap (satu pass hash lookup, tanpa sort).
+Nilai yang tidak dikenal mendapat kode ``UNKNOWN_CODE``.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .model_registry import MODEL_PATH, get_registry
+
+UNKNOWN_CODE = -1
+
+# Kolom teks -> key LabelEncoder di dalam file model
+ENCODED_COLUMNS = {
+    'KATEGORI': 'label_encoder_kategori',
+    'NAMA BARANG': 'label_encoder_nama_barang',
+}
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def vocab_path(model_path=MODEL_PATH):
+    """Path file vocabulary untuk sebuah file model"""
+    root, _ = os.path.splitext(model_path)
+    return f"{root}.vocab.json"
+
+
+def build_vocabularies(model_path=MODEL_PATH):
+    """Ambil daftar kelas dari LabelEncoder yang tersimpan di file model"""
+    artifact = get_registry().get(model_path).artifact
+    if not isinstance(artifact, dict):
+        raise ValueError("File model tidak menyimpan LabelEncoder untuk membangun vocabulary")
+
+    vocabularies = {}
+    for column, key in ENCODED_COLUMNS.items():
+        if key not in artifact:
+            raise ValueError(f"LabelEncoder '{key}' tidak ditemukan di file model")
+        vocabularies[column] = [str(c) for c in artifact[key].classes_]
+    return vocabularies
+
+
+def save_vocabularies(vocabularies, model_path=MODEL_PATH):
+    """Simpan vocabulary ke file JSON di samping model (ditulis atomik)"""
+    path = vocab_path(model_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'columns': {k: list(v) for k, v in vocabularies.items()}}, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+    return path
+
+
+def get_vocabularies(model_path=MODEL_PATH):
+    """Vocabulary sebagai CategoricalDtype per kolom, di-cache per proses"""
+    path = vocab_path(model_path)
+    if not os.path.exists(path):
+        save_vocabularies(build_vocabularies(model_path), model_path)
+
+    mtime_ns = os.stat(path).st_mtime_ns
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        with open(path, encoding='utf-8') as f:
+            columns = json.load(f)['columns']
+        vocabularies = {
+            column: pd.CategoricalDtype(categories=values)
+            for column, values in columns.items()
+        }
+        _cache[path] = (mtime_ns, vocabularies)
+        return vocabularies
+
+
+def encode(values, dtype):
+    """Encode nilai teks ke kode integer tetap; nilai baru -> UNKNOWN_CODE"""
+    code_dtype = pd.Categorical([], dtype=dtype).codes.dtype
+    if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+        # Input sudah kategorikal: cukup petakan kategorinya, bukan setiap baris
+        values = pd.Categorical(values)
+        mapping = np.append(dtype.categories.get_indexer(values.categories), UNKNOWN_CODE)
+        return mapping[values.codes].astype(code_dtype)
+    # get_indexer memberi -1 (= UNKNOWN_CODE) untuk nilai di luar vocabulary, tanpa
+    # pd.Categorical(values, dtype=...) yang deprecated untuk nilai tidak dikenal
+    return dtype.categories.get_indexer(values).astype(code_dtype)
@@ -0,0 +1,26 @@
+import os
+import shutil
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_FILE = os.path.join(ROOT, 'model_restock.joblib')
+
+
+def pytest_configure(config):
+    # Model disimpan dengan sklearn versi lama; peringatan unpickle tidak relevan untuk test
+    config.addinivalue_line('filterwarnings', 'ignore::sklearn.exceptions.InconsistentVersionWarning')
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    """Model dan vocabulary dicari relatif terhadap folder repo"""
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture
+def model_copy(tmp_path):
+    """Salinan file model di folder sementara (kandidat/backup tidak menyentuh repo)"""
+    path = tmp_path / 'model_restock.joblib'
+    shutil.copy2(MODEL_FILE, path)
+    return str(path)
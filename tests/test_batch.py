@@ -0,0 +1,42 @@
+import numpy as np
+
+from restock import batch
+from restock.batch import StoreSource, run_batch
+from restock.forest import CompiledForest, ForestPredictor, compiled_forest_dir
+from restock.synthetic import generate_sales
+
+
+def make_sources(n_stores=3):
+    sources = []
+    for seed in range(n_stores):
+        data = generate_sales(41 * 6, n_items=41, seed=seed).to_csv(index=False).encode('utf-8')
+        sources.append(StoreSource(f"toko_{seed}", f"toko_{seed}.csv", data=data))
+    return sources
+
+
+def test_process_worker_maps_compiled_forest(model_copy, monkeypatch):
+    forest_dir = compiled_forest_dir(model_copy)
+    monkeypatch.setattr(batch, '_worker_model', None)
+
+    batch._init_worker(model_copy, forest_dir)
+
+    assert isinstance(batch._worker_model, ForestPredictor)
+    assert isinstance(batch._worker_model.compiled, CompiledForest)
+    assert isinstance(batch._worker_model.compiled.value, np.memmap)
+    # Estimator sklearn belum di-unpickle sampai ada batch besar
+    assert batch._worker_model._model is None
+
+
+def test_process_pool_matches_thread_pool(model_copy):
+    sources = make_sources()
+
+    threads = run_batch(sources, model_path=model_copy, workers=2)
+    processes = run_batch(sources, model_path=model_copy, workers=2, processes=True)
+
+    assert [r.store for r in processes] == [s.store for s in sources]
+    for thread_result, process_result in zip(threads, processes):
+        assert thread_result.ok and process_result.ok
+        np.testing.assert_array_equal(
+            thread_result.results['REKOMENDASI_RESTOCK'].to_numpy(),
+            process_result.results['REKOMENDASI_RESTOCK'].to_numpy(),
+        )
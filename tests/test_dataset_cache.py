@@ -0,0 +1,89 @@
+import os
+
+import pandas as pd
+import pytest
+
+from restock.dataset_cache import DatasetCache, content_hash
+from restock.synthetic import generate_sales
+
+pytest.importorskip('pyarrow')
+
+
+def upload(seed=0, n_rows=41 * 6):
+    df = generate_sales(n_rows, n_items=41, seed=seed).astype(object)
+    df.loc[3, 'JUMLAH TERJUAL'] = 'abc'
+    return df.to_csv(index=False).encode('utf-8')
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DatasetCache(cache_dir=str(tmp_path / 'datasets'))
+
+
+def test_parquet_round_trip(cache):
+    handle, df, ok, message = cache.get_or_ingest(upload(), 'toko.csv')
+
+    assert ok, message
+    assert handle.n_rows == len(df)
+    pd.testing.assert_frame_equal(handle.load(), df)
+    pd.testing.assert_frame_equal(handle.load(columns=['NAMA BARANG', 'TANGGAL']), df[['NAMA BARANG', 'TANGGAL']])
+
+
+def test_same_bytes_hit_cache_with_validation(cache):
+    data = upload()
+    first, _, _, message = cache.get_or_ingest(data, 'toko.csv')
+
+    second, df, ok, cached_message = cache.get_or_ingest(data, 'lain.csv')
+
+    assert ok and df is None
+    assert second.key == first.key == content_hash(data)
+    assert second.name == 'toko.csv'
+    assert second.validation.counts == first.validation.counts == {('JUMLAH TERJUAL', 'angka_tidak_valid'): 1}
+    assert cached_message == f"{message} (dari cache)"
+    pd.testing.assert_frame_equal(second.load(), first.load())
+
+
+def test_different_bytes_get_different_keys(cache):
+    first, _, _, _ = cache.get_or_ingest(upload(seed=0), 'toko.csv')
+    second, df, _, _ = cache.get_or_ingest(upload(seed=1), 'toko.csv')
+
+    assert second.key != first.key
+    assert df is not None
+    assert len(cache.entries()) == 2
+
+
+def test_invalid_upload_not_stored(cache):
+    data = generate_sales(41, n_items=41, seed=0).drop(columns=['SATUAN']).to_csv(index=False).encode('utf-8')
+
+    handle, _, ok, message = cache.get_or_ingest(data, 'toko.csv')
+
+    assert handle is None and not ok
+    assert message == "Kolom yang hilang: SATUAN"
+    assert cache.entries() == []
+
+
+def test_corrupt_file_is_a_miss(cache):
+    data = upload()
+    handle, _, _, _ = cache.get_or_ingest(data, 'toko.csv')
+    with open(handle.path, 'wb') as f:
+        f.write(b'bukan parquet')
+
+    assert cache.lookup(handle.key) is None
+    again, df, ok, _ = cache.get_or_ingest(data, 'toko.csv')
+    assert ok and df is not None
+    pd.testing.assert_frame_equal(again.load(), df)
+
+
+def test_eviction_removes_least_recently_used(cache):
+    handles = [cache.get_or_ingest(upload(seed=seed), f"toko_{seed}.csv")[0] for seed in range(3)]
+    for age, handle in enumerate(reversed(handles)):
+        os.utime(handle.path, (1_000_000 - age * 10, 1_000_000 - age * 10))
+    # Akses ulang file tertua menjadikannya yang terbaru
+    assert cache.lookup(handles[0].key) is not None
+    sizes = {handle.key: os.path.getsize(handle.path) for handle in handles}
+
+    cache.max_bytes = sizes[handles[0].key] + sizes[handles[2].key]
+    cache.evict()
+
+    remaining = {os.path.basename(path) for path, _, _ in cache.entries()}
+    assert remaining == {f"{handles[0].key}.parquet", f"{handles[2].key}.parquet"}
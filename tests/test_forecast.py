@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from restock.forecast import MAX_HORIZON_WEEKS, forecast_horizon, forecast_table
+from restock.forest import get_predictor
+from restock.model_registry import get_registry
+from restock.pipeline import FEATURES, inference_features, predict_restock
+from restock.synthetic import generate_sales
+
+WEEKS = 4
+
+
+@pytest.fixture
+def latest_data():
+    latest, success, message = inference_features(generate_sales(41 * 6, n_items=41, seed=9))
+    assert success, message
+    return latest
+
+
+@pytest.fixture
+def forecast(model_copy, latest_data):
+    result, success, message = forecast_horizon(latest_data, get_predictor(model_copy), weeks=WEEKS)
+    assert success, message
+    return result
+
+
+def week(forecast, number):
+    return forecast[forecast['MINGGU_KE'] == number].reset_index(drop=True)
+
+
+def test_first_week_equals_predict_restock(model_copy, latest_data, forecast):
+    expected, success, _ = predict_restock(latest_data, get_predictor(model_copy))
+
+    assert success
+    first = week(forecast, 1)
+    assert first['NAMA BARANG'].astype(object).tolist() == expected['NAMA BARANG'].astype(object).tolist()
+    np.testing.assert_array_equal(first['REKOMENDASI_RESTOCK'], expected['REKOMENDASI_RESTOCK'])
+    np.testing.assert_array_equal(first['STOK AWAL'], expected['STOK AKHIR'] + expected['REKOMENDASI_RESTOCK'])
+
+
+def test_stock_identities_hold_every_week(latest_data, forecast):
+    assert len(forecast) == WEEKS * len(latest_data)
+    np.testing.assert_allclose(forecast['STOK AKHIR'], forecast['STOK AWAL'] - forecast['JUMLAH TERJUAL'])
+    assert (forecast['JUMLAH TERJUAL'] >= 0).all() and (forecast['STOK AKHIR'] >= 0).all()
+    for number in range(2, WEEKS + 1):
+        previous, current = week(forecast, number - 1), week(forecast, number)
+        # Restock baris minggu ke-n = rekomendasi dari keadaan minggu ke-(n-1), datang di awal minggu ke-n
+        np.testing.assert_allclose(current['STOK AWAL'], previous['STOK AKHIR'] + current['REKOMENDASI_RESTOCK'])
+        np.testing.assert_array_equal(current['MINGGU'], previous['MINGGU'] + 1)
+        assert ((current['TANGGAL'] - previous['TANGGAL']) == pd.Timedelta(days=7)).all()
+
+
+def test_recursive_steps_match_sklearn_loop(model_copy, latest_data, forecast):
+    """Setiap langkah dihitung ulang per barang dengan model sklearn"""
+    model = get_registry().get(model_copy).model
+    for item in range(len(latest_data)):
+        row = latest_data.iloc[[item]][FEATURES].astype('float64').reset_index(drop=True)
+        tanggal = pd.Timestamp(latest_data['TANGGAL'].iloc[item])
+        for number in range(1, WEEKS + 1):
+            restock = max(int(np.round(model.predict(row)[0])), 0)
+            stok_akhir = row.at[0, 'STOK AKHIR']
+            demand = restock + stok_akhir if restock > 0 else row.at[0, 'JUMLAH TERJUAL']
+            stok_awal = stok_akhir + restock
+            terjual = min(demand, stok_awal)
+            tanggal += pd.Timedelta(days=7)
+
+            actual = week(forecast, number).iloc[item]
+            assert actual['REKOMENDASI_RESTOCK'] == restock
+            assert actual['JUMLAH TERJUAL'] == pytest.approx(terjual)
+            row.loc[0, ['MINGGU', 'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR']] = [
+                row.at[0, 'MINGGU'] + 1, stok_awal, terjual, stok_awal - terjual,
+            ]
+            row.loc[0, ['TAHUN', 'BULAN', 'HARI_DALAM_BULAN']] = [tanggal.year, tanggal.month, tanggal.day]
+
+
+@pytest.mark.parametrize('weeks', [0, MAX_HORIZON_WEEKS + 1])
+def test_horizon_out_of_range(model_copy, latest_data, weeks):
+    result, success, message = forecast_horizon(latest_data, get_predictor(model_copy), weeks=weeks)
+
+    assert result is None and not success
+    assert message == f"Horizon harus 1-{MAX_HORIZON_WEEKS} minggu"
+
+
+def test_forecast_table_totals(forecast):
+    table = forecast_table(forecast)
+
+    assert list(table.columns[-WEEKS - 1:]) == [f"Minggu +{n}" for n in range(1, WEEKS + 1)] + ['TOTAL']
+    assert table['TOTAL'].sum() == forecast['REKOMENDASI_RESTOCK'].sum()
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from restock.forest import CompiledForest, ForestPredictor, get_compiled_forest, get_predictor, is_compilable
+from restock.model_registry import get_registry
+from restock.pipeline import FEATURES, feature_engineering
+from restock.synthetic import generate_sales
+
+
+@pytest.fixture
+def features():
+    processed, _, _, success, message = feature_engineering(generate_sales(41 * 8, n_items=41, seed=2))
+    assert success, message
+    return processed[FEATURES]
+
+
+def test_shipped_model_matches_sklearn(model_copy, features):
+    model = get_registry().get(model_copy).model
+    assert is_compilable(model)
+    forest = CompiledForest.from_sklearn(model)
+
+    np.testing.assert_array_equal(forest.predict(features), model.predict(features))
+    per_tree = forest.predict_per_tree(features)
+    assert per_tree.shape == (len(model.estimators_), len(features))
+    for tree_values, estimator in zip(per_tree, model.estimators_):
+        np.testing.assert_array_equal(tree_values, estimator.predict(features.to_numpy(dtype=np.float32)))
+
+
+def test_missing_values_follow_sklearn():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 5))
+    X[rng.random(X.shape) < 0.15] = np.nan
+    y = np.nan_to_num(X[:, 0]) * 3 + np.isnan(X[:, 1]) * 5 + rng.normal(size=400)
+    model = RandomForestRegressor(n_estimators=12, max_depth=6, random_state=0).fit(X, y)
+
+    X_test = rng.normal(size=(300, 5))
+    X_test[rng.random(X_test.shape) < 0.3] = np.nan
+    forest = CompiledForest.from_sklearn(model)
+
+    np.testing.assert_allclose(forest.predict(X_test), model.predict(X_test), rtol=0, atol=1e-12)
+
+
+def test_save_load_memory_mapped(tmp_path, model_copy, features):
+    model = get_registry().get(model_copy).model
+    forest = CompiledForest.from_sklearn(model)
+    forest.save(tmp_path / 'forest')
+
+    loaded = CompiledForest.load(tmp_path / 'forest')
+
+    assert isinstance(loaded.value, np.memmap)
+    assert loaded.feature_names == forest.feature_names
+    np.testing.assert_array_equal(loaded.predict(features), forest.predict(features))
+
+
+def test_compiled_forest_cached_per_model_version(model_copy):
+    first = get_compiled_forest(model_copy)
+
+    assert get_compiled_forest(model_copy) is first
+
+
+def test_predictor_switches_engine_by_batch_size(model_copy, features, monkeypatch):
+    predictor = get_predictor(model_copy)
+    assert isinstance(predictor, ForestPredictor)
+    predictor.max_compiled_rows = len(features) // 2
+    sklearn_calls = []
+    model = predictor.model
+    monkeypatch.setattr(model, 'predict', lambda X: sklearn_calls.append(len(X)) or type(model).predict(model, X))
+
+    small = predictor.predict(features.iloc[:10])
+    large = predictor.predict(features)
+
+    assert sklearn_calls == [len(features)]
+    np.testing.assert_array_equal(small, predictor.compiled.predict(features.iloc[:10]))
+    np.testing.assert_array_equal(large, predictor.compiled.predict(features))
+    np.testing.assert_array_equal(predictor.predict_per_tree(features), predictor.compiled.predict_per_tree(features))
@@ -0,0 +1,116 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from restock.history import HistoryStore
+from restock.pipeline import check_data, load_model, run_pipeline
+from restock.synthetic import generate_sales
+
+
+@pytest.fixture
+def sales():
+    df = generate_sales(41 * 8, n_items=41, seed=0)
+    check_data(df)
+    return df
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path / 'history.sqlite'))
+
+
+def by_item(df):
+    return df.sort_values(['NAMA BARANG', 'TANGGAL']).reset_index(drop=True)
+
+
+def sorted_values(df, col):
+    return by_item(df)[col].tolist()
+
+
+def assert_frames_equal(actual, expected):
+    pd.testing.assert_frame_equal(
+        actual.astype({'KATEGORI': object, 'NAMA BARANG': object, 'SATUAN': object}).astype(
+            {col: 'float64' for col in ['MINGGU', 'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR']}),
+        expected.astype({'KATEGORI': object, 'NAMA BARANG': object, 'SATUAN': object}).astype(
+            {col: 'float64' for col in ['MINGGU', 'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR']}),
+        check_dtype=False,
+    )
+
+
+def test_round_trip(store, sales):
+    counts = store.append(sales)
+
+    assert counts == {'baru': len(sales), 'diperbarui': 0, 'sama': 0, 'dibuang': 0}
+    assert_frames_equal(store.load(), by_item(sales))
+    assert store.stats()['rows'] == len(sales)
+
+
+def test_append_deduplicates_and_updates(store, sales):
+    store.append(sales)
+    latest_date = sales['TANGGAL'].max()
+    last_week = sales[sales['TANGGAL'] == latest_date].copy()
+    last_week.loc[last_week.index[0], 'STOK AKHIR'] = 999
+    new_week = last_week.assign(TANGGAL=latest_date + pd.Timedelta(days=7), MINGGU=last_week['MINGGU'] + 1)
+
+    counts = store.append(pd.concat([last_week, new_week]))
+
+    assert counts == {'baru': len(new_week), 'diperbarui': 1, 'sama': len(last_week) - 1, 'dibuang': 0}
+    assert store.stats()['rows'] == len(sales) + len(new_week)
+    assert 999 in store.load()['STOK AKHIR'].tolist()
+
+
+def test_rows_without_key_are_dropped_and_last_duplicate_wins(store, sales):
+    rows = sales.head(3).copy()
+    rows = pd.concat([rows, rows.assign(**{'STOK AKHIR': rows['STOK AKHIR'] + 1})], ignore_index=True)
+    rows.loc[0, 'TANGGAL'] = pd.NaT
+    rows.loc[4, 'JUMLAH TERJUAL'] = np.nan
+
+    counts = store.append(rows)
+
+    assert counts['baru'] == 3 and counts['dibuang'] == 1
+    stored = store.load()
+    assert stored['STOK AKHIR'].tolist() == sorted_values(rows.tail(3), 'STOK AKHIR')
+    assert stored['JUMLAH TERJUAL'].isna().sum() == 1
+
+
+@pytest.mark.parametrize('k', [1, 3])
+def test_recent_matches_groupby_tail(store, sales, k):
+    store.append(sales)
+
+    expected = by_item(sales).groupby('NAMA BARANG', observed=True).tail(k).reset_index(drop=True)
+    assert_frames_equal(store.recent(k), expected)
+
+
+def test_prediction_from_latest_week_only(store, sales):
+    latest_date = sales['TANGGAL'].max()
+    store.append(sales[sales['TANGGAL'] < latest_date])
+    store.append(sales[sales['TANGGAL'] == latest_date])
+    model = load_model()
+
+    from_history, ok, _ = run_pipeline(store.recent(1), model, validate=False)
+    from_upload, _, _ = run_pipeline(sales, model, validate=False)
+
+    assert ok
+    np.testing.assert_array_equal(
+        from_history['REKOMENDASI_RESTOCK'].to_numpy(),
+        by_item(from_upload)['REKOMENDASI_RESTOCK'].to_numpy(),
+    )
+
+
+def test_dataset_key_is_unique_per_database(store, sales):
+    store.append(sales)
+    first = store.dataset_handle(2).key
+    assert store.dataset_handle(2).key == first
+
+    store.append(sales.assign(**{'STOK AKHIR': sales['STOK AKHIR'] + 1}))
+    assert store.dataset_handle(2).key != first
+
+    # File dibuat ulang: versi mulai dari awal lagi tetapi key tetap berbeda
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(store.path + suffix):
+            os.remove(store.path + suffix)
+    store.append(sales)
+    assert store.stats()['version'] == 1
+    assert store.dataset_handle(2).key != first
@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+from restock.incremental import build_state, update_features
+from restock.pipeline import FEATURES, feature_engineering
+from restock.synthetic import generate_sales
+
+COMPARED = ['NAMA BARANG', 'TANGGAL'] + FEATURES + ['FUTURE_SALES', 'RESTOCK_NEEDED']
+
+
+def processed(df):
+    result, _, _, success, message = feature_engineering(df)
+    assert success, message
+    return result
+
+
+def rows(df, columns=COMPARED):
+    return df[columns].sort_values(['NAMA BARANG', 'TANGGAL']).reset_index(drop=True)
+
+
+@pytest.fixture
+def history():
+    df = generate_sales(41 * 10, n_items=41, seed=4)
+    dates = pd.to_datetime(df['TANGGAL'], format='%d/%m/%Y')
+    cutoff = dates.drop_duplicates().sort_values().iloc[-3]
+    return df, df[dates < cutoff].reset_index(drop=True), df[dates >= cutoff].reset_index(drop=True), cutoff
+
+
+def test_new_rows_match_full_feature_engineering(history):
+    full, old, new, cutoff = history
+    expected = processed(full)
+
+    features, _, _, success, message = update_features(build_state(processed(old)), new)
+
+    assert success, message
+    assert len(features) == len(new)
+    pd.testing.assert_frame_equal(
+        rows(features), rows(expected[expected['TANGGAL'] >= cutoff]), check_dtype=False, check_categorical=False,
+    )
+
+
+def test_label_updates_and_state_match_full_history(history):
+    full, old, new, cutoff = history
+    expected = processed(full)
+    old_processed = processed(old)
+    last_old = old_processed.groupby('NAMA BARANG', observed=True)['TANGGAL'].max()
+
+    _, state, label_updates, success, message = update_features(build_state(old_processed), new)
+
+    assert success, message
+    target = expected.merge(last_old.reset_index(), on=['NAMA BARANG', 'TANGGAL'])
+    columns = ['NAMA BARANG', 'TANGGAL', 'FUTURE_SALES', 'RESTOCK_NEEDED']
+    pd.testing.assert_frame_equal(rows(label_updates, columns), rows(target, columns), check_dtype=False,
+                                  check_categorical=False)
+    pd.testing.assert_frame_equal(rows(state, COMPARED[:-2]), rows(build_state(expected), COMPARED[:-2]),
+                                  check_dtype=False, check_categorical=False)
+
+
+def test_rows_already_in_state_are_skipped(history):
+    _, old, new, _ = history
+    overlap = pd.concat([old.tail(41), new], ignore_index=True)
+
+    features, _, _, success, message = update_features(build_state(processed(old)), overlap)
+
+    assert success
+    assert len(features) == len(new)
+    assert "41 baris lama dilewati" in message
+
+
+def test_item_without_state_starts_without_lag(history):
+    _, old, new, _ = history
+    item = old['NAMA BARANG'].iloc[0]
+    state = build_state(processed(old[old['NAMA BARANG'] != item]))
+
+    features, new_state, label_updates, success, _ = update_features(state, new)
+
+    assert success
+    first = features[features['NAMA BARANG'] == item].iloc[0]
+    assert pd.isna(first['PREV_JUMLAH_TERJUAL']) and pd.isna(first['PREV_STOK_AKHIR'])
+    assert item not in set(label_updates['NAMA BARANG'])
+    assert new_state['NAMA BARANG'].is_unique and item in set(new_state['NAMA BARANG'])
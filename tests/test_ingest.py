@@ -0,0 +1,52 @@
+import pytest
+
+from restock.ingest import read_checked
+from restock.pipeline import REQUIRED_COLUMNS
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+def write_sheet(path, rows):
+    """Tulis rows {nomor baris sheet: nilai} ke .xlsx; baris yang tidak ada dibiarkan kosong"""
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for col, name in enumerate(REQUIRED_COLUMNS, start=1):
+        sheet.cell(row=1, column=col, value=name)
+    for line, values in rows.items():
+        for col, value in enumerate(values, start=1):
+            sheet.cell(row=line, column=col, value=value)
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def sheet(tmp_path):
+    return write_sheet(tmp_path / 'toko.xlsx', {
+        2: [1, '01/01/2024', 'Gula', 'Gulaku', 'pcs', 10, 2, 8],
+        5: [1, '01/01/2024', 'Beras', None, 'pcs', 'abc', 2, 8],
+        7: [2, '08/01/2024', 'Gula', 'Gulaku', None, 8, 3, 5],
+        9: [2, '08/01/2024', 'Gula', 'Gulaku', 'pcs', 8, 3, 5],
+    })
+
+
+@pytest.mark.parametrize('chunksize', [1, 100])
+def test_error_rows_match_sheet_lines_across_blank_rows(sheet, chunksize):
+    df, report = read_checked(sheet, chunksize=chunksize)
+
+    assert len(df) == 4
+    errors = list(zip(report.errors['BARIS'], report.errors['KOLOM'], report.errors['ALASAN']))
+    assert errors == [
+        (5, 'NAMA BARANG', "Nilai kosong"),
+        (5, 'STOK AWAL', "Bukan angka"),
+        (7, 'SATUAN', "Nilai kosong"),
+        (9, 'NAMA BARANG', "Duplikat NAMA BARANG + TANGGAL"),
+    ]
+
+
+def test_empty_text_cells_stay_empty(sheet):
+    df, report = read_checked(sheet)
+
+    assert df['NAMA BARANG'].isna().sum() == 1
+    assert df['SATUAN'].isna().sum() == 1
+    assert 'None' not in set(df['SATUAN'].dropna().astype(str))
+    assert report.counts[('SATUAN', 'nilai_kosong')] == 1
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from restock.pipeline import FEATURES, REQUIRED_COLUMNS, check_data, feature_engineering, inference_features
+from restock.synthetic import generate_sales
+
+
+def baseline_latest(df):
+    """Jalur lama: feature engineering seluruh histori lalu groupby().last()"""
+    processed, _, _, success, message = feature_engineering(df)
+    assert success, message
+    return processed.groupby('NAMA BARANG', observed=True).last().reset_index()
+
+
+def assert_same_columns(actual, expected, columns):
+    for col in columns:
+        left = actual[col].astype(object).to_numpy()
+        right = expected[col].astype(object).to_numpy()
+        same = [(a == b) or (pd.isna(a) and pd.isna(b)) for a, b in zip(left, right)]
+        assert all(same), col
+
+
+@pytest.fixture
+def messy_history():
+    """Histori teracak dengan tanggal duplikat, nilai kosong dan TANGGAL kosong"""
+    rng = np.random.default_rng(3)
+    df = generate_sales(41 * 10, n_items=41, seed=1)
+    check_data(df)
+    duplicates = df.sample(60, random_state=1).assign(**{'STOK AKHIR': lambda d: d['STOK AKHIR'] + 7})
+    df = pd.concat([df, duplicates]).sample(frac=1, random_state=2).reset_index(drop=True)
+    for col in ['MINGGU', 'STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR']:
+        df.loc[rng.random(len(df)) < 0.15, col] = np.nan
+    df.loc[rng.random(len(df)) < 0.05, 'TANGGAL'] = pd.NaT
+    return df
+
+
+def test_inference_features_matches_full_feature_engineering(messy_history):
+    latest, success, message = inference_features(messy_history)
+
+    assert success, message
+    assert_same_columns(latest, baseline_latest(messy_history), list(dict.fromkeys(REQUIRED_COLUMNS + FEATURES)))
+
+
+def test_same_date_takes_last_occurrence():
+    df = generate_sales(2, n_items=1)
+    df = pd.concat([df, df.tail(1).assign(**{'STOK AKHIR': 999.0})], ignore_index=True)
+
+    latest, success, _ = inference_features(df)
+
+    assert success
+    assert latest['STOK AKHIR'].tolist() == [999]
@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+import pytest
+
+from restock.pipeline import load_model
+from restock.service import (MAX_REQUEST_WARNINGS, MicroBatcher, PredictionService, ServiceError, content_length,
+                             predict_batch)
+from restock.synthetic import generate_sales
+from restock.validation import MAX_ERROR_ROWS
+
+
+def request_rows(n_requests, bad=True):
+    """Dua minggu per barang, satu barang per request; baris terakhir JUMLAH TERJUAL bukan angka"""
+    df = generate_sales(n_requests * 2, n_items=n_requests, seed=0).astype(object)
+    batch_rows = [rows.to_dict(orient='records') for _, rows in df.groupby('NAMA BARANG', sort=False)]
+    if bad:
+        for rows in batch_rows:
+            rows[-1]['JUMLAH TERJUAL'] = 'abc'
+    return batch_rows
+
+
+@pytest.fixture(scope='module')
+def model():
+    return load_model()
+
+
+@pytest.mark.parametrize('strict', [False, True])
+def test_problem_counts_past_error_detail_cap(model, strict):
+    n_requests = MAX_ERROR_ROWS + 200
+    batch_rows = request_rows(n_requests)
+
+    outcomes = predict_batch(batch_rows, model, strict=strict)
+
+    statuses = [status for status, _ in outcomes]
+    assert statuses == [422 if strict else 200] * n_requests
+    # Request setelah batas detail tetap mendapat jumlah masalah yang benar
+    _, last_body = outcomes[-1]
+    assert "1 masalah" in last_body['message']
+
+
+def test_clean_request_in_batch_with_bad_requests_is_accepted(model):
+    single_bad = request_rows(1)
+    batch_rows = request_rows(MAX_ERROR_ROWS + 10) + request_rows(1, bad=False) + single_bad
+
+    outcomes = predict_batch(batch_rows, model, strict=True)
+
+    status, body = outcomes[-2]
+    assert status == 200
+    assert body['message'] == "Prediksi berhasil"
+    # Peringatan request tidak bergantung pada request lain di batch yang sama
+    alone = predict_batch(single_bad, model, strict=True)[0]
+    for status, body in (outcomes[-1], alone):
+        assert status == 422
+        assert body['message'] == "Data tidak valid: 1 masalah"
+        assert body['warnings'] == [{'row': 1, 'column': 'JUMLAH TERJUAL', 'reason': "Bukan angka", 'value': 'abc'}]
+
+
+def test_warnings_capped_per_request(model):
+    big = generate_sales(MAX_REQUEST_WARNINGS + 50, n_items=41, seed=0).astype(object)
+    big['JUMLAH TERJUAL'] = 'abc'
+    big = big.to_dict(orient='records')
+
+    outcomes = predict_batch([big, request_rows(1)[0]], model)
+
+    assert len(outcomes[0][1]['warnings']) == MAX_REQUEST_WARNINGS
+    assert f"{MAX_REQUEST_WARNINGS + 50:,} masalah" in outcomes[0][1]['message']
+    assert len(outcomes[1][1]['warnings']) == 1
+
+
+def strict_json(body):
+    """json.loads yang menolak NaN/Infinity seperti parser JSON standar"""
+    def reject(constant):
+        raise ValueError(f"Bukan JSON valid: {constant}")
+    return json.loads(body, parse_constant=reject)
+
+
+def test_content_length_parsing():
+    assert content_length('POST', {'content-length': '12'}) == 12
+    assert content_length('GET', {}) == 0
+    with pytest.raises(ServiceError) as missing:
+        content_length('POST', {})
+    assert missing.value.status == 411
+    for value in ('abc', '-1', ''):
+        with pytest.raises(ServiceError) as invalid:
+            content_length('POST', {'content-length': value})
+        assert invalid.value.status == 400
+
+
+def send(model_path, request, batching=False):
+    """Kirim satu request HTTP mentah ke service di port acak; return (head, body)"""
+    async def scenario():
+        batcher = MicroBatcher(model_path, batching=batching)
+        service = PredictionService(batcher, model_path)
+        server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+        batcher.start()
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), timeout=10)
+            writer.close()
+        await batcher.stop()
+        return response
+
+    head, _, body = asyncio.run(scenario()).partition(b'\r\n\r\n')
+    return head, body
+
+
+@pytest.mark.parametrize('header, expected', [('', 411), ('Content-Length: abc\r\n', 400)])
+def test_bad_content_length_gets_a_response(model_copy, header, expected):
+    head, body = send(model_copy, f"POST /predict HTTP/1.1\r\nHost: test\r\n{header}\r\n".encode('latin-1'))
+
+    assert head.split(b' ')[1] == str(expected).encode()
+    assert b'Connection: close' in head
+    assert strict_json(body)['message']
+
+
+def test_missing_values_serialized_as_null(model_copy):
+    # Satu baris: tidak ada nilai lain per kolom untuk mengisi yang kosong
+    rows = request_rows(1, bad=False)[0][:1]
+    rows[0]['STOK AKHIR'] = ''
+    rows[0]['TANGGAL'] = 'bukan tanggal'
+    payload = json.dumps({'rows': rows}, default=str).encode('utf-8')
+
+    head, body = send(model_copy, (
+        f"POST /predict HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n"
+    ).encode('latin-1') + payload)
+
+    assert head.split(b' ')[1] == b'200'
+    [result] = strict_json(body)['results']
+    assert result['STOK AKHIR'] is None
+    assert result['TANGGAL'] is None
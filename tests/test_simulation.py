@@ -0,0 +1,110 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from restock.forest import get_predictor
+from restock.model_registry import get_registry
+from restock.pipeline import FEATURES, inference_features
+from restock.simulation import (RISK_THRESHOLD, demand_samples, per_tree_predictions, scenario_grid, simulate,
+                                summarize_simulation)
+from restock.synthetic import generate_sales
+
+
+@pytest.fixture
+def latest_data():
+    latest, success, message = inference_features(generate_sales(41 * 6, n_items=41, seed=7))
+    assert success, message
+    return latest
+
+
+def brute_force(latest_data, samples, scenarios, elasticity, prices):
+    """Kebijakan di docstring restock.simulation dihitung per skenario, per barang, per sampel"""
+    rows = []
+    for scenario in scenarios.itertuples(index=False):
+        lead, safety, factor = scenario.LEAD_TIME_MINGGU, scenario.STOK_PENGAMAN_MINGGU, scenario.FAKTOR_HARGA
+        for item, item_samples in enumerate(samples):
+            stok = float(latest_data['STOK AKHIR'].iloc[item])
+            demand = [s * factor ** elasticity for s in item_samples]
+            mean = sum(demand) / len(demand)
+            order = max(math.ceil((lead + 1 + safety) * mean - stok - 1e-9), 0)
+            stockouts = sum(
+                (lead > 0 and lead * d > stok) or (lead + 1) * d > stok + order for d in demand
+            )
+            shortage = sum(max((lead + 1) * d - (stok + order), 0) for d in demand) / len(demand)
+            rows.append((order, stockouts / len(demand), shortage, order * prices[item] * factor))
+    return pd.DataFrame(rows, columns=['JUMLAH_PESAN', 'PELUANG_STOCKOUT', 'KEKURANGAN_RATA2', 'INVESTASI'])
+
+
+def test_compiled_per_tree_matches_sklearn(model_copy, latest_data):
+    model = get_registry().get(model_copy).model
+    X = latest_data[FEATURES].to_numpy(dtype=np.float64)
+
+    compiled = per_tree_predictions(get_predictor(model_copy), X)
+
+    np.testing.assert_array_equal(compiled, per_tree_predictions(model, X))
+
+
+def test_demand_samples_sorted_and_non_negative(model_copy, latest_data):
+    samples = demand_samples(latest_data, get_predictor(model_copy))
+
+    assert samples.shape == (len(latest_data), len(get_registry().get(model_copy).model.estimators_))
+    assert (samples >= 0).all()
+    assert (np.diff(samples, axis=1) >= 0).all()
+
+
+@pytest.mark.parametrize('elasticity', [0.0, -1.5])
+def test_vectorized_scenarios_match_brute_force(model_copy, latest_data, elasticity):
+    model = get_predictor(model_copy)
+    scenarios = scenario_grid()
+    prices = {category: 5_000 + 1_000 * i for i, category in enumerate(latest_data['KATEGORI'].unique())}
+
+    per_item, _, _, success, message = simulate(latest_data, model, scenarios, unit_price=prices,
+                                                elasticity=elasticity)
+
+    assert success, message
+    samples = demand_samples(latest_data, model)
+    item_price = latest_data['KATEGORI'].astype(object).map(prices).to_numpy(dtype=np.float64)
+    expected = brute_force(latest_data, samples, scenarios, elasticity, item_price)
+    assert per_item['JUMLAH_PESAN'].tolist() == expected['JUMLAH_PESAN'].tolist()
+    for col in ['PELUANG_STOCKOUT', 'KEKURANGAN_RATA2', 'INVESTASI']:
+        np.testing.assert_allclose(per_item[col], expected[col], rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+def test_demand_mean_and_spread_from_tree_samples(model_copy, latest_data):
+    model = get_predictor(model_copy)
+    scenarios = scenario_grid(safety_weeks=[0], lead_weeks=[0], price_factors=[1.0])
+
+    per_item, _, _, success, _ = simulate(latest_data, model, scenarios)
+
+    assert success
+    samples = demand_samples(latest_data, model)
+    np.testing.assert_allclose(per_item['PERMINTAAN_RATA2'], samples.mean(axis=1))
+    np.testing.assert_allclose(per_item['PERMINTAAN_STD'], samples.std(axis=1))
+    # Tanpa lead time dan stok pengaman, pesanan menutup rata-rata permintaan
+    np.testing.assert_array_equal(
+        per_item['JUMLAH_PESAN'],
+        np.maximum(np.ceil(samples.mean(axis=1) - latest_data['STOK AKHIR'].to_numpy() - 1e-9), 0),
+    )
+
+
+def test_scenario_grid_is_full_product():
+    grid = scenario_grid(safety_weeks=[1, 0, 1], lead_weeks=[2, 0], price_factors=[1.0])
+
+    assert grid['SKENARIO'].tolist() == [1, 2, 3, 4]
+    assert list(zip(grid['STOK_PENGAMAN_MINGGU'], grid['LEAD_TIME_MINGGU'])) == [(0, 0), (0, 2), (1, 0), (1, 2)]
+
+
+def test_summaries_aggregate_per_item_rows(model_copy, latest_data):
+    per_item, per_kategori, per_scenario, success, _ = simulate(latest_data, get_predictor(model_copy))
+
+    assert success
+    assert len(per_scenario) == len(scenario_grid())
+    assert (per_scenario['BARANG'] == len(latest_data)).all()
+    totals = per_item.groupby('SKENARIO')[['INVESTASI', 'JUMLAH_PESAN']].sum()
+    np.testing.assert_allclose(per_scenario.set_index('SKENARIO')['INVESTASI'], totals['INVESTASI'])
+    assert per_kategori.groupby('SKENARIO')['BARANG'].sum().tolist() == per_scenario['BARANG'].tolist()
+    risky = (per_item['PELUANG_STOCKOUT'] > RISK_THRESHOLD).groupby(per_item['SKENARIO']).sum()
+    assert per_scenario.set_index('SKENARIO')['BARANG_BERISIKO'].tolist() == risky.tolist()
+    assert summarize_simulation(per_item)[1].equals(per_scenario)
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from restock.synthetic import MAX_HISTORY_WEEKS, generate_sales, items_for_rows
+
+
+def test_large_row_counts_add_items_not_years():
+    assert items_for_rows(1_000, 41) == 41
+    assert items_for_rows(1_000_000, 41) == items_for_rows(1_000_000, 1_000) == 3_847
+    assert items_for_rows(10_000_000, 41) * MAX_HISTORY_WEEKS >= 10_000_000
+
+    df = generate_sales(100_000, n_items=41, seed=0)
+
+    dates = pd.to_datetime(df['TANGGAL'], format='%d/%m/%Y')
+    assert len(df) == 100_000
+    assert df['MINGGU'].max() <= MAX_HISTORY_WEEKS
+    assert dates.max() - dates.min() <= pd.Timedelta(weeks=MAX_HISTORY_WEEKS)
+
+
+def test_stock_identity_holds():
+    df = generate_sales(41 * 20, n_items=41, seed=3)
+
+    assert (df['STOK AKHIR'] == df['STOK AWAL'] - df['JUMLAH TERJUAL']).all()
+    assert (df['JUMLAH TERJUAL'] >= 0).all() and (df['STOK AKHIR'] >= 0).all()
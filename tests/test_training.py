@@ -0,0 +1,56 @@
+import joblib
+import pandas as pd
+import pytest
+
+from restock.synthetic import generate_sales
+from restock.training import TRAINING_KEY, new_weeks, retrain, training_frame
+
+N_ITEMS = 41
+
+
+@pytest.fixture(scope='module')
+def history():
+    return generate_sales(N_ITEMS * 12, n_items=N_ITEMS, seed=0)
+
+
+def test_new_weeks_without_trained_until_reaches_past_holdout(history):
+    labeled = training_frame(history)
+    dates = sorted(labeled['TANGGAL'].unique())
+
+    rows = new_weeks(labeled, {}, recent_weeks=4, holdout_weeks=4)
+
+    assert rows['TANGGAL'].min() == dates[-8]
+    assert (rows['TANGGAL'] < dates[-4]).any()
+
+
+def test_warm_start_without_trained_until(model_copy, history):
+    base_trees = len(joblib.load(model_copy)['model'].estimators_)
+    assert TRAINING_KEY not in joblib.load(model_copy)
+
+    result = retrain(history, model_copy, mode='warm_start', add_trees=3, auto_activate=False, n_jobs=1)
+
+    assert result.n_trees == base_trees + 3
+    assert result.train_rows > 0
+    assert not result.activated
+    candidate = joblib.load(result.candidate_path)
+    assert candidate[TRAINING_KEY]['mode'] == 'warm_start'
+    assert pd.Timestamp(candidate[TRAINING_KEY]['trained_until']) == training_frame(history)['TANGGAL'].max()
+
+
+def test_warm_start_rejects_when_new_weeks_are_all_holdout(model_copy, history):
+    labeled = training_frame(history)
+    artifact = joblib.load(model_copy)
+    artifact[TRAINING_KEY] = {'trained_until': sorted(labeled['TANGGAL'].unique())[-3].isoformat()}
+    joblib.dump(artifact, model_copy)
+
+    with pytest.raises(ValueError, match="terpakai sebagai holdout"):
+        retrain(history, model_copy, mode='warm_start', holdout_weeks=4, add_trees=3, auto_activate=False, n_jobs=1)
+
+
+def test_full_retrain_activates_candidate(model_copy, history):
+    result = retrain(history, model_copy, mode='full', auto_activate=True, n_jobs=1)
+
+    if result.improved:
+        assert result.activated
+        assert joblib.load(model_copy)[TRAINING_KEY]['mode'] == 'full'
+    assert set(result.candidate_metrics) == {'mae', 'rmse', 'r2'}
@@ -0,0 +1,176 @@
+import io
+import math
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from restock.ingest import read_checked
+from restock.pipeline import REQUIRED_COLUMNS, check_data
+from restock.synthetic import generate_sales
+from restock.validation import (HEADER_ROWS, MAX_ERROR_ROWS, NON_NEGATIVE_COLUMNS, NUMERIC_COLUMNS, REASONS,
+                                STOCK_BALANCE_TOLERANCE, ValidationReport)
+
+
+def is_blank(value):
+    return value is None or (isinstance(value, float) and math.isnan(value)) or str(value).strip() == ''
+
+
+def parse_number(value):
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return None
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(str(value).strip(), '%d/%m/%Y')
+    except ValueError:
+        return None
+
+
+def rowwise_problems(df):
+    """Aturan validasi dicek satu per satu per baris; return list (posisi, kolom, alasan)"""
+    problems = []
+    seen = set()
+    for position, row in enumerate(df.to_dict(orient='records')):
+        parsed = {}
+        for col in REQUIRED_COLUMNS:
+            value = row[col]
+            if is_blank(value):
+                problems.append((position, col, 'nilai_kosong'))
+                parsed[col] = None
+            elif col in NUMERIC_COLUMNS:
+                parsed[col] = parse_number(value)
+                if parsed[col] is None:
+                    problems.append((position, col, 'angka_tidak_valid'))
+            elif col == 'TANGGAL':
+                parsed[col] = parse_date(value)
+                if parsed[col] is None:
+                    problems.append((position, col, 'tanggal_tidak_valid'))
+            else:
+                parsed[col] = value
+
+        for col in NON_NEGATIVE_COLUMNS:
+            if parsed[col] is not None and parsed[col] < 0:
+                problems.append((position, col, 'negatif'))
+        stock = [parsed[col] for col in ('STOK AWAL', 'JUMLAH TERJUAL', 'STOK AKHIR')]
+        if None not in stock and abs(stock[2] - (stock[0] - stock[1])) > STOCK_BALANCE_TOLERANCE:
+            problems.append((position, 'STOK AKHIR', 'stok_tidak_seimbang'))
+
+        key = (row['NAMA BARANG'], parsed['TANGGAL'])
+        if row['NAMA BARANG'] is not None and parsed['TANGGAL'] is not None:
+            if key in seen:
+                problems.append((position, 'NAMA BARANG', 'duplikat'))
+            seen.add(key)
+    return problems
+
+
+def messy_frame(n_rows=41 * 12, seed=5):
+    """Data sintetis (semua kolom teks seperti hasil upload) dengan berbagai kesalahan"""
+    rng = np.random.default_rng(seed)
+    df = generate_sales(n_rows, n_items=41, seed=seed).astype(str).astype(object)
+
+    def corrupt(col, values, fraction=0.03):
+        positions = rng.choice(len(df), int(len(df) * fraction), replace=False)
+        df.loc[positions, col] = rng.choice(np.asarray(values, dtype=object), len(positions))
+
+    for col in NUMERIC_COLUMNS:
+        corrupt(col, ['abc', '', '  ', None, '-4', '12.5', '7x'])
+    corrupt('TANGGAL', ['2024-01-08', '31/02/2024', '', None, ' 08/01/2024 ', '8/1/2024'])
+    corrupt('NAMA BARANG', [None, ''], fraction=0.01)
+    corrupt('SATUAN', ['', ' ', None], fraction=0.01)
+    duplicates = df.sample(25, random_state=seed)
+    return pd.concat([df, duplicates], ignore_index=True)
+
+
+def test_vectorized_rules_match_rowwise():
+    df = messy_frame()
+    expected = rowwise_problems(df)
+
+    report = check_data(df, track_positions=True)
+
+    assert report.counts == dict(Counter((col, reason) for _, col, reason in expected))
+    assert sorted(report.problem_positions().tolist()) == sorted(position for position, _, _ in expected)
+    assert report.is_valid
+    assert report.message().startswith("Data valid dengan catatan")
+
+
+def test_error_rows_use_file_line_numbers():
+    df = messy_frame()
+    expected = rowwise_problems(df)
+
+    report = check_data(df)
+
+    assert len(expected) < MAX_ERROR_ROWS
+    actual = sorted(zip(report.errors['BARIS'], report.errors['KOLOM'], report.errors['ALASAN']))
+    assert actual == sorted((position + HEADER_ROWS + 1, col, REASONS[reason]) for position, col, reason in expected)
+
+
+def test_numbers_and_dates_parsed_in_place():
+    df = messy_frame()
+    numbers = {col: pd.to_numeric(df[col], errors='coerce') for col in NUMERIC_COLUMNS}
+
+    check_data(df)
+
+    for col in NUMERIC_COLUMNS:
+        assert df[col].dtype == np.float64
+        pd.testing.assert_series_equal(df[col], numbers[col].astype('float64'), check_names=False)
+    assert pd.api.types.is_datetime64_any_dtype(df['TANGGAL'])
+
+
+def test_strict_makes_row_problems_invalid():
+    df = messy_frame()
+
+    report = check_data(df, strict=True)
+
+    assert not report.is_valid
+    assert report.message().startswith("Data tidak valid")
+    assert check_data(generate_sales(41 * 4, n_items=41, seed=1), strict=True).is_valid
+
+
+def test_missing_column_is_invalid():
+    df = generate_sales(41, n_items=41, seed=1).drop(columns=['SATUAN'])
+
+    report = check_data(df)
+
+    assert not report.is_valid
+    assert report.missing_columns == ['SATUAN']
+
+
+def test_error_details_capped_but_counts_complete():
+    df = generate_sales(MAX_ERROR_ROWS * 3, n_items=41, seed=1).astype(object)
+    df['JUMLAH TERJUAL'] = 'abc'
+
+    report = check_data(df, track_positions=True)
+
+    assert len(report.errors) == MAX_ERROR_ROWS
+    assert report.counts[('JUMLAH TERJUAL', 'angka_tidak_valid')] == len(df)
+    assert len(report.problem_positions()) == report.n_errors
+
+
+@pytest.mark.parametrize('strict', [False, True])
+def test_chunked_read_matches_single_pass(strict):
+    df = messy_frame()
+    data = df.to_csv(index=False).encode('utf-8')
+    single = check_data(pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False), strict=strict)
+
+    chunked_df, chunked = read_checked(io.BytesIO(data), name='upload.csv', chunksize=97, strict=strict)
+
+    assert chunked.n_rows == len(df)
+    assert chunked.counts == single.counts
+    pd.testing.assert_frame_equal(chunked.errors, single.errors)
+    assert (chunked_df is None) == strict
+
+
+def test_report_json_round_trip():
+    report = check_data(messy_frame())
+
+    restored = ValidationReport.from_json(report.to_json())
+
+    assert restored.counts == report.counts
+    assert restored.message() == report.message()
+    assert restored.errors['BARIS'].tolist() == report.errors['BARIS'].tolist()